@@ -2,33 +2,19 @@
 
 import asyncio
 import logging
-import signal
-import sys
 
 from .server import main
 
 logger = logging.getLogger(__name__)
 
 
-def setup_signal_handlers():
-    """Set up signal handlers for graceful shutdown."""
-
-    def signal_handler(signum, frame):
-        logger.info("🛑 Shutting down gracefully...")
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
-
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    setup_signal_handlers()
 
+    # SIGINT/SIGTERM (drain して停止) と SIGHUP (設定の再読み込み) は
+    # main() がイベントループ上で処理する (calendar_mcp.lifecycle)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
+        # シグナルハンドラの登録前に Ctrl+C された場合
         logger.info("🛑 Shutting down gracefully...")
-        sys.exit(0)
-    except SystemExit:
-        pass
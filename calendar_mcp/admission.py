@@ -0,0 +1,257 @@
+"""Admission control for tool and resource calls.
+
+A global cap bounds how many handlers run at once. Calls beyond the cap
+wait in a bounded queue; when the queue is full (or the wait times out)
+the call is rejected straight away with a "busy" error instead of piling
+up. Each session also has a token bucket so one client cannot take every
+slot.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 8
+DEFAULT_MAX_QUEUED = 32
+DEFAULT_QUEUE_TIMEOUT = 5.0
+DEFAULT_SESSION_RATE = 5.0
+DEFAULT_SESSION_BURST = 20
+
+# 統計を保持するセッション数の上限 (古いものから捨てる)
+MAX_TRACKED_SESSIONS = 1024
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a call is turned away."""
+
+    def __init__(self, reason: str, message: str, retry_after: float):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket refilled at `rate` tokens per second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token; return 0 on success or seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class SessionStats:
+    __slots__ = ("bucket", "admitted", "rejected_busy", "rejected_rate", "in_flight")
+
+    def __init__(self, bucket: Optional[TokenBucket]):
+        self.bucket = bucket
+        self.admitted = 0
+        self.rejected_busy = 0
+        self.rejected_rate = 0
+        self.in_flight = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "admitted": self.admitted,
+            "rejected_busy": self.rejected_busy,
+            "rejected_rate": self.rejected_rate,
+            "in_flight": self.in_flight,
+        }
+
+
+class AdmissionController:
+    """Global concurrency cap, bounded wait queue and per-session rate limit.
+
+    A `session_rate` of 0 disables the per-session limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        session_rate: float = DEFAULT_SESSION_RATE,
+        session_burst: int = DEFAULT_SESSION_BURST,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = max(1, session_burst)
+        self.active = 0
+        self.waiting = 0
+        # active が減るか上限が上がった時に待ち手を起こす
+        self._changed = asyncio.Condition()
+        self._waking: Optional[asyncio.Task] = None
+        self._sessions: OrderedDict[str, SessionStats] = OrderedDict()
+
+    def _session(self, key: str, now: float) -> SessionStats:
+        stats = self._sessions.get(key)
+        if stats is None:
+            bucket = None
+            if self.session_rate > 0:
+                bucket = TokenBucket(self.session_rate, self.session_burst, now)
+            stats = self._sessions[key] = SessionStats(bucket)
+            if len(self._sessions) > MAX_TRACKED_SESSIONS:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(key)
+        return stats
+
+    @asynccontextmanager
+    async def admit(self, session_key: str):
+        """Hold a slot for the block, or raise AdmissionRejectedError."""
+        stats = self._session(session_key, time.monotonic())
+        if stats.bucket is not None:
+            retry_after = stats.bucket.take(time.monotonic())
+            if retry_after:
+                stats.rejected_rate += 1
+                raise AdmissionRejectedError(
+                    "rate_limited",
+                    "Rate limit exceeded for this session",
+                    retry_after,
+                )
+
+        # 待ち手がいる間は空きがあっても後ろに並ぶ (起こされた待ち手を追い越さない)
+        if self.active >= self.max_concurrent or self.waiting:
+            if self.waiting >= self.max_queued:
+                stats.rejected_busy += 1
+                raise AdmissionRejectedError(
+                    "busy", "Server busy, too many queued calls", self.queue_timeout
+                )
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                stats.rejected_busy += 1
+                raise AdmissionRejectedError(
+                    "busy", "Server busy, timed out waiting for a slot", 1.0
+                ) from None
+            finally:
+                self.waiting -= 1
+        else:
+            self.active += 1
+
+        stats.admitted += 1
+        stats.in_flight += 1
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+            self.active -= 1
+            if self.waiting:
+                # キャンセルされた呼び出しの解放でも、待ち手は必ず起こす
+                await asyncio.shield(self._wake())
+
+    async def _acquire(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.active < self.max_concurrent)
+            self.active += 1
+
+    async def _wake(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    def configure(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        session_rate: Optional[float] = None,
+        session_burst: Optional[int] = None,
+    ):
+        """Change limits in place, keeping sessions and calls in progress.
+
+        Lowering max_concurrent admits no new call until the running ones
+        drop below the new cap; raising it admits queued calls at once.
+        Existing session buckets pick up the new rate and burst.
+        """
+        if max_concurrent is not None:
+            max_concurrent = max(1, max_concurrent)
+            raised = max_concurrent > self.max_concurrent
+            self.max_concurrent = max_concurrent
+            if raised and self.waiting:
+                # 参照を持っておかないとタスクが途中で回収されることがある
+                self._waking = asyncio.get_running_loop().create_task(self._wake())
+        if max_queued is not None:
+            self.max_queued = max(0, max_queued)
+        if queue_timeout is not None:
+            self.queue_timeout = queue_timeout
+        if session_rate is not None or session_burst is not None:
+            if session_rate is not None:
+                self.session_rate = session_rate
+            if session_burst is not None:
+                self.session_burst = max(1, session_burst)
+            for stats in self._sessions.values():
+                if self.session_rate <= 0:
+                    stats.bucket = None
+                elif stats.bucket is None:
+                    stats.bucket = TokenBucket(
+                        self.session_rate, self.session_burst, time.monotonic()
+                    )
+                else:
+                    stats.bucket.rate = self.session_rate
+                    stats.bucket.burst = self.session_burst
+                    stats.bucket.tokens = min(stats.bucket.tokens, self.session_burst)
+
+    def wrap(self, name: str, fn: Callable, session_key: Callable[[], str]):
+        """Return a handler that is admitted before `fn` runs.
+
+        Rejected calls return a JSON error instead of raising, like the
+        other error responses of the server.
+        """
+
+        @functools.wraps(fn)
+        async def admitted(*args, **kwargs):
+            key = session_key()
+            try:
+                async with self.admit(key):
+                    return await fn(*args, **kwargs)
+            except AdmissionRejectedError as e:
+                logger.warning(f"Rejected {name} for session {key}: {e}")
+                return json.dumps(
+                    {
+                        "error": str(e),
+                        "reason": e.reason,
+                        "retry_after": round(e.retry_after, 3),
+                    }
+                )
+
+        return admitted
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = {key: s.as_dict() for key, s in self._sessions.items()}
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "queue_timeout": self.queue_timeout,
+                "session_rate": self.session_rate,
+                "session_burst": self.session_burst,
+            },
+            "totals": {
+                field: sum(s[field] for s in sessions.values())
+                for field in ("admitted", "rejected_busy", "rejected_rate")
+            },
+            "sessions": sessions,
+        }
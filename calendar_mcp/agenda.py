@@ -0,0 +1,172 @@
+"""Precomputed agenda views.
+
+The views clients ask for most ("today", "tomorrow", "week") are rendered
+ahead of time and kept as ready JSON text, so serving one is a dict
+lookup. A background task rebuilds a view after the event store changes,
+when the day rolls over at midnight and when the view is older than
+max_age (which bounds staleness if a change notification never arrives).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AGENDA_VIEWS = ("today", "tomorrow", "week")
+
+DEFAULT_AGENDA_MAX_AGE = 60.0
+
+# (start_date, end_date) - end_date の日は含まない
+DateRange = Tuple[str, str]
+
+# (start_date, end_date) -> (レスポンス JSON, キャッシュしてよいか)
+Renderer = Callable[[str, str], Awaitable[Tuple[str, bool]]]
+
+
+def view_range(view: str, today: date) -> DateRange:
+    """Return the (start_date, end_date) of a view, end date exclusive.
+
+    "week" is the ISO week (Monday to Sunday) containing today.
+    """
+    if view == "today":
+        start, days = today, 1
+    elif view == "tomorrow":
+        start, days = today + timedelta(days=1), 1
+    elif view == "week":
+        start, days = today - timedelta(days=today.weekday()), 7
+    else:
+        raise ValueError(f"Invalid view '{view}', expected one of {AGENDA_VIEWS}")
+    return start.isoformat(), (start + timedelta(days=days)).isoformat()
+
+
+class AgendaViews:
+    """Ready-to-send responses for the agenda views.
+
+    get() serves a view from memory while it is current and otherwise
+    renders it (concurrent requests share one render). The first get()
+    also starts the background refresher on the running loop.
+    """
+
+    def __init__(
+        self,
+        render: Renderer,
+        max_age: Optional[float] = DEFAULT_AGENDA_MAX_AGE,
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        self._render = render
+        self.max_age = max_age
+        self._now = now
+        # view -> (期間, 作成時刻 (monotonic), 世代, JSON)
+        self._views: Dict[str, Tuple[DateRange, float, int, str]] = {}
+        self._generation = 0
+        self._builds: Dict[Tuple[str, int], asyncio.Future[str]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._refresher: Optional[asyncio.Task[None]] = None
+        self.hits = 0
+        self.renders = 0
+
+    def _current(self, view: str) -> Optional[str]:
+        entry = self._views.get(view)
+        if entry is None:
+            return None
+        date_range, built_at, generation, text = entry
+        if generation != self._generation:
+            return None
+        if date_range != view_range(view, self._now().date()):
+            return None
+        if self.max_age and time.monotonic() - built_at > self.max_age:
+            return None
+        return text
+
+    async def get(self, view: str) -> str:
+        """Return the JSON response of a view."""
+        view_range(view, self._now().date())  # 不正なビュー名はここで ValueError
+        self._start()
+        text = self._current(view)
+        if text is not None:
+            self.hits += 1
+            return text
+        return await self._build(view)
+
+    def invalidate(self):
+        """Mark every view stale and wake the refresher.
+
+        Safe to call from any thread (EventKit change notifications arrive
+        on a framework thread).
+        """
+        self._generation += 1
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def close(self):
+        """Stop the background refresher."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "views": sorted(self._views),
+            "hits": self.hits,
+            "renders": self.renders,
+        }
+
+    def _start(self):
+        if self._refresher is not None and not self._refresher.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._refresher = self._loop.create_task(self._refresh_loop())
+
+    async def _build(self, view: str) -> str:
+        # 無効化前に始まった再構築には相乗りしない
+        key = (view, self._generation)
+        future = self._builds.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._rebuild(view, key[1]))
+            self._builds[key] = future
+            future.add_done_callback(lambda _: self._builds.pop(key, None))
+        # 待っている呼び出しのキャンセルで共有の再構築を止めない
+        return await asyncio.shield(future)
+
+    async def _rebuild(self, view: str, generation: int) -> str:
+        # 再構築中に無効化された場合は古い世代として保存され、次回作り直す
+        date_range = view_range(view, self._now().date())
+        text, cacheable = await self._render(*date_range)
+        self.renders += 1
+        if cacheable:
+            self._views[view] = (date_range, time.monotonic(), generation, text)
+        else:
+            self._views.pop(view, None)
+        return text
+
+    def _sleep_seconds(self) -> float:
+        now = self._now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        seconds = (midnight - now).total_seconds()
+        if self.max_age:
+            seconds = min(seconds, self.max_age)
+        return max(seconds, 0.0)
+
+    async def _refresh_loop(self):
+        while True:
+            self._wake.clear()
+            for view in AGENDA_VIEWS:
+                if self._current(view) is None:
+                    try:
+                        await self._build(view)
+                    except Exception as e:
+                        logger.warning(f"Agenda view '{view}' refresh failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._sleep_seconds())
+            except asyncio.TimeoutError:
+                pass
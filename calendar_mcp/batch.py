@@ -0,0 +1,146 @@
+"""Plan several event queries together.
+
+Queries whose date ranges overlap (or touch) are merged into one fetch,
+each merged range is converted once, and every query then picks its own
+events and fields out of the shared records.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .formats import COLUMNAR_FIELDS
+from .records import EventRecord
+
+# 1回のバッチで受け付けるクエリ数の上限
+MAX_BATCH_QUERIES = 20
+
+
+class BatchQuery:
+    """One validated query of a batch."""
+
+    __slots__ = ("key", "start_ts", "end_ts", "calendars", "fields", "offset")
+
+    def __init__(
+        self,
+        key: str,
+        start_ts: float,
+        end_ts: float,
+        calendars: Optional[frozenset] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        offset: int = 0,
+    ):
+        self.key = key
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        # None は全カレンダー / 全フィールド
+        self.calendars = calendars
+        self.fields = fields
+        # 前回の結果が予算で切られた場合の続きの位置
+        self.offset = offset
+
+    def select(self, records: Sequence[EventRecord]) -> List[EventRecord]:
+        """Return this query's records from the records of its merged range."""
+        return [
+            record
+            for record in records
+            if record.start_ts < self.end_ts
+            and record.end_ts > self.start_ts
+            and (self.calendars is None or record.calendar in self.calendars)
+        ]
+
+    def row(self, record: EventRecord) -> Dict[str, Any]:
+        """Return the record as a row with only this query's fields."""
+        row = record.to_dict()
+        if self.fields is None:
+            return row
+        return {field: row[field] for field in self.fields}
+
+
+def query_keys(queries: Sequence[Dict[str, Any]]) -> List[str]:
+    """Return the result key of each query spec ("key" or its position)."""
+    return [str(spec.get("key") or index) for index, spec in enumerate(queries)]
+
+
+def duplicate_key(queries: Sequence[Dict[str, Any]]) -> Optional[str]:
+    """Return the first result key used by more than one query, if any."""
+    seen = set()
+    for key in query_keys(queries):
+        if key in seen:
+            return key
+        seen.add(key)
+    return None
+
+
+def parse_queries(
+    queries: Sequence[Dict[str, Any]], calendar_names: Sequence[str]
+) -> Tuple[List[BatchQuery], Dict[str, Dict[str, str]]]:
+    """Validate raw query specs.
+
+    Returns the valid queries and an error entry per invalid one, both keyed
+    by the spec's "key" (or its position in the list).
+    """
+    known = set(calendar_names)
+    parsed: List[BatchQuery] = []
+    errors: Dict[str, Dict[str, str]] = {}
+    for key, spec in zip(query_keys(queries), queries):
+        try:
+            start_ts = datetime.strptime(spec["start_date"], "%Y-%m-%d").timestamp()
+            end_ts = datetime.strptime(spec["end_date"], "%Y-%m-%d").timestamp()
+            calendars = spec.get("calendars")
+            if isinstance(calendars, str):
+                calendars = [calendars]
+            if calendars:
+                unknown = [name for name in calendars if name not in known]
+                if unknown:
+                    raise ValueError(f"Calendar '{unknown[0]}' not found")
+            fields = spec.get("fields")
+            if fields:
+                invalid = [f for f in fields if f not in COLUMNAR_FIELDS]
+                if invalid:
+                    raise ValueError(
+                        f"Invalid field '{invalid[0]}', "
+                        f"expected some of {COLUMNAR_FIELDS}"
+                    )
+            offset = spec.get("offset") or 0
+            if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+                raise ValueError("offset must be a non-negative integer")
+        except KeyError as e:
+            errors[key] = {"error": f"Missing {e.args[0]}"}
+            continue
+        except (TypeError, ValueError) as e:
+            errors[key] = {"error": str(e)}
+            continue
+        parsed.append(
+            BatchQuery(
+                key,
+                start_ts,
+                end_ts,
+                frozenset(calendars) if calendars else None,
+                tuple(fields) if fields else None,
+                offset,
+            )
+        )
+    return parsed, errors
+
+
+def merge_ranges(
+    queries: Sequence[BatchQuery],
+) -> List[Tuple[float, float, Optional[frozenset], List[BatchQuery]]]:
+    """Group queries whose ranges overlap or touch.
+
+    Returns (start_ts, end_ts, calendars, queries) per group, where
+    calendars is the union the group needs (None when any query wants all).
+    """
+    groups: List[Tuple[float, float, Optional[frozenset], List[BatchQuery]]] = []
+    for query in sorted(queries, key=lambda q: (q.start_ts, q.end_ts)):
+        if groups and query.start_ts <= groups[-1][1]:
+            start_ts, end_ts, calendars, members = groups[-1]
+            if calendars is not None:
+                calendars = (
+                    None if query.calendars is None else calendars | query.calendars
+                )
+            members.append(query)
+            groups[-1] = (start_ts, max(end_ts, query.end_ts), calendars, members)
+        else:
+            groups.append((query.start_ts, query.end_ts, query.calendars, [query]))
+    return groups
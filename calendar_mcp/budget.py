@@ -0,0 +1,312 @@
+"""Byte-budgeted JSON encoding of event lists.
+
+Events are encoded one at a time and the running size is tracked in UTF-8
+bytes. When the next event does not fit, its notes are trimmed first, then
+its title; if it still does not fit the list is cut at that event and a
+continuation marker (the offset to pass on the next call) is reported.
+Nothing after the cut is converted or serialised. A page always holds at
+least one event, so following the continuation always makes progress: an
+event that cannot fit even fully trimmed is returned on its own page over
+the budget, flagged with over_budget.
+"""
+
+import functools
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .deadline import CHECK_EVERY
+from .formats import to_columnar
+from .records import EventRecord
+
+# 1 MiB: 一般的な MCP クライアントが無理なく扱えるサイズ
+DEFAULT_MAX_RESPONSE_BYTES = 1024 * 1024
+
+ELLIPSIS = "…"
+
+# マーカーの数値部分の最大桁数を見込んで予約する
+_BIG = 10**12
+
+
+def _dumps(obj: Any, **kwargs) -> Tuple[str, int]:
+    """Encode like safe_json_dumps and return (text, size in bytes)."""
+    text = json.dumps(obj, ensure_ascii=False, **kwargs)
+    try:
+        return text, len(text.encode("utf-8"))
+    except UnicodeError:
+        text = json.dumps(obj, ensure_ascii=True, **kwargs)
+        return text, len(text)
+
+
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    return text.encode("utf-8")[: max(max_bytes, 0)].decode("utf-8", "ignore")
+
+
+class _Counts:
+    """Per-page trimming counters reported in the marker."""
+
+    __slots__ = ("notes", "titles", "over_budget")
+
+    def __init__(self):
+        self.notes = 0
+        self.titles = 0
+        self.over_budget = False
+
+    def __bool__(self):
+        return bool(self.notes or self.titles or self.over_budget)
+
+
+def _marker(
+    returned: int, total: int, counts: _Counts, next_offset: Optional[int]
+) -> Dict[str, Any]:
+    return {
+        "truncated": True,
+        "returned": returned,
+        "total": total,
+        "notes_trimmed": counts.notes,
+        "titles_trimmed": counts.titles,
+        "over_budget": counts.over_budget,
+        "continuation": None if next_offset is None else {"offset": next_offset},
+    }
+
+
+def _reserve_marker() -> Dict[str, Any]:
+    """The largest marker, used to reserve room for it in the budget."""
+    counts = _Counts()
+    counts.notes = counts.titles = _BIG
+    counts.over_budget = False
+    return _marker(_BIG, _BIG, counts, _BIG)
+
+
+def _trim(
+    event: Dict[str, Any],
+    field: str,
+    remaining: int,
+    encode: Callable,
+    size: int,
+    floor: str = "",
+) -> Tuple[str, int, bool]:
+    """Shorten event[field] (to `floor` at most) until the event fits."""
+    text = None
+    # フィールドを絞った行には無い項目もある
+    original = value = event.get(field)
+    trimmed = False
+    while value and size > remaining:
+        excess = size - remaining
+        keep = len(value.encode("utf-8")) - excess - len(ELLIPSIS.encode("utf-8"))
+        shorter = _truncate_utf8(original, keep)
+        if len(shorter) >= len(value):
+            shorter = value[:-1]
+        value = shorter
+        event[field] = value + ELLIPSIS if value else floor
+        trimmed = True
+        text, size = encode(event)
+    return text, size, trimmed
+
+
+def _fit(
+    event: Dict[str, Any],
+    remaining: int,
+    encode: Callable,
+    counts: _Counts,
+    force: bool = False,
+) -> Tuple[Optional[str], int]:
+    """Fit one event into the remaining budget, trimming notes, then title.
+
+    Returns (text, size); text is None if it cannot fit. With `force` the
+    fully trimmed event is returned even when it is still over budget.
+    """
+    text, size = encode(event)
+    if size <= remaining:
+        return text, size
+    saved = dict(event)
+    notes_text, size, notes_trimmed = _trim(event, "notes", remaining, encode, size)
+    title_text, size, title_trimmed = _trim(
+        event, "title", remaining, encode, size, floor=ELLIPSIS
+    )
+    text = title_text or notes_text or text
+    if size <= remaining or force:
+        counts.notes += notes_trimmed
+        counts.titles += title_trimmed
+        if size > remaining:
+            counts.over_budget = True
+        return text, size
+    event.update(saved)
+    return None, size
+
+
+def _encode_row(event: Dict[str, Any], depth: int = 1) -> Tuple[str, int]:
+    text, size = _dumps(event, indent=2, separators=(",", ": "))
+    # リスト要素としてのインデント (safe_json_dumps の出力と一致させる)
+    pad = "  " * depth
+    text = pad + text.replace("\n", "\n" + pad)
+    return text, size + len(pad) * (1 + text.count("\n"))
+
+
+def encode_rows(
+    records: Sequence[EventRecord],
+    max_bytes: Optional[int] = None,
+    offset: int = 0,
+    check: Optional[Callable[[], None]] = None,
+    row: Optional[Callable[[EventRecord], Dict[str, Any]]] = None,
+    depth: int = 1,
+) -> Tuple[List[Dict[str, Any]], str]:
+    """Encode records as the default row list within a byte budget.
+
+    Returns the payload actually encoded (for logging) and its JSON text.
+    Without a budget the text equals ``safe_json_dumps`` of the row list.
+    `check` is called every few events and may raise to stop encoding.
+    `row` converts a record to its row (default: EventRecord.to_dict) and
+    `depth` is the nesting level of the list in the final document, so the
+    sizes stay exact when the list is embedded in a larger response.
+    """
+    total = len(records)
+    limit = max_bytes if max_bytes and max_bytes > 0 else None
+    open_, sep, close = "[\n", ",\n", "\n" + "  " * (depth - 1) + "]"
+    encode = functools.partial(_encode_row, depth=depth)
+    reserve = 0
+    if limit is not None:
+        reserve = len(sep) + encode(_reserve_marker())[1]
+
+    payload: List[Dict[str, Any]] = []
+    parts: List[str] = []
+    used = len(open_) + len(close)
+    counts = _Counts()
+    next_offset = None
+
+    for index in range(offset, total):
+        if check is not None and (index - offset) % CHECK_EVERY == 0:
+            check()
+        record = records[index]
+        event = record.to_dict() if row is None else row(record)
+        if limit is None:
+            text, size = encode(event)
+        else:
+            remaining = limit - reserve - used - (len(sep) if parts else 0)
+            text, size = _fit(event, remaining, encode, counts, force=not parts)
+            if text is None:
+                next_offset = index
+                break
+        payload.append(event)
+        parts.append(text)
+        used += size + (len(sep) if len(parts) > 1 else 0)
+        if counts.over_budget:
+            # 予算を超えたイベントは単独で返し、続きは次のページに回す
+            if index + 1 < total:
+                next_offset = index + 1
+            break
+
+    if next_offset is not None or counts:
+        marker = _marker(len(payload), total, counts, next_offset)
+        payload.append(marker)
+        parts.append(encode(marker)[0])
+
+    if not parts:
+        return payload, "[]"
+    return payload, open_ + sep.join(parts) + close
+
+
+def encode_batch(response: Dict[str, Any], encoded: Dict[str, str]) -> str:
+    """Encode a batch response around result lists that are already encoded.
+
+    `encoded` maps result keys to the text encode_rows returned for them
+    with depth=3; everything else is encoded here. The text has the same
+    layout as ``safe_json_dumps(response)``.
+    """
+    indent = {"indent": 2, "separators": (",", ": ")}
+    results = []
+    for key, value in response["results"].items():
+        text = encoded.get(key)
+        if text is None:
+            text = _dumps(value, **indent)[0].replace("\n", "\n    ")
+        results.append(f"    {_dumps(key)[0]}: {text}")
+    fields = [
+        '  "results": ' + ("{\n" + ",\n".join(results) + "\n  }" if results else "{}")
+    ]
+    for key, value in response.items():
+        if key != "results":
+            text = _dumps(value, **indent)[0].replace("\n", "\n  ")
+            fields.append(f"  {_dumps(key)[0]}: {text}")
+    return "{\n" + ",\n".join(fields) + "\n}"
+
+
+def encode_columnar(
+    records: Sequence[EventRecord],
+    max_bytes: Optional[int] = None,
+    offset: int = 0,
+    check: Optional[Callable[[], None]] = None,
+) -> Tuple[Dict[str, Any], str]:
+    """Encode records with formats.to_columnar within a byte budget.
+
+    The budget pass only measures how much each event adds to the columns;
+    the payload itself is built by to_columnar from the records that fit
+    (trimmed copies where notes or titles had to be shortened).
+    """
+    total = len(records)
+    limit = max_bytes if max_bytes and max_bytes > 0 else None
+    compact = {"separators": (",", ":")}
+    if limit is None:
+        payload = to_columnar(records[offset:] if offset else records)
+        return payload, _dumps(payload, **compact)[0]
+
+    calendars: Dict[str, int] = {}
+    base = to_columnar([])
+    base["count"] = _BIG
+    # マーカーのキーは payload に直接追加される ("{}" の分が "," を賄う)
+    used = _dumps(base, **compact)[1] + _dumps(_reserve_marker(), **compact)[1]
+
+    def encode_record(event):
+        # 各列に1要素 + カンマ1つずつ増える
+        size = 0
+        for field in base["fields"]:
+            value = event[field]
+            if field == "calendar":
+                value = calendars.get(value, len(calendars))
+            size += _dumps(value)[1] + 1
+        if event["calendar"] not in calendars:
+            size += _dumps(event["calendar"])[1] + 1
+        return "", size
+
+    fitted: List[EventRecord] = []
+    counts = _Counts()
+    next_offset = None
+    for index in range(offset, total):
+        if check is not None and (index - offset) % CHECK_EVERY == 0:
+            check()
+        record = records[index]
+        event = record.to_dict()
+        text, size = _fit(event, limit - used, encode_record, counts, not fitted)
+        if text is None:
+            next_offset = index
+            break
+        used += size
+        calendars.setdefault(event["calendar"], len(calendars))
+        if event["notes"] != record.notes or event["title"] != record.title:
+            record = _trimmed_copy(record, event["title"], event["notes"])
+        fitted.append(record)
+        if counts.over_budget:
+            if index + 1 < total:
+                next_offset = index + 1
+            break
+
+    payload = to_columnar(fitted)
+    if next_offset is not None or counts:
+        marker = _marker(payload["count"], total, counts, next_offset)
+        del marker["returned"]
+        payload.update(marker)
+    return payload, _dumps(payload, **compact)[0]
+
+
+def _trimmed_copy(record: EventRecord, title: str, notes: str) -> EventRecord:
+    return EventRecord(
+        record.identifier,
+        title,
+        record.start_ts,
+        record.end_ts,
+        record.calendar,
+        record.source,
+        notes,
+        record.all_day,
+        record.last_modified,
+        record.external_id,
+        record.organizer,
+    )
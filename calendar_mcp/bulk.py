@@ -0,0 +1,150 @@
+"""Bulk edits of calendar events saved with a single commit.
+
+Every change is staged with ``commit=False`` and the store is committed
+once at the end, instead of one commit (and one database write plus
+change notification) per event.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .records import NO_TITLE, format_timestamp
+
+# span 引数 -> EventKit の EKSpan 定数名
+BULK_SPANS = {"this": "EKSpanThisEvent", "future": "EKSpanFutureEvents"}
+
+# 1回の呼び出しで変更できるイベント数の上限
+MAX_BULK_EVENTS = 500
+
+Change = Callable[[Any], None]
+
+
+def objc_result(result) -> Tuple[bool, Optional[str]]:
+    """Normalise an EventKit ``...error:`` return value to (ok, error).
+
+    PyObjC returns (BOOL, NSError) for methods with an error out-parameter;
+    mocks and fakes may return a bare bool.
+    """
+    error = None
+    if isinstance(result, tuple):
+        result, error = result[0], result[1] if len(result) > 1 else None
+    return bool(result), str(error) if error is not None else None
+
+
+def update_change(
+    title: Optional[str] = None,
+    notes: Optional[str] = None,
+    calendar: Any = None,
+) -> Change:
+    """Return a change that sets the given fields."""
+
+    def change(event):
+        if title is not None:
+            event.setTitle_(title)
+        if notes is not None:
+            event.setNotes_(notes)
+        if calendar is not None:
+            event.setCalendar_(calendar)
+
+    return change
+
+
+def shift_change(seconds: float) -> Change:
+    """Return a change that moves an event by `seconds`, keeping its length."""
+
+    def change(event):
+        start, end = event.startDate(), event.endDate()
+        event.setStartDate_(start.dateByAddingTimeInterval_(seconds))
+        event.setEndDate_(end.dateByAddingTimeInterval_(seconds))
+
+    return change
+
+
+def series_heads(events: Iterable[Any]) -> List[Any]:
+    """Keep the first occurrence of each event identifier.
+
+    With the "future" span one save already covers every later occurrence of
+    a recurring event, so repeating it per occurrence would be wasted work.
+    """
+    seen = set()
+    heads = []
+    for event in events:
+        identifier = str(event.eventIdentifier() or "")
+        if identifier and identifier in seen:
+            continue
+        seen.add(identifier)
+        heads.append(event)
+    return heads
+
+
+def _item(event) -> Dict[str, Any]:
+    title = event.title()
+    return {
+        "id": str(event.eventIdentifier() or ""),
+        "title": str(title) if title else NO_TITLE,
+        "start": format_timestamp(event.startDate().timeIntervalSince1970()),
+    }
+
+
+def apply_bulk(
+    store,
+    events: List[Any],
+    span,
+    change: Optional[Change] = None,
+    atomic: bool = False,
+    missing: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """Stage a change (or removal when `change` is None) and commit once.
+
+    Returns per-item statuses. Items that could not be staged are reported
+    as failed and the rest is still committed, unless `atomic` is set, in
+    which case any failure discards every staged change.
+    """
+    status = "deleted" if change is None else "saved"
+    results: List[Dict[str, Any]] = []
+    for event in events:
+        try:
+            if change is None:
+                item = _item(event)
+                ok, error = objc_result(
+                    store.removeEvent_span_commit_error_(event, span, False, None)
+                )
+            else:
+                change(event)
+                item = _item(event)
+                ok, error = objc_result(
+                    store.saveEvent_span_commit_error_(event, span, False, None)
+                )
+        except Exception as e:
+            item = {"id": str(event.eventIdentifier() or "")}
+            ok, error = False, str(e)
+        item["status"] = status if ok else "failed"
+        if not ok:
+            item["error"] = error or "EventKit rejected the change"
+        results.append(item)
+    for identifier in missing:
+        results.append(
+            {"id": identifier, "status": "not_found", "error": "Event not found"}
+        )
+
+    staged = [item for item in results if item["status"] == status]
+    committed = False
+    if staged and atomic and len(staged) < len(results):
+        store.reset()
+        for item in staged:
+            item["status"] = "rolled_back"
+    elif staged:
+        committed, error = objc_result(store.commit_(None))
+        if not committed:
+            store.reset()
+            for item in staged:
+                item["status"] = "failed"
+                item["error"] = f"Commit failed: {error}"
+
+    succeeded = len(staged) if committed else 0
+    return {
+        "committed": committed,
+        "requested": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
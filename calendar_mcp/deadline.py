@@ -0,0 +1,83 @@
+"""Per-request deadlines and cooperative cancellation.
+
+Handlers run the fetch and conversion stages on worker threads, which
+cannot be interrupted. A RequestDeadline is shared with that work and
+checked between stages, between planner windows and every few events,
+so a request that timed out or was cancelled by the client stops doing
+work nobody will read.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# 変換ループで何件ごとに期限を確認するか
+CHECK_EVERY = 64
+
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+
+class RequestAbortedError(Exception):
+    """Raised inside request work once its deadline passed or it was cancelled."""
+
+    def __init__(self, stage: str, reason: str):
+        super().__init__(f"Request {reason.replace('_', ' ')} during {stage}")
+        self.stage = stage
+        self.reason = reason
+
+
+class RequestDeadline:
+    """Deadline plus cancellation flag for one request.
+
+    A timeout of None (or 0) means no deadline; the request can still be
+    cancelled.
+    """
+
+    __slots__ = ("expires_at", "reason")
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.expires_at = time.monotonic() + timeout if timeout else None
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.reason is None:
+            self.reason = reason
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self, stage: str):
+        """Raise RequestAbortedError if the request should stop."""
+        if self.reason is None and self.expires_at is not None:
+            if time.monotonic() >= self.expires_at:
+                self.reason = "deadline_exceeded"
+        if self.reason is not None:
+            raise RequestAbortedError(stage, self.reason)
+
+
+class AbortMetrics:
+    """Counts aborted requests and the work they had already done."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.aborted: Counter = Counter()
+        self.events_discarded = 0
+        self.windows_skipped = 0
+
+    def record(self, stage: str, reason: str, events: int = 0, windows: int = 0):
+        with self._lock:
+            self.aborted[f"{stage}:{reason}"] += 1
+            self.events_discarded += events
+            self.windows_skipped += windows
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "aborted": dict(self.aborted),
+                "total_aborted": sum(self.aborted.values()),
+                "events_discarded": self.events_discarded,
+                "windows_skipped": self.windows_skipped,
+            }
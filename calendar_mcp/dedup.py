@@ -0,0 +1,73 @@
+"""Collapse the same event appearing in several calendars.
+
+A meeting is often present in more than one account (an Exchange invite
+forwarded to iCloud, a shared calendar that is also subscribed). Records
+are fingerprinted by external identifier and start, and by title, start,
+end and organizer; records of different calendars sharing a fingerprint
+are folded into the first one, which then lists every source calendar.
+One dict lookup per fingerprint keeps the pass linear in event count.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .records import EventRecord
+
+
+class MergedRecord:
+    """A record standing for copies of one event in several calendars.
+
+    Wraps the first copy (which may be a series or detached record) and
+    delegates attribute access to it.
+    """
+
+    __slots__ = ("record", "calendars")
+
+    def __init__(self, record: EventRecord):
+        self.record = record
+        self.calendars = [record.calendar]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.record, name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self.record.to_dict()
+        result["calendars"] = list(self.calendars)
+        return result
+
+
+def fingerprints(record: EventRecord) -> Tuple[tuple, ...]:
+    """Return the keys under which copies of the record are recognised."""
+    fields = ("fields", record.title, record.start_ts, record.end_ts, record.organizer)
+    if record.external_id:
+        # 繰り返しイベントの各回は外部 ID を共有するので開始日時も含める
+        return (("external", record.external_id, record.start_ts), fields)
+    return (fields,)
+
+
+def dedupe_records(records: Sequence[EventRecord]) -> List[EventRecord]:
+    """Fold copies of the same event from different calendars.
+
+    Order is kept. Records of the same calendar are never folded, since a
+    calendar holding the same event twice is more likely two real entries.
+    """
+    result: List[EventRecord] = []
+    seen: Dict[tuple, int] = {}
+    for record in records:
+        keys = fingerprints(record)
+        index = next((seen[key] for key in keys if key in seen), None)
+        if index is not None:
+            kept = result[index]
+            calendars = (
+                kept.calendars if isinstance(kept, MergedRecord) else [kept.calendar]
+            )
+            if record.calendar not in calendars:
+                if not isinstance(kept, MergedRecord):
+                    kept = result[index] = MergedRecord(kept)
+                kept.calendars.append(record.calendar)
+                for key in keys:
+                    seen.setdefault(key, index)
+                continue
+        for key in keys:
+            seen.setdefault(key, len(result))
+        result.append(record)
+    return result
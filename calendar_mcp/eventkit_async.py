@@ -0,0 +1,69 @@
+"""Await EventKit completion-handler APIs from asyncio.
+
+EventKit methods such as ``requestAccessToEntityType_completion_`` and
+``fetchRemindersMatchingPredicate_completion_`` return immediately and
+later call a completion block on one of EventKit's own queues.
+``call_with_completion`` passes a block that hands the values back to the
+event loop, so callers can await the result with a timeout instead of
+blocking the loop.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# アクセス許可はユーザーの操作を待つ場合があるので長めにする
+ACCESS_TIMEOUT = 60.0
+FETCH_TIMEOUT = 30.0
+
+
+async def call_with_completion(
+    method: Callable,
+    *args: Any,
+    timeout: Optional[float] = FETCH_TIMEOUT,
+    cancel: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    """Call `method(*args, completion)` and await the completion values.
+
+    A completion called with one value resolves to that value, one called
+    with several (e.g. ``granted, error``) resolves to a tuple. On timeout
+    or cancellation, ``cancel`` is called with whatever the method
+    returned (such as a fetch request identifier) and TimeoutError /
+    CancelledError is raised.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(values):
+        if not future.done():
+            future.set_result(values[0] if len(values) == 1 else values)
+
+    def completion(*values):
+        # EventKit のキュー (別スレッド) から呼ばれる
+        try:
+            loop.call_soon_threadsafe(resolve, values)
+        except RuntimeError:
+            # ループ終了後に完了した場合は結果を捨てる
+            pass
+
+    handle = method(*args, completion)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        _cancel(cancel, handle)
+        name = getattr(method, "__name__", repr(method))
+        raise TimeoutError(f"{name} did not complete within {timeout}s") from None
+    except asyncio.CancelledError:
+        _cancel(cancel, handle)
+        raise
+
+
+def _cancel(cancel: Optional[Callable[[Any], None]], handle: Any):
+    if cancel is None or handle is None:
+        return
+    try:
+        cancel(handle)
+    except Exception as e:
+        logger.warning(f"Failed to cancel EventKit request: {e}")
@@ -0,0 +1,143 @@
+"""Streaming export of calendar events to NDJSON or iCalendar files."""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from .records import EventRecord
+
+EXPORT_FORMATS = ("ndjson", "ics")
+
+# 1回の EventKit 述語で取得する期間 (日)
+EXPORT_WINDOW_DAYS = 31
+
+
+def _ics_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Fold a content line at 75 octets as required by RFC 5545."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = b""
+    limit = 75
+    for char in line:
+        char_bytes = char.encode("utf-8")
+        if len(current) + len(char_bytes) > limit:
+            parts.append(current.decode("utf-8"))
+            current = b""
+            limit = 74  # 継続行は先頭の空白1文字分短くなる
+        current += char_bytes
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_utc(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ics_date(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y%m%d")
+
+
+def _ics_end_date(start_ts: float, end_ts: float) -> str:
+    """Exclusive DTEND for all-day events (EventKit ends them at 23:59:59)."""
+    start_day = datetime.fromtimestamp(start_ts).date()
+    last_day = datetime.fromtimestamp(max(end_ts - 1, start_ts)).date()
+    end_day = max(last_day, start_day) + timedelta(days=1)
+    return end_day.strftime("%Y%m%d")
+
+
+class EventExporter:
+    """Write events to a file chunk by chunk while hashing the output.
+
+    The file is written under a temporary name and moved into place by
+    close(), so a failed export never leaves a truncated archive behind.
+    """
+
+    def __init__(self, path: str, fmt: str = "ndjson"):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Invalid format '{fmt}', expected one of {EXPORT_FORMATS}"
+            )
+        self.path = path
+        self.format = fmt
+        self.count = 0
+        self.bytes = 0
+        self._hash = hashlib.sha256()
+        self._chunk: List[str] = []
+        self._tmp_path = f"{path}.part"
+        self._file = open(self._tmp_path, "wb")
+        self._dtstamp = _ics_utc(datetime.now(tz=timezone.utc).timestamp())
+        if fmt == "ics":
+            self._chunk.append(
+                "BEGIN:VCALENDAR\r\n"
+                "VERSION:2.0\r\n"
+                "PRODID:-//calendar-mcp//macOS Calendar MCP Server//EN\r\n"
+            )
+
+    def add(self, record: EventRecord):
+        """Queue one converted event for the current chunk."""
+        self.count += 1
+        if self.format == "ndjson":
+            self._chunk.append(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            return
+
+        start_ts, end_ts = record.start_ts, record.end_ts
+        uid = record.identifier or f"event-{self.count}"
+        lines = ["BEGIN:VEVENT", f"UID:{_ics_escape(uid)}"]
+        lines.append(f"DTSTAMP:{self._dtstamp}")
+        if record.all_day:
+            lines.append(f"DTSTART;VALUE=DATE:{_ics_date(start_ts)}")
+            lines.append(f"DTEND;VALUE=DATE:{_ics_end_date(start_ts, end_ts)}")
+        else:
+            lines.append(f"DTSTART:{_ics_utc(start_ts)}")
+            lines.append(f"DTEND:{_ics_utc(end_ts)}")
+        lines.append(f"SUMMARY:{_ics_escape(record.title)}")
+        if record.notes:
+            lines.append(f"DESCRIPTION:{_ics_escape(record.notes)}")
+        lines.append(f"CATEGORIES:{_ics_escape(record.calendar)}")
+        lines.append("END:VEVENT")
+        self._chunk.append("".join(_ics_fold(line) for line in lines))
+
+    def flush(self):
+        """Write the queued chunk to disk."""
+        if not self._chunk:
+            return
+        data = "".join(self._chunk).encode("utf-8")
+        self._chunk = []
+        self._hash.update(data)
+        self._file.write(data)
+        self.bytes += len(data)
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the file and return its path, event count and checksum."""
+        if self.format == "ics":
+            self._chunk.append("END:VCALENDAR\r\n")
+        self.flush()
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return {
+            "path": self.path,
+            "format": self.format,
+            "count": self.count,
+            "bytes": self.bytes,
+            "sha256": self._hash.hexdigest(),
+        }
+
+    def abort(self):
+        """Discard a partially written export."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
@@ -0,0 +1,75 @@
+"""Alternative response encodings for event lists."""
+
+from typing import Any, Dict, Iterable, List
+
+from .records import EventRecord
+
+RESPONSE_FORMATS = ("rows", "columnar")
+
+COLUMNAR_FIELDS = (
+    "title",
+    "start",
+    "end",
+    "calendar",
+    "notes",
+    "allDay",
+    "id",
+    "externalId",
+)
+
+
+def to_columnar(records: Iterable[EventRecord]) -> Dict[str, Any]:
+    """Encode records as a field list plus parallel arrays.
+
+    The calendar column holds indexes into the ``calendars`` list instead of
+    repeating each calendar name for every event.
+    """
+    titles: List[str] = []
+    starts: List[str] = []
+    ends: List[str] = []
+    calendar_ids: List[int] = []
+    notes: List[str] = []
+    all_day: List[bool] = []
+    identifiers: List[str] = []
+    external_ids: List[str] = []
+    calendars: Dict[str, int] = {}
+
+    for record in records:
+        titles.append(record.title)
+        starts.append(record.start)
+        ends.append(record.end)
+        index = calendars.get(record.calendar)
+        if index is None:
+            index = calendars[record.calendar] = len(calendars)
+        calendar_ids.append(index)
+        notes.append(record.notes)
+        all_day.append(record.all_day)
+        identifiers.append(record.identifier)
+        external_ids.append(record.external_id)
+
+    return {
+        "format": "columnar",
+        "count": len(titles),
+        "fields": list(COLUMNAR_FIELDS),
+        "calendars": list(calendars),
+        "columns": [
+            titles,
+            starts,
+            ends,
+            calendar_ids,
+            notes,
+            all_day,
+            identifiers,
+            external_ids,
+        ],
+    }
+
+
+def from_columnar(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode a columnar payload back into row dicts (mainly for clients/tests)."""
+    fields = payload["fields"]
+    columns = list(payload["columns"])
+    calendar_index = fields.index("calendar")
+    calendars = payload["calendars"]
+    columns[calendar_index] = [calendars[i] for i in columns[calendar_index]]
+    return [dict(zip(fields, values)) for values in zip(*columns)]
@@ -0,0 +1,82 @@
+"""Liveness, readiness and diagnostics.
+
+A supervisor needs more than an open port to decide whether to route
+traffic to an instance: whether EventKit is authorised, whether the store
+answers quickly, how warm the caches are, how deep the queue is and how
+slow recent calls were. The server collects those into one report (see
+CalendarMCPServer._diagnostics); readiness() reduces it to a yes/no with
+the reasons.
+"""
+
+import functools
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+# 直近何件の呼び出しからレイテンシを集計するか
+DEFAULT_LATENCY_WINDOW = 256
+
+# ストア応答確認 (カレンダー一覧の取得) の打ち切り時間 (秒)
+PROBE_TIMEOUT = 2.0
+
+# これより応答確認が遅いインスタンスは ready としない (ミリ秒)
+DEFAULT_READY_PROBE_MS = 500.0
+
+# EKAuthorizationStatus の値 (3 は macOS 14 で FullAccess に改名)
+AUTHORIZATION_STATUSES = {
+    0: "not_determined",
+    1: "restricted",
+    2: "denied",
+    3: "full_access",
+    4: "write_only",
+}
+
+
+def authorization_name(status: Any) -> str:
+    """Return a readable name for an EKAuthorizationStatus value."""
+    try:
+        return AUTHORIZATION_STATUSES.get(int(status), f"unknown ({status})")
+    except (TypeError, ValueError):
+        return f"unknown ({status})"
+
+
+class LatencyWindow:
+    """Latencies of the most recent handler calls, in milliseconds."""
+
+    def __init__(self, size: int = DEFAULT_LATENCY_WINDOW):
+        self._values: Deque[float] = deque(maxlen=max(1, size))
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """Return a handler whose wall time is recorded."""
+
+        @functools.wraps(fn)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._values.append((time.perf_counter() - started) * 1000)
+
+        return timed
+
+    def summary(self) -> Dict[str, Any]:
+        from .trace import latency_summary
+
+        return latency_summary(list(self._values))
+
+
+def readiness(report: Dict[str, Any], max_probe_ms: float) -> Tuple[bool, List[str]]:
+    """Decide from a diagnostics report whether to accept traffic."""
+    reasons = []
+    if report.get("draining"):
+        reasons.append("shutting down")
+    if not report.get("eventkit_available"):
+        reasons.append("EventKit not available")
+    elif report.get("authorization") != "full_access":
+        reasons.append(f"calendar access is {report.get('authorization')}")
+    probe = report.get("probe") or {}
+    if not probe.get("ok"):
+        reasons.append(f"store probe failed: {probe.get('error', 'not run')}")
+    elif max_probe_ms and probe["ms"] > max_probe_ms:
+        reasons.append(f"store probe took {probe['ms']} ms (limit {max_probe_ms} ms)")
+    return not reasons, reasons
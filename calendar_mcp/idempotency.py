@@ -0,0 +1,111 @@
+"""Idempotency keys for non-idempotent tools.
+
+A client that retries a timed-out create_macos_calendar_event call with
+the same key gets the original result back instead of a second event.
+Results are kept for a bounded time and count; a call arriving while the
+first one with its key is still running waits for that one.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+DEFAULT_IDEMPOTENCY_TTL = 600.0
+DEFAULT_MAX_KEYS = 1000
+
+
+class IdempotencyConflictError(Exception):
+    """The key was already used for a call with different arguments."""
+
+    def __init__(self, key: str):
+        super().__init__(
+            f"Idempotency key '{key}' was already used with different arguments"
+        )
+        self.key = key
+
+
+class IdempotencyStore:
+    """Bounded TTL map from idempotency key to result, with coalescing.
+
+    `call` returns (result, remember). Results with remember=False (e.g.
+    access denied) are handed to the calls waiting on them but not kept,
+    so a later retry runs again.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_IDEMPOTENCY_TTL,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._clock = clock
+        # key -> (期限, 引数の指紋, 結果)  挿入順 = 期限順
+        self._results: OrderedDict[str, Tuple[float, Hashable, Any]] = OrderedDict()
+        self._pending: Dict[str, Tuple[Hashable, asyncio.Future]] = {}
+        self.replayed = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._results)
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: Hashable,
+        call: Callable[[], Awaitable[Tuple[Any, bool]]],
+    ) -> Tuple[Any, bool]:
+        """Return (result, replayed) for the call identified by `key`."""
+        self._expire()
+        stored = self._results.get(key)
+        if stored is not None:
+            if stored[1] != fingerprint:
+                raise IdempotencyConflictError(key)
+            self.replayed += 1
+            return stored[2], True
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            if pending[0] != fingerprint:
+                raise IdempotencyConflictError(key)
+            self.coalesced += 1
+            result, _ = await asyncio.shield(pending[1])
+            return result, True
+
+        future = asyncio.ensure_future(call())
+        self._pending[key] = (fingerprint, future)
+        try:
+            # 呼び出し元がキャンセルされても保存処理は最後まで走らせる
+            result, remember = await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._pending.pop(key, None)
+            else:
+                future.add_done_callback(lambda f: self._finish(key, fingerprint, f))
+        if remember:
+            self._remember(key, fingerprint, result)
+        return result, False
+
+    def _finish(self, key: str, fingerprint: Hashable, future: asyncio.Future):
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            result, remember = future.result()
+            if remember:
+                self._remember(key, fingerprint, result)
+
+    def _remember(self, key: str, fingerprint: Hashable, result: Any):
+        self._results.pop(key, None)
+        self._results[key] = (self._clock() + self.ttl, fingerprint, result)
+        while len(self._results) > self.max_keys:
+            self._results.popitem(last=False)
+
+    def _expire(self):
+        now = self._clock()
+        while self._results:
+            key, (expires, _, _) = next(iter(self._results.items()))
+            if expires > now:
+                break
+            del self._results[key]
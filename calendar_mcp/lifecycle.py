@@ -0,0 +1,161 @@
+"""Graceful shutdown and configuration reload.
+
+On SIGTERM/SIGINT the server stops accepting new tool and resource calls,
+waits (up to a deadline) for the calls already running, and only then
+stops the transport and flushes the snapshot, trace and log pipeline.
+On SIGHUP it re-reads the tunables file and applies the values to the
+running server, so caches, pools and the snapshot stay warm.
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import signal
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DRAIN_TIMEOUT = 10.0
+
+CONFIG_FILE_ENV = "CALENDAR_MCP_CONFIG"
+
+# ドレイン後も開いている接続 (待ち受け中の SSE ストリームなど) を閉じるまでの猶予秒数
+HTTP_CLOSE_TIMEOUT = 5
+
+# SIGHUP で再読み込みできる設定とその型 (キーは CLI オプション名と同じ)
+TUNABLES: Dict[str, type] = {
+    "log_level": str,
+    "query_workers": int,
+    "max_response_bytes": int,
+    "request_timeout": float,
+    "snapshot_max_age": float,
+    "agenda_max_age": float,
+    "idempotency_ttl": float,
+    "max_concurrent_calls": int,
+    "max_queued_calls": int,
+    "queue_timeout": float,
+    "session_rate": float,
+    "session_burst": int,
+    "drain_timeout": float,
+    "ready_max_probe_ms": float,
+}
+
+
+def load_tunables(path: str) -> Dict[str, Any]:
+    """Read and validate a JSON object of tunables.
+
+    Raises ValueError for unknown keys or values of the wrong type, so a
+    typo in the file is reported instead of silently ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    tunables: Dict[str, Any] = {}
+    for key, value in data.items():
+        kind = TUNABLES.get(key)
+        if kind is None:
+            raise ValueError(f"{path}: unknown setting '{key}'")
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise ValueError(f"{path}: '{key}' must be {kind.__name__}")
+        tunables[key] = value
+    if "log_level" in tunables:
+        level = tunables["log_level"].upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"{path}: unknown log level '{tunables['log_level']}'")
+        tunables["log_level"] = level
+    return tunables
+
+
+class RequestDrain:
+    """Track in-flight handler calls and turn new ones away while draining."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self.rejected = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """Return a handler that is counted while it runs."""
+
+        @functools.wraps(fn)
+        async def tracked(*args, **kwargs):
+            if self.draining:
+                self.rejected += 1
+                logger.info(f"Rejected {name}: server is shutting down")
+                return json.dumps(
+                    {"error": "Server is shutting down", "reason": "draining"}
+                )
+            self.in_flight += 1
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.in_flight -= 1
+                if self.in_flight == 0 and self._idle is not None:
+                    self._idle.set()
+
+        return tracked
+
+    def start(self):
+        """Stop admitting new calls."""
+        self.draining = True
+
+    async def wait(self, timeout: Optional[float]) -> bool:
+        """Wait for in-flight calls to finish; False if the deadline passed."""
+        if self.in_flight == 0:
+            return True
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout or None)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "draining": self.draining,
+            "rejected": self.rejected,
+        }
+
+
+def install_signal_handlers(
+    loop: asyncio.AbstractEventLoop,
+    shutdown: Callable[[str], None],
+    reload: Callable[[], None],
+):
+    """Route SIGINT/SIGTERM to `shutdown(name)` and SIGHUP to `reload()`.
+
+    The callbacks run on the event loop, never inside the signal handler.
+    """
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, shutdown, sig.name)
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(signal.SIGHUP, reload)
+
+
+def http_server(app: Any, settings: Any) -> Any:
+    """Build the uvicorn server FastMCP would run, minus its signal handling.
+
+    SIGINT/SIGTERM stay with install_signal_handlers so the calls in flight
+    drain first; stop the server by setting its `should_exit` (and
+    `force_exit` to drop connections that are still open).
+    """
+    import uvicorn
+
+    config = uvicorn.Config(
+        app,
+        host=settings.host,
+        port=settings.port,
+        log_level=settings.log_level.lower(),
+        timeout_graceful_shutdown=HTTP_CLOSE_TIMEOUT,
+    )
+    server = uvicorn.Server(config)
+    # uvicorn は同じシグナルで即座に停止を始め、実行中の応答を打ち切ってしまう
+    server.capture_signals = contextlib.nullcontext
+    return server
@@ -0,0 +1,120 @@
+"""Queue-based logging so log I/O never blocks the event loop.
+
+Records are put on a bounded queue and written by a background
+QueueListener. When the queue is full the record is dropped and counted
+instead of waiting, so a slow stderr pipe or disk cannot stall requests.
+Formatting (including the JSON dumps in log_json_data) happens on the
+listener thread.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_LOG_FILE_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_FILE_BACKUPS = 3
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records (and counts them) when the queue is full."""
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 標準の prepare は呼び出し側スレッドでメッセージを整形してしまうため、
+        # 例外情報だけ先に文字列化し、本文の整形はリスナースレッドに任せる
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    """A bounded queue in front of the real log handlers."""
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.handlers = handlers
+        self.queue_handler = DroppingQueueHandler(queue_size)
+        self.listener = logging.handlers.QueueListener(
+            self.queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        self._loggers: List[logging.Logger] = []
+
+    def start(self, *loggers: logging.Logger):
+        """Route the given loggers (default: root) through the queue."""
+        self._loggers = list(loggers) or [logging.getLogger()]
+        for target in self._loggers:
+            for handler in list(target.handlers):
+                target.removeHandler(handler)
+            target.addHandler(self.queue_handler)
+        self.listener.start()
+
+    def stop(self):
+        """Drain the queue and write any later records directly."""
+        self.listener.stop()
+        for target in self._loggers:
+            target.removeHandler(self.queue_handler)
+            for handler in self.handlers:
+                target.addHandler(handler)
+        for handler in self.handlers:
+            handler.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue_handler.queue.qsize(),
+            "capacity": self.queue_handler.queue.maxsize,
+            "dropped": self.queue_handler.dropped,
+        }
+
+
+def setup_log_pipeline(
+    level: int = logging.INFO,
+    log_file: Optional[str] = None,
+    log_file_bytes: int = DEFAULT_LOG_FILE_BYTES,
+    log_file_backups: int = DEFAULT_LOG_FILE_BACKUPS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> LogPipeline:
+    """Send all logging through a background writer to stderr (and a file).
+
+    Replaces the handlers on the root logger; loggers that propagate (the
+    JSON data logger included) end up in the same queue.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(
+            logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=log_file_bytes,
+                backupCount=log_file_backups,
+                encoding="utf-8",
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    pipeline = LogPipeline(handlers, queue_size)
+    root = logging.getLogger()
+    root.setLevel(level)
+    pipeline.start(root)
+    return pipeline
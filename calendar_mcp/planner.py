@@ -0,0 +1,174 @@
+"""Split wide date ranges into fixed windows and fetch them concurrently."""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DAY_SECONDS = 86400
+
+# EventKit は約4年を超える述語の期間を切り詰めるため、窓はそれ未満にする
+MAX_PREDICATE_DAYS = 4 * 365
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_MAX_WORKERS = 4
+
+
+def split_range(
+    start_ts: float, end_ts: float, window_seconds: float
+) -> Iterator[Tuple[float, float]]:
+    """Yield consecutive [start, end) windows covering the given range."""
+    window_start = start_ts
+    while window_start < end_ts:
+        window_end = min(window_start + window_seconds, end_ts)
+        yield window_start, window_end
+        window_start = window_end
+
+
+class RangeQueryPlanner:
+    """Plan and run windowed fetches over a worker pool.
+
+    `fetch(start_ts, end_ts)` is called once per window and must return the
+    items overlapping that window. Results are yielded in window order; an
+    item that spans a boundary is kept only in the window where it starts
+    (`start_of(item)`), so the merged output matches a single-shot fetch.
+    """
+
+    def __init__(
+        self,
+        window_days: float = DEFAULT_WINDOW_DAYS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        if not 0 < window_days <= MAX_PREDICATE_DAYS:
+            raise ValueError(
+                f"window_days must be between 0 and {MAX_PREDICATE_DAYS}, "
+                f"got {window_days}"
+            )
+        self.window_seconds = window_days * DAY_SECONDS
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # プール毎の実行中の iter_windows の数 (入れ替え後の古いプールは 0 で停止する)
+        self._users: Dict[ThreadPoolExecutor, int] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, start_ts: float, end_ts: float) -> List[Tuple[float, float]]:
+        """Return the windows a fetch of [start_ts, end_ts) is split into."""
+        return list(split_range(start_ts, end_ts, self.window_seconds))
+
+    def iter_windows(
+        self,
+        fetch: Callable[[float, float], List[T]],
+        start_ts: float,
+        end_ts: float,
+        start_of: Callable[[T], float],
+        window_seconds: Optional[float] = None,
+    ) -> Iterator[List[T]]:
+        """Yield de-duplicated results window by window, in order.
+
+        At most `max_workers` windows are in flight, so consumers that
+        process each chunk before asking for the next keep memory bounded.
+        Closing the iterator early cancels windows that have not started.
+        """
+        windows = list(
+            split_range(start_ts, end_ts, window_seconds or self.window_seconds)
+        )
+        if self.max_workers == 1 or len(windows) <= 1:
+            for window in windows:
+                yield self._dedupe(window, fetch(*window), start_ts, start_of)
+            return
+
+        # 反復中に resize されても、最後まで同じプールと並列数を使う
+        max_workers = self.max_workers
+        executor = self._acquire_executor()
+        pending: Deque = deque()
+        try:
+            for window in windows:
+                pending.append((window, executor.submit(fetch, *window)))
+                if len(pending) >= max_workers:
+                    window, future = pending.popleft()
+                    yield self._dedupe(window, future.result(), start_ts, start_of)
+            while pending:
+                window, future = pending.popleft()
+                yield self._dedupe(window, future.result(), start_ts, start_of)
+        finally:
+            # 途中で打ち切られた場合、まだ始まっていない窓の取得は取り消す
+            for _, future in pending:
+                future.cancel()
+            self._release_executor(executor)
+
+    def fetch(
+        self,
+        fetch: Callable[[float, float], List[T]],
+        start_ts: float,
+        end_ts: float,
+        start_of: Callable[[T], float],
+    ) -> List[T]:
+        """Fetch a whole range and merge the windows into one ordered list."""
+        windows = self.plan(start_ts, end_ts)
+        if len(windows) <= 1:
+            return list(fetch(start_ts, end_ts))
+        result: List[T] = []
+        for chunk in self.iter_windows(fetch, start_ts, end_ts, start_of):
+            result.extend(chunk)
+        return result
+
+    def resize(self, max_workers: int):
+        """Change the pool size; running fetches finish on the old pool.
+
+        The old pool is shut down once the last iteration using it ends.
+        """
+        max_workers = max(1, max_workers)
+        with self._lock:
+            if max_workers == self.max_workers:
+                return
+            self.max_workers = max_workers
+            executor, self._executor = self._executor, None
+            if executor is not None and not self._users.get(executor):
+                self._users.pop(executor, None)
+                executor.shutdown(wait=False)
+
+    def shutdown(self):
+        """Stop the worker pool (it is recreated on next use)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if executor is not None and not self._users.get(executor):
+                self._users.pop(executor, None)
+            else:
+                executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _acquire_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="calendar-mcp-fetch",
+                )
+            executor = self._executor
+            self._users[executor] = self._users.get(executor, 0) + 1
+            return executor
+
+    def _release_executor(self, executor: ThreadPoolExecutor):
+        with self._lock:
+            self._users[executor] -= 1
+            if self._users[executor] or executor is self._executor:
+                return
+            del self._users[executor]
+        # 入れ替え済みのプールは最後の利用者が止める
+        executor.shutdown(wait=False)
+
+    @staticmethod
+    def _dedupe(
+        window: Tuple[float, float],
+        items: List[T],
+        range_start: float,
+        start_of: Callable[[T], float],
+    ) -> List[T]:
+        window_start = window[0]
+        if window_start <= range_start:
+            return list(items)
+        # 境界をまたぐ要素は開始した窓だけに残す
+        return [item for item in items if start_of(item) >= window_start]
@@ -0,0 +1,65 @@
+"""Event counts and response size estimates for a range.
+
+Answering "how much is in this range" should not cost as much as fetching
+it: only a small, evenly spaced sample of the events is converted and
+encoded, and the response sizes of the whole range are extrapolated from
+it using the same encoders get_macos_calendar_events uses.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from .budget import encode_columnar, encode_rows
+from .records import EventRecord
+
+# サイズ推定のために変換・エンコードするイベント数
+SAMPLE_SIZE = 32
+
+
+def sample_positions(total: int, size: int = SAMPLE_SIZE) -> List[int]:
+    """Return up to `size` evenly spaced indexes into a list of `total` items."""
+    if total <= size:
+        return list(range(total))
+    step = total / size
+    return [int(i * step) for i in range(size)]
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def estimate_sizes(sample: Sequence[EventRecord], total: int) -> Dict[str, int]:
+    """Extrapolate the unlimited response size of `total` events per format."""
+    sizes = {}
+    for fmt, encode in (("rows", encode_rows), ("columnar", encode_columnar)):
+        empty = _size(encode([])[1])
+        per_event = 0.0
+        if sample:
+            per_event = (_size(encode(sample)[1]) - empty) / len(sample)
+        sizes[fmt] = round(empty + per_event * total)
+    return sizes
+
+
+def count_summary(
+    counts: Dict[str, int],
+    sample: Sequence[EventRecord],
+    max_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build the count response from per-calendar counts and a sample.
+
+    With a response limit, estimated_responses is the number of calls
+    (offset continuations) needed to read the whole range in each format.
+    """
+    total = sum(counts.values())
+    sizes = estimate_sizes(sample, total)
+    result: Dict[str, Any] = {
+        "total": total,
+        "calendars": dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))),
+        "estimated_bytes": sizes,
+        "max_bytes": max_bytes or None,
+    }
+    if max_bytes and max_bytes > 0:
+        result["estimated_responses"] = {
+            fmt: max(math.ceil(size / max_bytes), 1) for fmt, size in sizes.items()
+        }
+    return result
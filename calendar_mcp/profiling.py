@@ -0,0 +1,175 @@
+"""Opt-in per-request profiling with cProfile and tracemalloc."""
+
+import asyncio
+import cProfile
+import functools
+import heapq
+import io
+import itertools
+import json
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILE_DIR_ENV = "CALENDAR_MCP_PROFILE_DIR"
+PROFILE_RATE_ENV = "CALENDAR_MCP_PROFILE_RATE"
+
+DEFAULT_KEEP = 20
+TOP_FUNCTIONS = 15
+
+
+def _short(value: Any, limit: int = 200) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats("cumulative")
+    top = []
+    for func in stats.fcn_list[:limit]:
+        _, calls, tottime, cumtime, _ = stats.stats[func]
+        top.append(
+            {
+                "function": pstats.func_std_string(func),
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+        )
+    return top
+
+
+def _remove_report(stem: str):
+    for path in (stem + ".prof", stem + ".json"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class RequestProfiler:
+    """Profile a sample of handler calls and keep the slowest ones.
+
+    Only one request is profiled at a time (cProfile and tracemalloc are
+    process-wide); sampled calls that arrive while another is being
+    profiled run unprofiled. Coroutines that run on the event loop while a
+    profiled handler awaits show up in its profile, and work done on
+    planner worker threads does not.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        sample_rate: float = 1.0,
+        keep: int = DEFAULT_KEEP,
+    ):
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "calendar-mcp-profiles"
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.sampled = 0
+        self.skipped_busy = 0
+        self._slowest: List = []
+        self._slowest_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._active = threading.Lock()
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """Return an async handler that profiles sampled calls to `fn`."""
+
+        @functools.wraps(fn)
+        async def profiled(*args, **kwargs):
+            if not self._should_sample():
+                return await fn(*args, **kwargs)
+            if not self._active.acquire(blocking=False):
+                self.skipped_busy += 1
+                return await fn(*args, **kwargs)
+            try:
+                return await self._run(name, fn, args, kwargs)
+            finally:
+                self._active.release()
+
+        return profiled
+
+    def slowest(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return reports for the slowest profiled requests, slowest first."""
+        with self._slowest_lock:
+            ranked = sorted(self._slowest, reverse=True)
+        reports = [report for _, _, report, _ in ranked]
+        return reports if limit is None else reports[:limit]
+
+    def _should_sample(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    async def _run(self, name, fn, args, kwargs):
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        profiler = cProfile.Profile()
+        started_at = time.time()
+        began = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 別のプロファイラ (カバレッジ計測など) が動いている
+            profiler = None
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - began
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self.sampled += 1
+            # 統計の集計とファイル書き込みはイベントループを止めないようにスレッドで行う
+            await asyncio.to_thread(
+                self._record, name, kwargs, started_at, wall, peak - baseline, profiler
+            )
+
+    def _record(self, name, kwargs, started_at, wall, peak, profiler):
+        """Write the report files and keep the report if it is among the slowest."""
+        seq = next(self._seq)
+        stamp = datetime.fromtimestamp(started_at).strftime("%Y%m%d-%H%M%S")
+        # リソース名は URI なのでファイル名に使えない文字を置き換える
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+        stem = os.path.join(self.directory, f"{stamp}-{seq:05d}-{label}")
+        report = {
+            "name": name,
+            "arguments": {key: _short(value) for key, value in kwargs.items()},
+            "started_at": datetime.fromtimestamp(started_at).isoformat(),
+            "wall_ms": round(wall * 1000, 3),
+            "peak_alloc_kib": round(peak / 1024, 1),
+            "profile": None,
+            "top": [],
+        }
+        if profiler is not None:
+            report["profile"] = stem + ".prof"
+            report["top"] = _top_functions(profiler, TOP_FUNCTIONS)
+            profiler.dump_stats(report["profile"])
+        with open(stem + ".json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        dropped = None
+        with self._slowest_lock:
+            heapq.heappush(self._slowest, (wall, seq, report, stem))
+            if len(self._slowest) > self.keep:
+                _, _, _, dropped = heapq.heappop(self._slowest)
+        if dropped is not None:
+            # 上位から外れたレポートのファイルは残さない
+            _remove_report(dropped)
@@ -0,0 +1,138 @@
+"""Compact in-memory representation of converted calendar events."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+NO_TITLE = "No Title"
+
+# カレンダー名・ソース名は数が限られるので共有する (上限付き)
+_NAME_POOL: Dict[str, str] = {}
+_NAME_POOL_LIMIT = 4096
+
+
+def intern_name(name: str) -> str:
+    """Return a shared instance of a calendar or source name."""
+    shared = _NAME_POOL.get(name)
+    if shared is not None:
+        return shared
+    if len(_NAME_POOL) >= _NAME_POOL_LIMIT:
+        _NAME_POOL.clear()
+    _NAME_POOL[name] = name
+    return name
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Format a timestamp the way NSDate describes itself (UTC, +0000)."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(
+        "%Y-%m-%d %H:%M:%S +0000"
+    )
+
+
+class EventRecord:
+    """A converted event.
+
+    Records keep timestamps instead of formatted strings and share calendar
+    and source names, so the caching and query layers can hold many more
+    events per megabyte. They are turned into dicts only at the response
+    boundary via to_dict().
+    """
+
+    __slots__ = (
+        "identifier",
+        "title",
+        "start_ts",
+        "end_ts",
+        "calendar",
+        "source",
+        "notes",
+        "all_day",
+        "last_modified",
+        "external_id",
+        "organizer",
+    )
+
+    def __init__(
+        self,
+        identifier: str,
+        title: str,
+        start_ts: float,
+        end_ts: float,
+        calendar: str,
+        source: str = "",
+        notes: str = "",
+        all_day: bool = False,
+        last_modified: Optional[float] = None,
+        external_id: str = "",
+        organizer: str = "",
+    ):
+        self.identifier = identifier
+        self.title = title
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.calendar = intern_name(calendar)
+        self.source = intern_name(source)
+        self.notes = notes
+        self.all_day = all_day
+        self.last_modified = last_modified
+        self.external_id = external_id
+        self.organizer = organizer
+
+    @classmethod
+    def from_event(cls, event) -> "EventRecord":
+        """Build a record from an EKEvent."""
+        title = event.title()
+        notes = event.notes()
+        calendar = event.calendar()
+        source = calendar.source()
+        modified = event.lastModifiedDate()
+        organizer = event.organizer()
+        return cls(
+            str(event.eventIdentifier() or ""),
+            str(title) if title else NO_TITLE,
+            float(event.startDate().timeIntervalSince1970()),
+            float(event.endDate().timeIntervalSince1970()),
+            str(calendar.title()),
+            str(source.title()) if source is not None else "",
+            str(notes) if notes else "",
+            bool(event.isAllDay()),
+            float(modified.timeIntervalSince1970()) if modified else None,
+            str(event.calendarItemExternalIdentifier() or ""),
+            str(organizer.URL() or organizer.name() or "") if organizer else "",
+        )
+
+    @property
+    def start(self) -> str:
+        return format_timestamp(self.start_ts)
+
+    @property
+    def end(self) -> str:
+        return format_timestamp(self.end_ts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON-friendly dict used in tool responses."""
+        return {
+            "title": self.title,
+            "start": self.start,
+            "end": self.end,
+            "calendar": self.calendar,
+            "notes": self.notes,
+            "allDay": self.all_day,
+            "id": self.identifier,
+            "externalId": self.external_id,
+        }
+
+    def _key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, EventRecord):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"EventRecord({self.title!r}, {self.start}, {self.calendar!r}, "
+            f"id={self.identifier!r})"
+        )
@@ -0,0 +1,160 @@
+"""Compact representation of recurring events.
+
+EventKit expands a recurring event into one EKEvent per occurrence. In
+"series" mode the occurrences of a series are folded into the record of
+its first occurrence in the range, which carries the recurrence rule and
+an occurrence count. Only detached (individually modified) occurrences
+are returned as records of their own.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .records import EventRecord, format_timestamp
+
+RECURRENCE_MODES = ("expand", "series")
+
+# EKRecurrenceFrequency -> RRULE FREQ
+_FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+# EKWeekday (1 = 日曜) -> RRULE BYDAY
+_WEEKDAYS = ("SU", "MO", "TU", "WE", "TH", "FR", "SA")
+
+
+def _numbers(values) -> str:
+    return ",".join(str(int(v)) for v in values)
+
+
+def format_rrule(rule) -> str:
+    """Format an EKRecurrenceRule as an RFC 5545 RRULE value."""
+    frequency = int(rule.frequency())
+    parts = [f"FREQ={_FREQUENCIES[frequency]}"]
+    interval = int(rule.interval())
+    if interval > 1:
+        parts.append(f"INTERVAL={interval}")
+
+    days = rule.daysOfTheWeek()
+    if days:
+        byday = []
+        for day in days:
+            week = int(day.weekNumber())
+            prefix = str(week) if week else ""
+            byday.append(prefix + _WEEKDAYS[int(day.dayOfTheWeek()) - 1])
+        parts.append("BYDAY=" + ",".join(byday))
+    if rule.daysOfTheMonth():
+        parts.append("BYMONTHDAY=" + _numbers(rule.daysOfTheMonth()))
+    if rule.monthsOfTheYear():
+        parts.append("BYMONTH=" + _numbers(rule.monthsOfTheYear()))
+
+    end = rule.recurrenceEnd()
+    if end is not None:
+        if end.endDate() is not None:
+            until = datetime.fromtimestamp(
+                end.endDate().timeIntervalSince1970(), tz=timezone.utc
+            )
+            parts.append(until.strftime("UNTIL=%Y%m%dT%H%M%SZ"))
+        elif end.occurrenceCount():
+            parts.append(f"COUNT={int(end.occurrenceCount())}")
+    return ";".join(parts)
+
+
+class SeriesRecord(EventRecord):
+    """First occurrence of a recurring event in the range, standing for all."""
+
+    __slots__ = ("rules", "occurrences", "last_start_ts", "exceptions")
+
+    def __init__(self, *args, rules: Optional[List[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rules = rules or []
+        self.occurrences = 1
+        self.last_start_ts = self.start_ts
+        self.exceptions: List[float] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result["recurrence"] = {
+            "rules": self.rules,
+            "occurrences": self.occurrences,
+            "lastStart": format_timestamp(self.last_start_ts),
+            "exceptions": [format_timestamp(ts) for ts in sorted(self.exceptions)],
+        }
+        return result
+
+
+class DetachedRecord(EventRecord):
+    """An occurrence that was modified separately from its series."""
+
+    __slots__ = ("occurrence_ts",)
+
+    def __init__(self, *args, occurrence_ts: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.occurrence_ts = occurrence_ts
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result["detached"] = True
+        result["occurrenceDate"] = (
+            format_timestamp(self.occurrence_ts)
+            if self.occurrence_ts is not None
+            else None
+        )
+        return result
+
+
+def _promote(record: EventRecord, cls, **extra) -> EventRecord:
+    values = {name: getattr(record, name) for name in EventRecord.__slots__}
+    return cls(**values, **extra)
+
+
+def _timestamp(date) -> Optional[float]:
+    return float(date.timeIntervalSince1970()) if date is not None else None
+
+
+class SeriesGrouper:
+    """Fold the occurrences of recurring events while converting a range.
+
+    Feed events in start order with add(); records() returns the result.
+    Later occurrences of a series already seen are only counted, so they
+    are never converted.
+    """
+
+    def __init__(self):
+        self._records: List[EventRecord] = []
+        self._series: Dict[str, SeriesRecord] = {}
+        # シリーズ本体より先に現れた分離済みオカレンスの元の日時
+        self._pending_exceptions: Dict[str, List[float]] = {}
+
+    def add(self, event):
+        identifier = str(event.eventIdentifier() or "")
+        if identifier and event.isDetached():
+            occurrence_ts = _timestamp(event.occurrenceDate())
+            record = EventRecord.from_event(event)
+            self._records.append(
+                _promote(record, DetachedRecord, occurrence_ts=occurrence_ts)
+            )
+            if occurrence_ts is not None:
+                series = self._series.get(identifier)
+                if series is not None:
+                    series.exceptions.append(occurrence_ts)
+                else:
+                    self._pending_exceptions.setdefault(identifier, []).append(
+                        occurrence_ts
+                    )
+            return
+
+        series = self._series.get(identifier) if identifier else None
+        if series is not None:
+            series.occurrences += 1
+            series.last_start_ts = float(event.startDate().timeIntervalSince1970())
+            return
+
+        record = EventRecord.from_event(event)
+        if identifier and event.hasRecurrenceRules():
+            rules = [format_rrule(rule) for rule in event.recurrenceRules() or []]
+            record = _promote(record, SeriesRecord, rules=rules)
+            record.exceptions.extend(self._pending_exceptions.pop(identifier, ()))
+            self._series[identifier] = record
+        self._records.append(record)
+
+    def records(self) -> List[EventRecord]:
+        return self._records
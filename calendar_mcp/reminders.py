@@ -0,0 +1,61 @@
+"""Conversion of EKReminder objects for tool responses."""
+
+from typing import Any, Dict, Optional
+
+from .records import NO_TITLE, format_timestamp
+
+REMINDER_STATUSES = ("incomplete", "completed", "all")
+
+# 日付範囲付きの述語 ("all" は predicateForRemindersInCalendars_ を使う)
+REMINDER_PREDICATES = {
+    "incomplete": (
+        "predicateForIncompleteRemindersWithDueDateStarting_ending_calendars_"
+    ),
+    "completed": (
+        "predicateForCompletedRemindersWithCompletionDateStarting_ending_calendars_"
+    ),
+}
+
+# NSDateComponents の未設定値 (NSUndefinedDateComponent == NSIntegerMax)
+_UNDEFINED = 0x7FFFFFFFFFFFFFFF
+
+
+def _component(components, name: str) -> Optional[int]:
+    value = getattr(components, name)()
+    return None if value is None or value == _UNDEFINED else int(value)
+
+
+def format_due(components) -> Optional[str]:
+    """Format reminder due date components as 'YYYY-MM-DD[ HH:MM]'."""
+    if components is None:
+        return None
+    year = _component(components, "year")
+    month = _component(components, "month")
+    day = _component(components, "day")
+    if year is None or month is None or day is None:
+        return None
+    due = f"{year:04d}-{month:02d}-{day:02d}"
+    hour = _component(components, "hour")
+    if hour is not None:
+        due += f" {hour:02d}:{_component(components, 'minute') or 0:02d}"
+    return due
+
+
+def reminder_to_dict(reminder) -> Dict[str, Any]:
+    """Return the JSON-friendly dict used in reminder tool responses."""
+    title = reminder.title()
+    notes = reminder.notes()
+    completed_at = reminder.completionDate()
+    return {
+        "title": str(title) if title else NO_TITLE,
+        "list": str(reminder.calendar().title()),
+        "due": format_due(reminder.dueDateComponents()),
+        "completed": bool(reminder.isCompleted()),
+        "completedAt": (
+            format_timestamp(completed_at.timeIntervalSince1970())
+            if completed_at
+            else None
+        ),
+        "priority": int(reminder.priority()),
+        "notes": str(notes) if notes else "",
+    }
@@ -1,17 +1,76 @@
 """Clean version of macOS Calendar MCP Server implementation."""
 
+import asyncio
+import contextlib
+import functools
 import json
-import locale
 import logging
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-from mcp.server import FastMCP
-from mcp.types import ToolAnnotations
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .agenda import AGENDA_VIEWS, DEFAULT_AGENDA_MAX_AGE, AgendaViews
+from .batch import (
+    MAX_BATCH_QUERIES,
+    duplicate_key,
+    merge_ranges,
+    parse_queries,
+    query_keys,
+)
+from .budget import (
+    DEFAULT_MAX_RESPONSE_BYTES,
+    encode_batch,
+    encode_columnar,
+    encode_rows,
+)
+from .bulk import (
+    BULK_SPANS,
+    MAX_BULK_EVENTS,
+    Change,
+    apply_bulk,
+    objc_result,
+    series_heads,
+    shift_change,
+    update_change,
+)
+from .deadline import (
+    CHECK_EVERY,
+    DEFAULT_REQUEST_TIMEOUT,
+    AbortMetrics,
+    RequestAbortedError,
+    RequestDeadline,
+)
+from .eventkit_async import ACCESS_TIMEOUT, FETCH_TIMEOUT, call_with_completion
+from .formats import RESPONSE_FORMATS, to_columnar
+from .health import (
+    DEFAULT_LATENCY_WINDOW,
+    DEFAULT_READY_PROBE_MS,
+    PROBE_TIMEOUT,
+    LatencyWindow,
+    authorization_name,
+    readiness,
+)
+from .idempotency import (
+    DEFAULT_IDEMPOTENCY_TTL,
+    IdempotencyConflictError,
+    IdempotencyStore,
+)
+from .planner import (
+    DAY_SECONDS,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_WINDOW_DAYS,
+    RangeQueryPlanner,
+)
+from .records import EventRecord
+from .recurrence import RECURRENCE_MODES, SeriesGrouper
 
 logger = logging.getLogger(__name__)
 
+# get_macos_calendar_event で一度に引ける ID の上限
+MAX_LOOKUP_IDS = 100
+
 # JSONデータのログ出力用ロガー
 json_logger = logging.getLogger(f"{__name__}.json_data")
 json_logger.setLevel(logging.INFO)
@@ -39,62 +98,201 @@ def safe_json_dumps(data: Any, **kwargs) -> str:
         return json.dumps(data, **fallback_kwargs)
 
 
+class _LazyJSON:
+    """ログ出力時まで JSON 化を遅らせる (キュー経由ならリスナースレッドで実行)"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        # 呼び出し側がログ出力後に変更しても、記録時点の内容を書き出す (浅いコピー)
+        self.data = data.copy() if isinstance(data, (dict, list)) else data
+
+    def __str__(self) -> str:
+        if not isinstance(self.data, (dict, list)):
+            return str(self.data)
+        try:
+            return safe_json_dumps(self.data)
+        except Exception as e:
+            return f"<unserializable {type(self.data).__name__}: {e}>"
+
+
 def log_json_data(data_type: str, data: Any, direction: str = ""):
     """JSON データをログ出力する"""
+    if not json_logger.isEnabledFor(logging.INFO):
+        return
     try:
-        if isinstance(data, (dict, list)):
-            json_str = safe_json_dumps(data)
-        else:
-            json_str = str(data)
-
         prefix = f"[{direction}] " if direction else ""
-        json_logger.info(f"{prefix}{data_type}:\n{json_str}")
+        json_logger.info("%s%s:\n%s", prefix, data_type, _LazyJSON(data))
     except Exception as e:
         json_logger.error(f"Failed to log {data_type}: {e}")
 
 
 def log_structured_response(operation: str, raw_data: Any, formatted_data: Any = None):
     """構造化されたレスポンスをサーバー側とクライアント側の両方の形式でログ出力する"""
+    if not json_logger.isEnabledFor(logging.INFO):
+        return
     try:
         # SERVER SIDE: Raw Response Structure
         json_logger.info(f"🔍 SERVER SIDE ({operation}): Raw Response Structure:")
-        if isinstance(raw_data, (dict, list)):
-            json_logger.info(safe_json_dumps(raw_data))
-        else:
-            json_logger.info(str(raw_data))
+        json_logger.info("%s", _LazyJSON(raw_data))
 
         # CLIENT SIDE: Formatted Response Structure (if provided)
         if formatted_data is not None:
             json_logger.info(f"🔍 CLIENT SIDE ({operation}): Formatted Response Structure:")
-            if isinstance(formatted_data, (dict, list)):
-                json_logger.info(safe_json_dumps(formatted_data))
-            else:
-                json_logger.info(str(formatted_data))
+            json_logger.info("%s", _LazyJSON(formatted_data))
     except Exception as e:
         json_logger.error(f"Failed to log structured response for {operation}: {e}")
 
 
-try:
-    import EventKit
-    import Foundation
+# EventKit / Foundation は初回利用時に読み込む (stdio 起動を速くするため)
+EventKit = None
+Foundation = None
+objc = None
+EVENTKIT_AVAILABLE: Optional[bool] = None
+
+
+def _load_eventkit() -> bool:
+    """EventKit と Foundation を遅延インポートし、利用可能かどうかを返す"""
+    global EventKit, Foundation, objc, EVENTKIT_AVAILABLE
+    if EVENTKIT_AVAILABLE is None:
+        try:
+            import EventKit as _EventKit
+            import Foundation as _Foundation
+            import objc as _objc
+
+            EventKit = _EventKit
+            Foundation = _Foundation
+            objc = _objc
+            EVENTKIT_AVAILABLE = True
+        except ImportError:
+            EVENTKIT_AVAILABLE = False
+    return bool(EVENTKIT_AVAILABLE)
+
+
+def _autorelease_pool():
+    """Scope Objective-C temporaries created by a block of EventKit work.
+
+    Worker threads have no pool of their own, and the event loop thread only
+    drains its pool when idle, so every fetch and conversion loop opens one.
+    Never hold a pool across an ``await``: pools must be drained in order on
+    the thread that opened them.
+    """
+    if objc is None:
+        return contextlib.nullcontext()
+    return objc.autorelease_pool()
 
-    EVENTKIT_AVAILABLE = True
-except ImportError:
-    EVENTKIT_AVAILABLE = False
+
+def _event_start(event) -> float:
+    return event.startDate().timeIntervalSince1970()
 
 
 class CalendarMCPServer:
     """MCP Server for macOS Calendar integration."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        lazy_init: bool = False,
+        snapshot_path: Optional[str] = None,
+        snapshot_max_age: float = 60.0,
+        export_dir: Optional[str] = None,
+        planner_window_days: float = DEFAULT_WINDOW_DAYS,
+        planner_workers: int = DEFAULT_MAX_WORKERS,
+        max_response_bytes: Optional[int] = DEFAULT_MAX_RESPONSE_BYTES,
+        profile_dir: Optional[str] = None,
+        profile_sample_rate: float = 0.0,
+        admission=None,
+        request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+        agenda_max_age: Optional[float] = DEFAULT_AGENDA_MAX_AGE,
+        trace_path: Optional[str] = None,
+        idempotency_ttl: float = DEFAULT_IDEMPOTENCY_TTL,
+        drain=None,
+        latency_window: int = DEFAULT_LATENCY_WINDOW,
+        ready_max_probe_ms: float = DEFAULT_READY_PROBE_MS,
+    ):
+        from mcp.server import FastMCP
+
         self.mcp = FastMCP("macOS Calendar MCP Server")
         self.event_store = None
+        self.lazy_init = lazy_init
+        self._store_initialized = False
+        # 許可済みのエンティティ種別 (拒否は毎回問い合わせ直す)
+        self._access_granted: Dict[Any, bool] = {}
+
+        self.export_dir = export_dir
+        # イベント一覧レスポンスの既定バイト上限 (None/0 で無制限)
+        self.max_response_bytes = max_response_bytes
+        self.planner = RangeQueryPlanner(
+            window_days=planner_window_days, max_workers=planner_workers
+        )
+
+        # 再起動後も変換済みイベントを再利用するためのスナップショット
+        self.snapshot = None
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot_tasks: Dict[Any, Any] = {}
+        if snapshot_path:
+            from .snapshot import EventSnapshot
+
+            self.snapshot = EventSnapshot(snapshot_path)
+
+        # 抽出したリクエストのプロファイル (無効時はハンドラをラップしない)
+        self.profiler = None
+        if profile_sample_rate > 0:
+            from .profiling import RequestProfiler
+
+            self.profiler = RequestProfiler(profile_dir, profile_sample_rate)
+
+        # 全リクエストの NDJSON トレース (replay_trace で再生する)
+        self.tracer = None
+        if trace_path:
+            from .trace import TraceRecorder
+
+            self.tracer = TraceRecorder(trace_path)
+
+        # HTTP トランスポート用の同時実行数とセッション毎のレート制限
+        # (AdmissionController)
+        self.admission = admission
+
+        # 停止時に実行中の呼び出しを待つための計数 (RequestDrain)
+        self.drain = drain
 
-        # EventKit の初期化
-        if EVENTKIT_AVAILABLE:
+        # readiness 判定と診断用: 直近の呼び出しのレイテンシ (0 で記録しない)
+        self.latency = LatencyWindow(latency_window) if latency_window else None
+        self.ready_max_probe_ms = ready_max_probe_ms
+        # 打ち切った応答確認もスレッドでは走り続けるので、終わるまで次を始めない
+        self._probe: Optional[asyncio.Future] = None
+        self.started_at = time.monotonic()
+
+        # リクエスト毎の既定の期限 (秒、None/0 で無制限) と打ち切り統計
+        self.request_timeout = request_timeout
+        self.abort_metrics = AbortMetrics()
+
+        # today / tomorrow / week の作成済みレスポンス (変更通知・日付変更で再作成)
+        self.agenda = AgendaViews(self._render_agenda, agenda_max_age)
+        self._store_observer = None
+
+        # 共有の event_store への書き込みを直列化する
+        # (一括編集は最初の保存から commit/reset まで保持する)
+        self._write_lock = threading.Lock()
+
+        # create_macos_calendar_event の再試行を吸収する idempotency_key -> 結果
+        self.idempotency = IdempotencyStore(idempotency_ttl)
+
+        # lazy_init の場合、EventKit ストアは最初のツール呼び出し時に作成する
+        if not lazy_init:
+            self._init_event_store()
+
+        self._setup_handlers()
+        self._setup_routes()
+        logger.info("MCP handlers have been set up")
+
+    def _init_event_store(self):
+        """EventKit の初期化"""
+        self._store_initialized = True
+        if _load_eventkit():
             logger.info("EventKit framework is available, initializing...")
             try:
                 self.event_store = EventKit.EKEventStore.alloc().init()
+                self._watch_store_changes()
                 logger.info("EventKit framework initialized successfully")
                 log_json_data(
                     "EVENTKIT INIT",
@@ -114,17 +312,185 @@ class CalendarMCPServer:
                 "SYSTEM",
             )
 
-        self._setup_handlers()
-        logger.info("MCP handlers have been set up")
+    def _watch_store_changes(self):
+        """Refresh the snapshot and agenda views on an EventKit store change."""
+        center = Foundation.NSNotificationCenter.defaultCenter()
+        # queue=None: 通知を送ったスレッドでブロックが実行される
+        self._store_observer = center.addObserverForName_object_queue_usingBlock_(
+            EventKit.EKEventStoreChangedNotification,
+            self.event_store,
+            None,
+            lambda notification: self._store_changed(),
+        )
+
+    def _store_changed(self):
+        """Drop everything derived from the store after an outside change."""
+        # 先にスナップショットを捨てる (再作成されるアジェンダが古い行を読まないように)
+        if self.snapshot is not None:
+            self.snapshot.invalidate()
+        self.agenda.invalidate()
+
+    def apply_tunables(self, tunables: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply reloadable settings in place; return the ones that changed.
+
+        Caches, the snapshot, session buckets and calls in progress are
+        kept. Keys the server does not own (e.g. log_level) are ignored.
+        """
+        changed: Dict[str, Any] = {}
+
+        def update(key, current, apply):
+            if key in tunables and tunables[key] != current:
+                apply(tunables[key])
+                changed[key] = tunables[key]
+
+        update("query_workers", self.planner.max_workers, self.planner.resize)
+        update(
+            "max_response_bytes",
+            self.max_response_bytes,
+            lambda v: setattr(self, "max_response_bytes", v),
+        )
+        update(
+            "request_timeout",
+            self.request_timeout,
+            lambda v: setattr(self, "request_timeout", v),
+        )
+        update(
+            "snapshot_max_age",
+            self.snapshot_max_age,
+            lambda v: setattr(self, "snapshot_max_age", v),
+        )
+        update(
+            "agenda_max_age",
+            self.agenda.max_age,
+            lambda v: setattr(self.agenda, "max_age", v),
+        )
+        update(
+            "idempotency_ttl",
+            self.idempotency.ttl,
+            lambda v: setattr(self.idempotency, "ttl", v),
+        )
+        update(
+            "ready_max_probe_ms",
+            self.ready_max_probe_ms,
+            lambda v: setattr(self, "ready_max_probe_ms", v),
+        )
+        if self.admission is not None:
+            limits = {
+                "max_concurrent_calls": "max_concurrent",
+                "max_queued_calls": "max_queued",
+                "queue_timeout": "queue_timeout",
+                "session_rate": "session_rate",
+                "session_burst": "session_burst",
+            }
+            for key, field in limits.items():
+                update(
+                    key,
+                    getattr(self.admission, field),
+                    lambda v, field=field: self.admission.configure(**{field: v}),
+                )
+
+        if changed:
+            log_json_data("SERVER RELOAD", changed, "SYSTEM")
+        return changed
+
+    async def aclose(self, timeout: Optional[float] = None):
+        """Finish background work and close the persistent stores.
+
+        Pending snapshot reconciliations get up to `timeout` seconds.
+        """
+        await self.agenda.close()
+        pending = list(self._snapshot_tasks.values())
+        if pending:
+            _, unfinished = await asyncio.wait(pending, timeout=timeout or None)
+            if unfinished:
+                logger.warning(
+                    f"Abandoning {len(unfinished)} snapshot reconciliation(s)"
+                )
+        if self._store_observer is not None:
+            center = Foundation.NSNotificationCenter.defaultCenter()
+            center.removeObserver_(self._store_observer)
+            self._store_observer = None
+        await asyncio.to_thread(self.planner.shutdown)
+        # 書き込み中のスレッドが残っている間は閉じない (コミット済みの内容は WAL にある)
+        if self.snapshot is not None and not self._snapshot_tasks:
+            self.snapshot.close()
+        if self.tracer is not None:
+            # 書き込みスレッドが残りの行を書き終えるのを待つ
+            await asyncio.to_thread(self.tracer.close)
+
+    def _ensure_event_store(self):
+        """Return the EventKit store, creating it on first use if needed."""
+        if not self._store_initialized and self.event_store is None:
+            self._init_event_store()
+        if not _load_eventkit():
+            return None
+        return self.event_store
+
+    def _handler_decorator(self, register, kind: str):
+        """Wrap mcp.tool / mcp.resource with profiling, admission and tracing."""
+        wrappers = (
+            self.profiler,
+            self.admission,
+            self.drain,
+            self.latency,
+            self.tracer,
+        )
+        if all(wrapper is None for wrapper in wrappers):
+            return register
+
+        def decorator_factory(*args, **kwargs):
+            decorate = register(*args, **kwargs)
+            label = kwargs.get("name") or (args[0] if args else None)
+
+            def decorator(fn):
+                name = label or fn.__name__
+                if self.profiler is not None:
+                    fn = self.profiler.wrap(name, fn)
+                if self.admission is not None:
+                    # 拒否された呼び出しはプロファイル対象にしない
+                    fn = self.admission.wrap(name, fn, self._session_key)
+                if self.drain is not None:
+                    # 待ち行列にいる呼び出しも実行中として数える
+                    fn = self.drain.wrap(name, fn)
+                if self.latency is not None:
+                    # クライアントから見た時間 (待ち行列での待ちを含む)
+                    fn = self.latency.wrap(name, fn)
+                if self.tracer is not None:
+                    # 待ち行列での待ちや拒否も含めて記録する
+                    fn = self.tracer.wrap(name, kind, fn)
+                return decorate(fn)
+
+            return decorator
+
+        return decorator_factory
+
+    def _session_key(self) -> str:
+        """Identify the MCP session of the current request."""
+        try:
+            context = self.mcp.get_context().request_context
+        except (LookupError, ValueError):
+            return "default"
+        request = context.request
+        if request is not None:
+            session_id = request.headers.get("mcp-session-id")
+            if session_id:
+                return session_id
+        return f"session-{id(context.session):x}"
 
     def _setup_handlers(self):
         """Setup MCP server handlers."""
+        from mcp.types import ToolAnnotations
+
+        tool = self._handler_decorator(self.mcp.tool, "tool")
+        resource = self._handler_decorator(self.mcp.resource, "resource")
 
-        @self.mcp.resource("calendar://events")
+        @resource("calendar://events")
         async def list_events():
             """List available calendar events."""
             log_json_data("RESOURCE REQUEST", {"uri": "calendar://events"}, "INCOMING")
-            events = await self._get_events()
+            events, response = await self._render_events(
+                max_bytes=self.max_response_bytes
+            )
 
             # 構造化ログ出力
             formatted_events = []
@@ -144,9 +510,9 @@ class CalendarMCPServer:
 
             log_structured_response("calendar://events", events, formatted_events)
             log_json_data("RESOURCE RESPONSE", events, "OUTGOING")
-            return safe_json_dumps(events)
+            return response
 
-        @self.mcp.resource("calendar://calendars")
+        @resource("calendar://calendars")
         async def list_calendars_resource():
             """List available calendars."""
             log_json_data(
@@ -172,7 +538,54 @@ class CalendarMCPServer:
             log_json_data("RESOURCE RESPONSE", calendars, "OUTGOING")
             return safe_json_dumps(calendars)
 
-        @self.mcp.tool(
+        @resource("calendar://agenda/{view}")
+        async def agenda_resource(view: str):
+            """Today's, tomorrow's or this week's events."""
+            uri = f"calendar://agenda/{view}"
+            log_json_data("RESOURCE REQUEST", {"uri": uri}, "INCOMING")
+            response = await self._get_agenda(view)
+            log_json_data(
+                "RESOURCE RESPONSE", {"uri": uri, "bytes": len(response)}, "OUTGOING"
+            )
+            return response
+
+        @tool(
+            name="get_macos_calendar_agenda",
+            description=(
+                "Get the events of today, tomorrow or the current week "
+                "(Monday to Sunday). These views are kept up to date by the "
+                "server and answered from memory, so prefer this tool over "
+                "get_macos_calendar_events for these ranges. The response has "
+                "the same shape as get_macos_calendar_events with "
+                "format='rows'.\n\n"
+                "Parameters:\n"
+                "- view (str, optional): 'today' (default), 'tomorrow' or "
+                "'week'.\n\n"
+                "The same views are available as the resources "
+                "calendar://agenda/today, calendar://agenda/tomorrow and "
+                "calendar://agenda/week."
+            ),
+            annotations=ToolAnnotations(
+                title="Get macOS Calendar Agenda",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def get_macos_calendar_agenda(view: str = "today") -> str:
+            """Get a precomputed agenda view."""
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "get_macos_calendar_agenda", "arguments": {"view": view}},
+                "INCOMING",
+            )
+            response = await self._get_agenda(view)
+            log_json_data(
+                "TOOL RESPONSE", {"view": view, "bytes": len(response)}, "OUTGOING"
+            )
+            return response
+
+        @tool(
             name="get_macos_calendar_events",
             description=(
                 "Retrieve calendar events from the macOS Calendar app within a "
@@ -191,7 +604,42 @@ class CalendarMCPServer:
                 "- calendar_name (str, optional): Filter events by specific "
                 "calendar name (case-sensitive). If not provided, events from "
                 "all available calendars will be returned. Use "
-                "list_macos_calendars to see available calendar names.\\n\\n"
+                "list_macos_calendars to see available calendar names.\\n"
+                "- format (str, optional): 'rows' (default) returns a list of "
+                "event objects. 'columnar' returns a compact object with a "
+                "'fields' list, parallel 'columns' arrays and a 'calendars' "
+                "list that the calendar column indexes into; prefer it for "
+                "ranges with many events.\\n"
+                "- max_bytes (int, optional): Upper bound on the response size "
+                "in bytes (defaults to the server limit, 0 for no limit). "
+                "Long notes (then titles) are trimmed first, then the list is "
+                "cut at an event boundary; a page always holds at least one "
+                "event ('over_budget': true if it alone exceeds the limit). "
+                "A cut response ends with (rows) or contains "
+                "(columnar) 'truncated': true and a 'continuation' object; "
+                "call again with the same arguments and "
+                "offset=continuation.offset to get the rest.\\n"
+                "- offset (int, optional): Number of events in the range to "
+                "skip, used to continue a truncated response.\\n"
+                "- timeout (float, optional): Seconds after which the server "
+                "stops working on the request and returns an error "
+                "(defaults to the server limit, 0 for no limit).\\n"
+                "- recurrence (str, optional): 'expand' (default) returns every "
+                "occurrence of recurring events. 'series' returns each series "
+                "once, at its first occurrence in the range, with a "
+                "'recurrence' object holding the RRULE 'rules', the number of "
+                "'occurrences' in the range, 'lastStart' and the original "
+                "dates of modified occurrences ('exceptions'); modified "
+                "occurrences are listed individually with 'detached': true. "
+                "Only with format='rows'.\\n"
+                "- dedupe (bool, optional): Collapse the same event found in "
+                "several calendars (same externalId and start, or same title, "
+                "start, end and organizer) into one event whose 'calendars' "
+                "lists every calendar it came from. Only with "
+                "format='rows'.\\n\\n"
+                "Each event includes 'id' (eventIdentifier) and 'externalId' "
+                "(calendarItemExternalIdentifier); pass either to "
+                "get_macos_calendar_event for follow-up questions.\\n\\n"
                 "Examples:\\n"
                 "- Get all events for the current week: "
                 "start_date='2024-09-19', end_date='2024-09-26'\\n"
@@ -207,23 +655,43 @@ class CalendarMCPServer:
             ),
         )
         async def get_macos_calendar_events(
-            start_date: str, end_date: str, calendar_name: str = None
+            start_date: str,
+            end_date: str,
+            calendar_name: str = None,
+            format: str = "rows",  # noqa: A002 - MCP argument name
+            max_bytes: int = None,
+            offset: int = 0,
+            timeout: float = None,
+            recurrence: str = "expand",
+            dedupe: bool = False,
         ) -> str:
             """Get macOS calendar events for a date range."""
             args = {
                 "start_date": start_date,
                 "end_date": end_date,
                 "calendar_name": calendar_name,
+                "format": format,
+                "max_bytes": max_bytes,
+                "offset": offset,
+                "timeout": timeout,
+                "recurrence": recurrence,
+                "dedupe": dedupe,
             }
             log_json_data(
                 "TOOL REQUEST",
                 {"name": "get_macos_calendar_events", "arguments": args},
                 "INCOMING",
             )
-            events = await self._get_events(
+            events, response = await self._render_events(
                 start_date=start_date,
                 end_date=end_date,
                 calendar_name=calendar_name,
+                response_format=format,
+                max_bytes=self.max_response_bytes if max_bytes is None else max_bytes,
+                offset=offset,
+                timeout=timeout,
+                recurrence=recurrence,
+                dedupe=dedupe,
             )
 
             # 構造化ログ出力
@@ -244,9 +712,257 @@ class CalendarMCPServer:
 
             log_structured_response("get_macos_calendar_events", events, formatted_events)
             log_json_data("TOOL RESPONSE", events, "OUTGOING")
+            return response
+
+        @tool(
+            name="get_macos_calendar_event",
+            description=(
+                "Fetch one or more macOS Calendar events by identifier, "
+                "without querying a date range. Use the 'id' or 'externalId' "
+                "values returned by get_macos_calendar_events.\n\n"
+                "Parameters:\n"
+                f"- event_ids (list of str): Up to {MAX_LOOKUP_IDS} event "
+                "identifiers or external identifiers.\n\n"
+                "Returns a JSON array in the order of event_ids. Each entry is "
+                "an event object as returned by get_macos_calendar_events, or "
+                "{'id', 'error'} for identifiers that were not found. For a "
+                "recurring event the first occurrence is returned."
+            ),
+            annotations=ToolAnnotations(
+                title="Get macOS Calendar Event",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def get_macos_calendar_event(event_ids: List[str]) -> str:
+            """Get macOS calendar events by identifier."""
+            log_json_data(
+                "TOOL REQUEST",
+                {
+                    "name": "get_macos_calendar_event",
+                    "arguments": {"event_ids": event_ids},
+                },
+                "INCOMING",
+            )
+            events = await self._lookup_events(event_ids)
+            log_json_data("TOOL RESPONSE", events, "OUTGOING")
             return safe_json_dumps(events)
 
-        @self.mcp.tool(
+        @tool(
+            name="batch_get_macos_calendar_events",
+            description=(
+                "Run several event queries in one call, e.g. today for Work, "
+                "this week for Family and next month for Holidays. Queries "
+                "with overlapping date ranges are fetched once and shared.\n\n"
+                "Parameters:\n"
+                f"- queries (list of objects, up to {MAX_BATCH_QUERIES}): Each "
+                "has 'start_date' and 'end_date' (YYYY-MM-DD) and optionally "
+                "'calendars' (list of calendar names, all by default), "
+                "'fields' (subset of title, start, end, calendar, notes, "
+                "allDay, id, externalId), 'key' (unique name for the result, "
+                "the query's position by default) and 'offset' (continue a "
+                "truncated result).\n\n"
+                "Returns {'results': {key: [events] or {'error'}}, 'queries', "
+                "'fetches'} where 'fetches' is the number of merged ranges "
+                "read from the calendar store. The response size limit is "
+                "shared evenly between the queries; a result cut short ends "
+                "with a {'truncated': true, ...} marker whose "
+                "continuation.offset is the 'offset' to re-run that query with."
+            ),
+            annotations=ToolAnnotations(
+                title="Batch Get macOS Calendar Events",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def batch_get_macos_calendar_events(
+            queries: List[Dict[str, Any]],
+        ) -> str:
+            """Get events for several ranges and calendars at once."""
+            log_json_data(
+                "TOOL REQUEST",
+                {
+                    "name": "batch_get_macos_calendar_events",
+                    "arguments": {"queries": queries},
+                },
+                "INCOMING",
+            )
+            result, text = await self._batch_events(queries)
+            log_json_data("TOOL RESPONSE", result, "OUTGOING")
+            return text
+
+        @tool(
+            name="summarize_macos_calendar_events",
+            description=(
+                "Summarize macOS Calendar events within a date range without "
+                "returning the individual events. Events are grouped by day, "
+                "ISO week or calendar and each group reports the number of "
+                "events, total busy minutes of timed events, the number of "
+                "all-day events and the longest timed event. Use this instead "
+                "of get_macos_calendar_events for questions like 'how many "
+                "hours of meetings did I have per day last month'.\n\n"
+                "Parameters:\n"
+                "- start_date (str): Start date in YYYY-MM-DD format.\n"
+                "- end_date (str): End date in YYYY-MM-DD format.\n"
+                "- group_by (str, optional): 'day' (default), 'week' or "
+                "'calendar'.\n"
+                "- calendar_name (str, optional): Only summarize events from "
+                "this calendar (case-sensitive).\n\n"
+                "Examples:\n"
+                "- Meeting hours per day: start_date='2024-09-01', "
+                "end_date='2024-10-01', group_by='day'\n"
+                "- Load per calendar: start_date='2024-07-01', "
+                "end_date='2024-10-01', group_by='calendar'"
+            ),
+            annotations=ToolAnnotations(
+                title="Summarize macOS Calendar Events",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def summarize_macos_calendar_events(
+            start_date: str,
+            end_date: str,
+            group_by: str = "day",
+            calendar_name: str = None,
+        ) -> str:
+            """Summarize macOS calendar events for a date range."""
+            args = {
+                "start_date": start_date,
+                "end_date": end_date,
+                "group_by": group_by,
+                "calendar_name": calendar_name,
+            }
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "summarize_macos_calendar_events", "arguments": args},
+                "INCOMING",
+            )
+            summary = await self._summarize_events(
+                start_date=start_date,
+                end_date=end_date,
+                group_by=group_by,
+                calendar_name=calendar_name,
+            )
+            log_json_data("TOOL RESPONSE", summary, "OUTGOING")
+            return safe_json_dumps(summary)
+
+        @tool(
+            name="count_macos_calendar_events",
+            description=(
+                "Count macOS Calendar events in a date range per calendar and "
+                "estimate how large get_macos_calendar_events responses for "
+                "it would be, without returning the events. Much cheaper "
+                "than fetching the range; use it first to choose a range, "
+                "calendar or format.\n\n"
+                "Parameters:\n"
+                "- start_date (str): Start date in YYYY-MM-DD format.\n"
+                "- end_date (str): End date in YYYY-MM-DD format.\n"
+                "- calendar_name (str, optional): Only count events from this "
+                "calendar (case-sensitive).\n\n"
+                "Returns 'total', 'calendars' (name -> count), "
+                "'estimated_bytes' for the 'rows' and 'columnar' formats, the "
+                "server's per-response limit 'max_bytes' and "
+                "'estimated_responses', the number of calls (offset "
+                "continuations) needed to read the whole range in each format."
+            ),
+            annotations=ToolAnnotations(
+                title="Count macOS Calendar Events",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def count_macos_calendar_events(
+            start_date: str,
+            end_date: str,
+            calendar_name: str = None,
+        ) -> str:
+            """Count macOS calendar events and estimate response sizes."""
+            args = {
+                "start_date": start_date,
+                "end_date": end_date,
+                "calendar_name": calendar_name,
+            }
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "count_macos_calendar_events", "arguments": args},
+                "INCOMING",
+            )
+            result = await self._count_events(start_date, end_date, calendar_name)
+            log_json_data("TOOL RESPONSE", result, "OUTGOING")
+            return safe_json_dumps(result)
+
+        @tool(
+            name="export_macos_calendar_events",
+            description=(
+                "Export macOS Calendar events within a date range to a file on "
+                "disk instead of returning them. Events are streamed in monthly "
+                "chunks, so very large ranges (a year or more) can be archived "
+                "without building one huge response. Returns only the file "
+                "path, the number of exported events, the file size and a "
+                "SHA-256 checksum.\n\n"
+                "Parameters:\n"
+                "- start_date (str): Start date in YYYY-MM-DD format.\n"
+                "- end_date (str): End date in YYYY-MM-DD format.\n"
+                "- format (str, optional): 'ndjson' (default, one JSON event "
+                "per line) or 'ics' (iCalendar).\n"
+                "- calendar_name (str, optional): Only export events from this "
+                "calendar (case-sensitive).\n"
+                "- output_path (str, optional): Destination file name, "
+                "resolved under the server's export directory. Paths that "
+                "point outside it are rejected.\n"
+                "- overwrite (bool, optional): Replace an existing file "
+                "(default false: an existing file is an error).\n\n"
+                "Examples:\n"
+                "- Archive last year: start_date='2023-01-01', "
+                "end_date='2024-01-01', format='ics'"
+            ),
+            annotations=ToolAnnotations(
+                title="Export macOS Calendar Events",
+                readOnlyHint=False,
+                destructiveHint=True,
+                idempotentHint=False,
+                openWorldHint=False,
+            ),
+        )
+        async def export_macos_calendar_events(
+            start_date: str,
+            end_date: str,
+            format: str = "ndjson",  # noqa: A002 - MCP argument name
+            calendar_name: str = None,
+            output_path: str = None,
+            overwrite: bool = False,
+        ) -> str:
+            """Export macOS calendar events for a date range to a file."""
+            args = {
+                "start_date": start_date,
+                "end_date": end_date,
+                "format": format,
+                "calendar_name": calendar_name,
+                "output_path": output_path,
+                "overwrite": overwrite,
+            }
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "export_macos_calendar_events", "arguments": args},
+                "INCOMING",
+            )
+            result = await self._export_events(
+                start_date=start_date,
+                end_date=end_date,
+                fmt=format,
+                calendar_name=calendar_name,
+                output_path=output_path,
+                overwrite=bool(overwrite),
+            )
+            log_json_data("TOOL RESPONSE", result, "OUTGOING")
+            return safe_json_dumps(result)
+
+        @tool(
             name="create_macos_calendar_event",
             description=(
                 "Create a new calendar event in the macOS Calendar app. This "
@@ -270,7 +986,12 @@ class CalendarMCPServer:
                 "calendars.\\n"
                 "- notes (str, optional): Additional notes or description "
                 "for the event. Can include details, location, or any other "
-                "relevant information. Max 1000 characters.\\n\\n"
+                "relevant information. Max 1000 characters.\\n"
+                "- idempotency_key (str, optional): A unique value (e.g. a "
+                "UUID) identifying this creation. Retrying with the same key "
+                "and arguments returns the original result instead of "
+                "creating a duplicate event; keys are remembered for "
+                f"{self.idempotency.ttl:g} seconds.\\n\\n"
                 "Examples:\\n"
                 "- Simple meeting: title='Team Meeting', "
                 "start_date='2024-09-20 10:00', end_date='2024-09-20 11:00'\\n"
@@ -291,6 +1012,7 @@ class CalendarMCPServer:
             end_date: str,
             calendar_name: str = None,
             notes: str = None,
+            idempotency_key: str = None,
         ) -> str:
             """Create a new macOS calendar event."""
             args = {
@@ -299,6 +1021,7 @@ class CalendarMCPServer:
                 "end_date": end_date,
                 "calendar_name": calendar_name,
                 "notes": notes,
+                "idempotency_key": idempotency_key,
             }
             log_json_data(
                 "TOOL REQUEST",
@@ -311,159 +1034,1682 @@ class CalendarMCPServer:
                 end_date=end_date,
                 calendar_name=calendar_name,
                 notes=notes,
+                idempotency_key=idempotency_key,
             )
             response = f"Event created successfully: {result}"
             log_json_data("TOOL RESPONSE", {"result": response}, "OUTGOING")
             return response
 
-        @self.mcp.tool(
-            name="list_macos_calendars",
+        bulk_selection_help = (
+            "Select events either by identifier or by date range:\n"
+            f"- event_ids (list of str, optional): Up to {MAX_BULK_EVENTS} "
+            "'id' or 'externalId' values from get_macos_calendar_events.\n"
+            "- start_date, end_date (str, optional): YYYY-MM-DD range; every "
+            "event in it is selected.\n"
+            "- calendar_name (str, optional): With a range, only select events "
+            "from this calendar.\n"
+            "- span (str, optional): 'this' (default) changes only the "
+            "selected occurrence of a recurring event; 'future' changes it "
+            "and all later occurrences (pass the first occurrence to change "
+            "a whole series).\n"
+            "- atomic (bool, optional): If true, nothing is saved unless "
+            "every selected event can be changed.\n\n"
+            "All changes are saved with one commit. Returns 'committed', "
+            "counts and a 'results' list with a status per event ('saved', "
+            "'deleted', 'failed', 'not_found' or 'rolled_back')."
+        )
+        bulk_annotations = {
+            "destructiveHint": True,
+            "idempotentHint": False,
+            "openWorldHint": False,
+        }
+
+        @tool(
+            name="update_macos_calendar_events",
             description=(
-                "List all available calendars in the macOS Calendar app. This "
-                "tool provides information about all calendar sources configured "
-                "on the system, including iCloud calendars, Exchange calendars, "
-                "Google calendars, and local calendars. Shows calendar properties "
-                "including whether they allow content modifications (event "
-                "creation/editing).\n\n"
-                "No parameters required.\n\n"
-                "Returns a JSON array of calendar objects with properties:\n"
-                "- title: Calendar display name\n"
-                "- identifier: Unique calendar identifier\n"
-                "- type: Calendar type (e.g., Local, CalDAV, Exchange)\n"
-                "- allowsContentModifications: Whether events can be created/edited"
+                "Update the title, notes or calendar of many macOS Calendar "
+                "events at once.\n\n"
+                "Parameters:\n"
+                "- title (str, optional): New title.\n"
+                "- notes (str, optional): New notes (empty string clears "
+                "them).\n"
+                "- new_calendar (str, optional): Move the events to this "
+                "calendar.\n" + bulk_selection_help
             ),
             annotations=ToolAnnotations(
-                title="List macOS Calendars",
-                readOnlyHint=True,
-                idempotentHint=True,
-                openWorldHint=False,
+                title="Update macOS Calendar Events", **bulk_annotations
             ),
         )
-        async def list_macos_calendars() -> str:
-            """List all available macOS calendars."""
+        async def update_macos_calendar_events(
+            event_ids: List[str] = None,
+            start_date: str = None,
+            end_date: str = None,
+            calendar_name: str = None,
+            title: str = None,
+            notes: str = None,
+            new_calendar: str = None,
+            span: str = "this",
+            atomic: bool = False,
+        ) -> str:
+            """Update many macOS calendar events."""
+            args = {
+                "event_ids": event_ids,
+                "start_date": start_date,
+                "end_date": end_date,
+                "calendar_name": calendar_name,
+                "title": title,
+                "notes": notes,
+                "new_calendar": new_calendar,
+                "span": span,
+                "atomic": atomic,
+            }
             log_json_data(
                 "TOOL REQUEST",
-                {"name": "list_macos_calendars", "arguments": {}},
+                {"name": "update_macos_calendar_events", "arguments": args},
                 "INCOMING",
             )
-            calendars = await self._get_calendars()
-
-            # 構造化ログ出力
-            formatted_calendars = []
-            if isinstance(calendars, list):
-                for calendar in calendars:
-                    if isinstance(calendar, dict) and "error" not in calendar:
-                        formatted_calendars.append({
-                            "title": calendar.get("title", "N/A"),
-                            "type": calendar.get("type", "N/A"),
-                            "identifier": calendar.get("identifier", "N/A"),
-                            "allowsContentModifications": calendar.get("allowsContentModifications", False)
-                        })
-                    else:
-                        formatted_calendars.append(calendar)
-
-            log_structured_response("list_macos_calendars", calendars, formatted_calendars)
-            log_json_data("TOOL RESPONSE", calendars, "OUTGOING")
-            return safe_json_dumps(calendars)
+            result = await self._update_events(
+                event_ids,
+                start_date,
+                end_date,
+                calendar_name,
+                title=title,
+                notes=notes,
+                new_calendar=new_calendar,
+                span=span,
+                atomic=atomic,
+            )
+            log_json_data("TOOL RESPONSE", result, "OUTGOING")
+            return safe_json_dumps(result)
 
-    async def _get_calendars(self) -> List[Dict[str, Any]]:
-        """Get list of calendars."""
-        if not EVENTKIT_AVAILABLE or not self.event_store:
+        @tool(
+            name="shift_macos_calendar_events",
+            description=(
+                "Reschedule many macOS Calendar events by the same offset, "
+                "keeping their durations. For example, move an off-site week "
+                "one day later with days=1.\n\n"
+                "Parameters:\n"
+                "- days (int, optional): Days to move (negative for earlier).\n"
+                "- minutes (int, optional): Minutes to move, added to days.\n"
+                + bulk_selection_help
+            ),
+            annotations=ToolAnnotations(
+                title="Shift macOS Calendar Events", **bulk_annotations
+            ),
+        )
+        async def shift_macos_calendar_events(
+            event_ids: List[str] = None,
+            start_date: str = None,
+            end_date: str = None,
+            calendar_name: str = None,
+            days: int = 0,
+            minutes: int = 0,
+            span: str = "this",
+            atomic: bool = False,
+        ) -> str:
+            """Move many macOS calendar events."""
+            args = {
+                "event_ids": event_ids,
+                "start_date": start_date,
+                "end_date": end_date,
+                "calendar_name": calendar_name,
+                "days": days,
+                "minutes": minutes,
+                "span": span,
+                "atomic": atomic,
+            }
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "shift_macos_calendar_events", "arguments": args},
+                "INCOMING",
+            )
+            result = await self._shift_events(
+                event_ids,
+                start_date,
+                end_date,
+                calendar_name,
+                days=days,
+                minutes=minutes,
+                span=span,
+                atomic=atomic,
+            )
+            log_json_data("TOOL RESPONSE", result, "OUTGOING")
+            return safe_json_dumps(result)
+
+        @tool(
+            name="delete_macos_calendar_events",
+            description=(
+                "Delete many macOS Calendar events at once, e.g. every "
+                "occurrence of a cancelled series (span='future' with the "
+                "series' first occurrence).\n\n"
+                "Parameters:\n" + bulk_selection_help
+            ),
+            annotations=ToolAnnotations(
+                title="Delete macOS Calendar Events", **bulk_annotations
+            ),
+        )
+        async def delete_macos_calendar_events(
+            event_ids: List[str] = None,
+            start_date: str = None,
+            end_date: str = None,
+            calendar_name: str = None,
+            span: str = "this",
+            atomic: bool = False,
+        ) -> str:
+            """Delete many macOS calendar events."""
+            args = {
+                "event_ids": event_ids,
+                "start_date": start_date,
+                "end_date": end_date,
+                "calendar_name": calendar_name,
+                "span": span,
+                "atomic": atomic,
+            }
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "delete_macos_calendar_events", "arguments": args},
+                "INCOMING",
+            )
+            result = await self._bulk_edit(
+                "delete_events",
+                event_ids,
+                start_date,
+                end_date,
+                calendar_name,
+                span=span,
+                atomic=atomic,
+            )
+            log_json_data("TOOL RESPONSE", result, "OUTGOING")
+            return safe_json_dumps(result)
+
+        @tool(
+            name="list_macos_calendars",
+            description=(
+                "List all available calendars in the macOS Calendar app. This "
+                "tool provides information about all calendar sources configured "
+                "on the system, including iCloud calendars, Exchange calendars, "
+                "Google calendars, and local calendars. Shows calendar properties "
+                "including whether they allow content modifications (event "
+                "creation/editing).\n\n"
+                "No parameters required.\n\n"
+                "Returns a JSON array of calendar objects with properties:\n"
+                "- title: Calendar display name\n"
+                "- identifier: Unique calendar identifier\n"
+                "- type: Calendar type (e.g., Local, CalDAV, Exchange)\n"
+                "- allowsContentModifications: Whether events can be created/edited"
+            ),
+            annotations=ToolAnnotations(
+                title="List macOS Calendars",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def list_macos_calendars() -> str:
+            """List all available macOS calendars."""
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "list_macos_calendars", "arguments": {}},
+                "INCOMING",
+            )
+            calendars = await self._get_calendars()
+
+            # 構造化ログ出力
+            formatted_calendars = []
+            if isinstance(calendars, list):
+                for calendar in calendars:
+                    if isinstance(calendar, dict) and "error" not in calendar:
+                        formatted_calendars.append({
+                            "title": calendar.get("title", "N/A"),
+                            "type": calendar.get("type", "N/A"),
+                            "identifier": calendar.get("identifier", "N/A"),
+                            "allowsContentModifications": calendar.get("allowsContentModifications", False)
+                        })
+                    else:
+                        formatted_calendars.append(calendar)
+
+            log_structured_response("list_macos_calendars", calendars, formatted_calendars)
+            log_json_data("TOOL RESPONSE", calendars, "OUTGOING")
+            return safe_json_dumps(calendars)
+
+        @tool(
+            name="get_macos_reminders",
+            description=(
+                "Retrieve reminders from the macOS Reminders app. Reminders are "
+                "fetched asynchronously, so the request does not block other "
+                "calls while the system gathers them.\n\n"
+                "Parameters:\n"
+                "- list_name (str, optional): Only return reminders from this "
+                "list (case-sensitive). All lists by default.\n"
+                "- status (str, optional): 'incomplete' (default), 'completed' "
+                "or 'all'.\n"
+                "- start_date (str, optional): YYYY-MM-DD lower bound on the due "
+                "date (incomplete) or completion date (completed).\n"
+                "- end_date (str, optional): YYYY-MM-DD upper bound, as above. "
+                "Dates are ignored for status='all'.\n\n"
+                "Returns a JSON array of reminders with title, list, due "
+                "('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM'), completed, completedAt, "
+                "priority and notes."
+            ),
+            annotations=ToolAnnotations(
+                title="Get macOS Reminders",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def get_macos_reminders(
+            list_name: str = None,
+            status: str = "incomplete",
+            start_date: str = None,
+            end_date: str = None,
+        ) -> str:
+            """Get reminders from the macOS Reminders app."""
+            args = {
+                "list_name": list_name,
+                "status": status,
+                "start_date": start_date,
+                "end_date": end_date,
+            }
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "get_macos_reminders", "arguments": args},
+                "INCOMING",
+            )
+            reminders = await self._get_reminders(
+                list_name=list_name,
+                status=status,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            log_json_data("TOOL RESPONSE", reminders, "OUTGOING")
+            return safe_json_dumps(reminders)
+
+        # 混雑・停止中にも状態を確認できるよう、受付制御の対象外にする
+        @self.mcp.tool(
+            name="get_macos_calendar_diagnostics",
+            description=(
+                "Report the health of this server: calendar authorization "
+                "status, the latency of a lightweight EventKit probe, cache "
+                "warmth, queue depth and recent request latency (p95), plus "
+                "whether the instance is ready for traffic and why not."
+            ),
+            annotations=ToolAnnotations(
+                title="Get Calendar Server Diagnostics",
+                readOnlyHint=True,
+                idempotentHint=False,
+                openWorldHint=False,
+            ),
+        )
+        async def get_macos_calendar_diagnostics() -> str:
+            """Return the diagnostics report."""
+            log_json_data(
+                "TOOL REQUEST",
+                {"name": "get_macos_calendar_diagnostics", "arguments": {}},
+                "INCOMING",
+            )
+            report = await self._diagnostics()
+            log_json_data("TOOL RESPONSE", report, "OUTGOING")
+            return safe_json_dumps(report)
+
+        if self.admission is not None:
+            # 混雑時にも状況を確認できるよう、受付制御の対象外にする
+            @self.mcp.tool(
+                name="get_admission_stats",
+                description=(
+                    "Report admission control state: calls running and "
+                    "waiting, the configured limits, and per-session counters "
+                    "of admitted calls and of calls rejected as busy or rate "
+                    "limited. No parameters required."
+                ),
+                annotations=ToolAnnotations(
+                    title="Get Admission Stats",
+                    readOnlyHint=True,
+                    idempotentHint=False,
+                    openWorldHint=False,
+                ),
+            )
+            async def get_admission_stats() -> str:
+                """Return admission control counters."""
+                log_json_data(
+                    "TOOL REQUEST",
+                    {"name": "get_admission_stats", "arguments": {}},
+                    "INCOMING",
+                )
+                stats = self.admission.stats()
+                log_json_data("TOOL RESPONSE", stats, "OUTGOING")
+                return safe_json_dumps(stats)
+
+        if self.profiler is None:
+            return
+
+        @self.mcp.tool(
+            name="get_slowest_profiled_requests",
+            description=(
+                "Debug tool, available only when the server runs with profiling "
+                "enabled. Returns the slowest sampled requests with wall time, "
+                "tracemalloc peak allocation, the path of the cProfile dump and "
+                "the top functions by cumulative time.\n\n"
+                "Parameters:\n"
+                "- limit (int, optional): Number of requests to return "
+                "(default 10)."
+            ),
+            annotations=ToolAnnotations(
+                title="Get Slowest Profiled Requests",
+                readOnlyHint=True,
+                idempotentHint=True,
+                openWorldHint=False,
+            ),
+        )
+        async def get_slowest_profiled_requests(limit: int = 10) -> str:
+            """Return the slowest profiled requests."""
+            log_json_data(
+                "TOOL REQUEST",
+                {
+                    "name": "get_slowest_profiled_requests",
+                    "arguments": {"limit": limit},
+                },
+                "INCOMING",
+            )
+            report = {
+                "directory": self.profiler.directory,
+                "sample_rate": self.profiler.sample_rate,
+                "sampled": self.profiler.sampled,
+                "skipped_busy": self.profiler.skipped_busy,
+                "requests": self.profiler.slowest(max(limit, 0)),
+            }
+            log_json_data("TOOL RESPONSE", report, "OUTGOING")
+            return safe_json_dumps(report)
+
+    def _setup_routes(self):
+        """Add /healthz (liveness) and /readyz (readiness) to HTTP transports."""
+        from starlette.responses import JSONResponse
+
+        @self.mcp.custom_route("/healthz", methods=["GET"])
+        async def healthz(request):
+            # イベントループが応答していれば生存とみなす (EventKit には触れない)
+            uptime = round(time.monotonic() - self.started_at, 3)
+            return JSONResponse({"status": "ok", "uptime_s": uptime})
+
+        @self.mcp.custom_route("/readyz", methods=["GET"])
+        async def readyz(request):
+            report = await self._diagnostics()
+            return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+    async def _diagnostics(self) -> Dict[str, Any]:
+        """Collect authorization, store probe, cache, queue and latency state."""
+        store = self._ensure_event_store()
+        report: Dict[str, Any] = {
+            "eventkit_available": store is not None,
+            "authorization": None,
+            "probe": None,
+            "uptime_s": round(time.monotonic() - self.started_at, 3),
+            "draining": bool(self.drain and self.drain.draining),
+        }
+        if store is not None:
+            report["authorization"] = authorization_name(
+                EventKit.EKEventStore.authorizationStatusForEntityType_(
+                    EventKit.EKEntityTypeEvent
+                )
+            )
+            report["probe"] = await self._probe_store(store)
+
+        report["cache"] = {
+            "agenda": self.agenda.stats(),
+            "snapshot": self.snapshot.stats() if self.snapshot else None,
+            "idempotency_keys": len(self.idempotency),
+        }
+        queue: Dict[str, Any] = {
+            "in_flight": self.drain.in_flight if self.drain else None,
+        }
+        if self.admission is not None:
+            queue["active"] = self.admission.active
+            queue["waiting"] = self.admission.waiting
+            queue["max_concurrent"] = self.admission.max_concurrent
+        report["queue"] = queue
+        report["latency"] = self.latency.summary() if self.latency else None
+        report["aborts"] = self.abort_metrics.as_dict()
+
+        ready, reasons = readiness(report, self.ready_max_probe_ms)
+        report["ready"] = ready
+        report["reasons"] = reasons
+        return report
+
+    async def _probe_store(self, store) -> Dict[str, Any]:
+        """Time a calendar list fetch, the cheapest call that hits the store.
+
+        A probe that timed out keeps its worker thread until the store
+        answers; until then no new probe is started and the store is
+        reported as failing.
+        """
+
+        def probe() -> int:
+            with _autorelease_pool():
+                return len(store.calendarsForEntityType_(EventKit.EKEntityTypeEvent))
+
+        if self._probe is not None and not self._probe.done():
+            return {"ok": False, "error": "previous probe still running"}
+        started = time.perf_counter()
+        self._probe = asyncio.ensure_future(asyncio.to_thread(probe))
+        try:
+            # shield: 時間切れでもタスクをスレッドの終了まで残し、
+            # 次の呼び出しで実行中かどうかを判定できるようにする
+            calendars = await asyncio.wait_for(
+                asyncio.shield(self._probe), PROBE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"no answer within {PROBE_TIMEOUT}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        ms = round((time.perf_counter() - started) * 1000, 3)
+        return {"ok": True, "ms": ms, "calendars": calendars}
+
+    async def _get_calendars(self) -> List[Dict[str, Any]]:
+        """Get list of calendars."""
+        if not self._ensure_event_store():
+            return [{"error": "EventKit not available"}]
+
+        try:
+            result = []
+            with _autorelease_pool():
+                calendars = self.event_store.calendarsForEntityType_(
+                    EventKit.EKEntityTypeEvent
+                )
+                for calendar in calendars:
+                    result.append(
+                        {
+                            "title": str(calendar.title()),
+                            "identifier": str(calendar.calendarIdentifier()),
+                            "type": str(calendar.type()),
+                            "allowsContentModifications": bool(
+                                calendar.allowsContentModifications()
+                            ),
+                        }
+                    )
+            logger.info(f"Successfully retrieved {len(result)} calendars")
+            return result
+        except Exception as e:
+            error_msg = f"Failed to get calendars: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "CALENDAR ERROR",
+                {"operation": "get_calendars", "error": str(e)},
+                "ERROR",
+            )
+            return [{"error": error_msg}]
+
+    def _date_range(self, start_date: Optional[str], end_date: Optional[str]):
+        """Convert YYYY-MM-DD strings to timestamps (default: next 7 days)."""
+        now = time.time()
+        if not start_date:
+            start_ts = now
+        else:
+            start_ts = datetime.strptime(start_date, "%Y-%m-%d").timestamp()
+
+        if not end_date:
+            end_ts = now + 7 * 24 * 60 * 60
+        else:
+            end_ts = datetime.strptime(end_date, "%Y-%m-%d").timestamp()
+        return start_ts, end_ts
+
+    def _fetch_events(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        calendar_name: Optional[str] = None,
+    ) -> List[Any]:
+        """Fetch raw EKEvent objects for a date range and optional calendar.
+
+        Ranges wider than one planner window are split and fetched
+        concurrently, then merged back into start order.
+        """
+        start_ts, end_ts = self._date_range(start_date, end_date)
+        return self.planner.fetch(
+            lambda ws, we: self._query_events(ws, we, calendar_name),
+            start_ts,
+            end_ts,
+            _event_start,
+        )
+
+    def _query_events(
+        self,
+        start_ts: float,
+        end_ts: float,
+        calendar_name: Optional[str] = None,
+        calendars: Optional[List[Any]] = None,
+    ) -> List[Any]:
+        """Run one EventKit predicate query between two timestamps.
+
+        Pass already resolved `calendars` to skip enumerating them again.
+        The returned proxies keep their events alive after the pool drains.
+        """
+        store = self.event_store
+        with _autorelease_pool():
+            if calendars is None:
+                calendars = store.calendarsForEntityType_(EventKit.EKEntityTypeEvent)
+            predicate = store.predicateForEventsWithStartDate_endDate_calendars_(
+                Foundation.NSDate.dateWithTimeIntervalSince1970_(start_ts),
+                Foundation.NSDate.dateWithTimeIntervalSince1970_(end_ts),
+                calendars,
+            )
+            events = store.eventsMatchingPredicate_(predicate)
+            if not calendar_name:
+                return list(events)
+            return [e for e in events if str(e.calendar().title()) == calendar_name]
+
+    async def _get_events(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        calendar_name: Optional[str] = None,
+        response_format: str = "rows",
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Get calendar events as row dicts or a columnar payload."""
+        if response_format not in RESPONSE_FORMATS:
+            return [
+                {
+                    "error": f"Invalid format '{response_format}', "
+                    f"expected one of {RESPONSE_FORMATS}"
+                }
+            ]
+        if not self._ensure_event_store():
             return [{"error": "EventKit not available"}]
 
         try:
-            calendars = self.event_store.calendarsForEntityType_(
-                EventKit.EKEntityTypeEvent
+            records = self._get_event_records(start_date, end_date, calendar_name)
+            if response_format == "columnar":
+                return to_columnar(records)
+            return [record.to_dict() for record in records]
+        except Exception as e:
+            error_msg = f"Failed to get events: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "EVENT ERROR",
+                {
+                    "operation": "get_events",
+                    "error": str(e),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "calendar_name": calendar_name,
+                },
+                "ERROR",
+            )
+            return [{"error": error_msg}]
+
+    async def _render_events(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        calendar_name: Optional[str] = None,
+        response_format: str = "rows",
+        max_bytes: Optional[int] = None,
+        offset: int = 0,
+        timeout: Optional[float] = None,
+        recurrence: str = "expand",
+        dedupe: bool = False,
+    ) -> Tuple[Union[List[Dict[str, Any]], Dict[str, Any]], str]:
+        """Get events encoded within a byte budget and a deadline.
+
+        Returns the payload that was encoded (for logging) and the JSON text.
+        Events past the budget are never converted to dicts or serialised.
+        """
+        if response_format not in RESPONSE_FORMATS or not self._ensure_event_store():
+            # 形式エラー・EventKit 不可のメッセージは _get_events と共通
+            error = await self._get_events(response_format=response_format)
+            return error, safe_json_dumps(error)
+        if recurrence not in RECURRENCE_MODES:
+            error = [
+                {
+                    "error": f"Invalid recurrence '{recurrence}', "
+                    f"expected one of {RECURRENCE_MODES}"
+                }
+            ]
+            return error, safe_json_dumps(error)
+        if recurrence == "series" and response_format != "rows":
+            error = [{"error": "recurrence='series' requires format='rows'"}]
+            return error, safe_json_dumps(error)
+        if dedupe and response_format != "rows":
+            error = [{"error": "dedupe requires format='rows'"}]
+            return error, safe_json_dumps(error)
+
+        deadline = RequestDeadline(self.request_timeout if timeout is None else timeout)
+        records: List[EventRecord] = []
+        try:
+            records = await self._collect_records(
+                start_date, end_date, calendar_name, deadline, recurrence
+            )
+            if dedupe:
+                from .dedup import dedupe_records
+
+                records = dedupe_records(records)
+            deadline.check("serialize")
+            offset = max(offset or 0, 0)
+            check = functools.partial(deadline.check, "serialize")
+            if response_format == "columnar":
+                # 列指向形式はサイズ削減が目的なのでインデントなしで出力する
+                return encode_columnar(records, max_bytes, offset, check)
+            return encode_rows(records, max_bytes, offset, check)
+        except RequestAbortedError as e:
+            if e.stage == "serialize":
+                self._record_abort(e, events=len(records))
+            error = [{"error": str(e)}]
+            return error, safe_json_dumps(error)
+        except Exception as e:
+            error_msg = f"Failed to get events: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "EVENT ERROR",
+                {
+                    "operation": "get_events",
+                    "error": str(e),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "calendar_name": calendar_name,
+                },
+                "ERROR",
+            )
+            error = [{"error": error_msg}]
+            return error, safe_json_dumps(error)
+
+    async def _get_agenda(self, view: str) -> str:
+        """Return the JSON response of an agenda view."""
+        if view not in AGENDA_VIEWS:
+            return safe_json_dumps(
+                [{"error": f"Invalid view '{view}', expected one of {AGENDA_VIEWS}"}]
+            )
+        return await self.agenda.get(view)
+
+    async def _render_agenda(self, start_date: str, end_date: str) -> Tuple[str, bool]:
+        """Render an agenda view; errors (access denied, timeouts) are not kept."""
+        events, response = await self._render_events(
+            start_date=start_date,
+            end_date=end_date,
+            max_bytes=self.max_response_bytes,
+        )
+        failed = (
+            isinstance(events, list)
+            and len(events) == 1
+            and isinstance(events[0], dict)
+            and "error" in events[0]
+        )
+        return response, not failed
+
+    async def _collect_records(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        calendar_name: Optional[str],
+        deadline: RequestDeadline,
+        recurrence: str = "expand",
+    ) -> List[EventRecord]:
+        """Fetch and convert records off the event loop, honouring a deadline.
+
+        Client cancellation and deadline expiry are noticed here right away;
+        the worker thread stops at its next check. The snapshot only holds
+        expanded occurrences, so series mode always reads EventKit.
+        """
+        try:
+            deadline.check("fetch")
+        except RequestAbortedError as e:
+            self._record_abort(e)
+            raise
+        use_snapshot = self.snapshot is not None and recurrence == "expand"
+        if use_snapshot and start_date and end_date:
+            # スナップショットの読み書き (取得漏れ時は EventKit からの取得も)
+            # もワーカースレッドで行う
+            key = (start_date, end_date, calendar_name or "")
+            work = asyncio.to_thread(self._load_snapshot, key, deadline)
+            records, stale = await self._await_with_deadline(work, deadline)
+            if stale:
+                self._schedule_snapshot_reconcile(key)
+            return records
+
+        work = asyncio.to_thread(
+            self._fetch_records,
+            start_date,
+            end_date,
+            calendar_name,
+            deadline,
+            recurrence,
+        )
+        return await self._await_with_deadline(work, deadline)
+
+    async def _await_with_deadline(self, work, deadline: RequestDeadline):
+        """Await worker-thread work, stopping it when the request is aborted."""
+        try:
+            return await asyncio.wait_for(work, deadline.remaining())
+        except asyncio.TimeoutError:
+            # 打ち切りの統計はワーカースレッド側が停止時に記録する
+            deadline.cancel("deadline_exceeded")
+            raise RequestAbortedError("fetch", "deadline_exceeded") from None
+        except asyncio.CancelledError:
+            deadline.cancel("cancelled")
+            raise
+
+    def _fetch_records(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        calendar_name: Optional[str],
+        deadline: RequestDeadline,
+        recurrence: str = "expand",
+    ) -> List[EventRecord]:
+        """Fetch and convert a range window by window, stopping when aborted."""
+        start_ts, end_ts = self._date_range(start_date, end_date)
+        windows = len(self.planner.plan(start_ts, end_ts))
+        chunks = self.planner.iter_windows(
+            lambda ws, we: self._query_events(ws, we, calendar_name),
+            start_ts,
+            end_ts,
+            _event_start,
+        )
+        grouper = SeriesGrouper() if recurrence == "series" else None
+        records: List[EventRecord] = grouper.records() if grouper else []
+        done = 0
+        try:
+            for chunk in chunks:
+                done += 1
+                deadline.check("fetch")
+                with _autorelease_pool():
+                    for index, event in enumerate(chunk, 1):
+                        if grouper is None:
+                            records.append(EventRecord.from_event(event))
+                        else:
+                            grouper.add(event)
+                        if index % CHECK_EVERY == 0:
+                            deadline.check("convert")
+        except RequestAbortedError as e:
+            chunks.close()
+            self._record_abort(e, events=len(records), windows=windows - done)
+            raise
+        return records
+
+    def _record_abort(self, error: RequestAbortedError, events=0, windows=0):
+        self.abort_metrics.record(error.stage, error.reason, events, windows)
+        log_json_data(
+            "REQUEST ABORTED",
+            {
+                "stage": error.stage,
+                "reason": error.reason,
+                "events_discarded": events,
+                "windows_skipped": windows,
+                "totals": self.abort_metrics.as_dict(),
+            },
+            "WARNING",
+        )
+
+    async def _batch_events(
+        self, queries: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """Answer several range queries with one fetch per merged range.
+
+        Returns the payload (for logging) and its JSON text.
+        """
+        if not queries:
+            error = {"error": "No queries given"}
+            return error, safe_json_dumps(error)
+        if len(queries) > MAX_BATCH_QUERIES:
+            error = {
+                "error": f"Too many queries ({len(queries)}), "
+                f"at most {MAX_BATCH_QUERIES} per call"
+            }
+            return error, safe_json_dumps(error)
+        duplicate = duplicate_key(queries)
+        if duplicate is not None:
+            error = {"error": f"Duplicate query key '{duplicate}'"}
+            return error, safe_json_dumps(error)
+        if not self._ensure_event_store():
+            error = {"error": "EventKit not available"}
+            return error, safe_json_dumps(error)
+
+        deadline = RequestDeadline(self.request_timeout)
+        try:
+            work = asyncio.to_thread(self._run_batch, queries, deadline)
+            return await asyncio.wait_for(work, deadline.remaining())
+        except asyncio.TimeoutError:
+            deadline.cancel("deadline_exceeded")
+            error = {"error": str(RequestAbortedError("fetch", "deadline_exceeded"))}
+        except asyncio.CancelledError:
+            deadline.cancel("cancelled")
+            raise
+        except RequestAbortedError as e:
+            error = {"error": str(e)}
+        except Exception as e:
+            error_msg = f"Failed to run batch query: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "EVENT ERROR",
+                {"operation": "batch_events", "error": str(e), "queries": queries},
+                "ERROR",
+            )
+            error = {"error": error_msg}
+        return error, safe_json_dumps(error)
+
+    def _run_batch(
+        self, queries: List[Dict[str, Any]], deadline: RequestDeadline
+    ) -> Tuple[Dict[str, Any], str]:
+        """Resolve calendars once, fetch merged ranges and split the results.
+
+        Each result is encoded once by encode_rows and its text is spliced
+        into the response, so the rows are never serialised twice.
+        """
+        with _autorelease_pool():
+            calendars = list(
+                self.event_store.calendarsForEntityType_(EventKit.EKEntityTypeEvent)
+            )
+            by_name: Dict[str, List[Any]] = {}
+            for calendar in calendars:
+                by_name.setdefault(str(calendar.title()), []).append(calendar)
+
+        parsed, results = parse_queries(queries, list(by_name))
+        groups = merge_ranges(parsed)
+        matched: Dict[str, List[EventRecord]] = {}
+        try:
+            for start_ts, end_ts, names, members in groups:
+                deadline.check("fetch")
+                selected = (
+                    calendars
+                    if names is None
+                    else [c for name in sorted(names) for c in by_name[name]]
+                )
+                events = self.planner.fetch(
+                    lambda ws, we, cals=selected: self._query_events(
+                        ws, we, calendars=cals
+                    ),
+                    start_ts,
+                    end_ts,
+                    _event_start,
+                )
+                deadline.check("convert")
+                records = []
+                with _autorelease_pool():
+                    for index, event in enumerate(events, 1):
+                        records.append(EventRecord.from_event(event))
+                        if index % CHECK_EVERY == 0:
+                            deadline.check("convert")
+                for query in members:
+                    matched[query.key] = query.select(records)
+
+            keys = query_keys(queries)
+            response = {
+                "results": {key: results.get(key, []) for key in keys},
+                "queries": len(queries),
+                "fetches": len(groups),
+            }
+            share = self._batch_share(response, len(parsed))
+            encoded: Dict[str, str] = {}
+            for query in parsed:
+                response["results"][query.key], encoded[query.key] = encode_rows(
+                    matched[query.key],
+                    share,
+                    query.offset,
+                    lambda: deadline.check("serialize"),
+                    row=query.row,
+                    depth=3,
+                )
+        except RequestAbortedError as e:
+            self._record_abort(e)
+            raise
+
+        logger.info(
+            f"Batch of {len(queries)} queries answered with {len(groups)} fetches"
+        )
+        return response, encode_batch(response, encoded)
+
+    def _batch_share(self, frame: Dict[str, Any], parts: int) -> Optional[int]:
+        """Split max_response_bytes evenly between the results of a batch.
+
+        `frame` is the response with every query's result still empty; what
+        it takes (keys, error entries, counters) comes off the top first.
+        """
+        limit = self.max_response_bytes
+        if not limit or limit <= 0 or not parts:
+            return None
+        used = len(safe_json_dumps(frame).encode("utf-8"))
+        # 空の結果 "[]" の2バイトは各クエリの取り分に含める
+        return max(limit - used, 0) // parts + 2
+
+    async def _lookup_events(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch events by identifier instead of scanning a range.
+
+        Fresh snapshot rows are served from its identifier index; the rest
+        are looked up directly in EventKit.
+        """
+        if not event_ids:
+            return [{"error": "No event IDs given"}]
+        if len(event_ids) > MAX_LOOKUP_IDS:
+            return [
+                {
+                    "error": f"Too many event IDs ({len(event_ids)}), "
+                    f"at most {MAX_LOOKUP_IDS} per call"
+                }
+            ]
+        if not self._ensure_event_store():
+            return [{"error": "EventKit not available"}]
+
+        try:
+            # SQLite と EventKit の検索はどちらもブロックするのでワーカースレッドで行う
+            found, from_snapshot = await asyncio.to_thread(
+                self._find_records, event_ids
+            )
+            logger.info(
+                f"Looked up {len(event_ids)} events "
+                f"({len(found)} found, {from_snapshot} from snapshot)"
+            )
+            return [
+                (
+                    found[event_id].to_dict()
+                    if event_id in found
+                    else {"id": event_id, "error": "Event not found"}
+                )
+                for event_id in event_ids
+            ]
+        except Exception as e:
+            error_msg = f"Failed to look up events: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "EVENT ERROR",
+                {"operation": "lookup_events", "error": str(e), "event_ids": event_ids},
+                "ERROR",
+            )
+            return [{"error": error_msg}]
+
+    def _find_records(self, event_ids: List[str]) -> Tuple[Dict[str, EventRecord], int]:
+        """Return ({id: record} for the ids found, how many came from the snapshot)."""
+        found: Dict[str, EventRecord] = {}
+        if self.snapshot is not None:
+            now = time.time()
+            for key, (fetched_at, record) in self.snapshot.find(event_ids).items():
+                if now - fetched_at < self.snapshot_max_age:
+                    found[key] = record
+        from_snapshot = len(found)
+
+        with _autorelease_pool():
+            for event_id in event_ids:
+                if event_id in found:
+                    continue
+                event = self._event_by_identifier(event_id)
+                if event is not None:
+                    found[event_id] = EventRecord.from_event(event)
+        return found, from_snapshot
+
+    def _event_by_identifier(self, event_id: str):
+        """Return the EKEvent for an event or external identifier, or None."""
+        event = self.event_store.eventWithIdentifier_(event_id)
+        if event is not None:
+            return event
+        # 外部 ID はリマインダーにも付くので EKEvent だけを対象にする
+        items = self.event_store.calendarItemsWithExternalIdentifier_(event_id)
+        events = [item for item in items or [] if hasattr(item, "eventIdentifier")]
+        return min(events, key=_event_start, default=None)
+
+    async def _update_events(
+        self,
+        event_ids: Optional[List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        calendar_name: Optional[str],
+        title: Optional[str] = None,
+        notes: Optional[str] = None,
+        new_calendar: Optional[str] = None,
+        span: str = "this",
+        atomic: bool = False,
+    ) -> Dict[str, Any]:
+        """Set fields on many events with one commit."""
+        if title is None and notes is None and not new_calendar:
+            return {"error": "Nothing to update: pass title, notes or new_calendar"}
+
+        def make_change() -> Change:
+            calendar = self._calendar_by_name(new_calendar) if new_calendar else None
+            return update_change(title, notes, calendar)
+
+        return await self._bulk_edit(
+            "update_events",
+            event_ids,
+            start_date,
+            end_date,
+            calendar_name,
+            span,
+            atomic,
+            make_change,
+        )
+
+    async def _shift_events(
+        self,
+        event_ids: Optional[List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        calendar_name: Optional[str],
+        days: int = 0,
+        minutes: int = 0,
+        span: str = "this",
+        atomic: bool = False,
+    ) -> Dict[str, Any]:
+        """Move many events by the same offset with one commit."""
+        seconds = (days or 0) * DAY_SECONDS + (minutes or 0) * 60
+        if not seconds:
+            return {"error": "Nothing to shift: pass days or minutes"}
+        return await self._bulk_edit(
+            "shift_events",
+            event_ids,
+            start_date,
+            end_date,
+            calendar_name,
+            span,
+            atomic,
+            lambda: shift_change(seconds),
+        )
+
+    async def _bulk_edit(
+        self,
+        operation: str,
+        event_ids: Optional[List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        calendar_name: Optional[str],
+        span: str = "this",
+        atomic: bool = False,
+        make_change: Optional[Callable[[], Change]] = None,
+    ) -> Dict[str, Any]:
+        """Select events by ID or range and apply one change (or delete them).
+
+        Without `make_change` the selected events are removed.
+        """
+        if span not in BULK_SPANS:
+            return {
+                "error": f"Invalid span '{span}', expected one of {tuple(BULK_SPANS)}"
+            }
+        if bool(event_ids) == bool(start_date and end_date):
+            return {"error": "Pass either event_ids or start_date and end_date"}
+        if event_ids and len(event_ids) > MAX_BULK_EVENTS:
+            return {
+                "error": f"Too many event IDs ({len(event_ids)}), "
+                f"at most {MAX_BULK_EVENTS} per call"
+            }
+        if not self._ensure_event_store():
+            return {"error": "EventKit not available"}
+
+        try:
+            if not await self._request_access(
+                EventKit.EKEntityTypeEvent, "EKEntityTypeEvent", operation
+            ):
+                return {"error": "Calendar access denied"}
+            change = make_change() if make_change is not None else None
+            result = await asyncio.to_thread(
+                self._apply_bulk,
+                event_ids,
+                start_date,
+                end_date,
+                calendar_name,
+                span,
+                atomic,
+                change,
+            )
+        except Exception as e:
+            error_msg = f"Failed to {operation.replace('_', ' ')}: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "BULK EDIT ERROR",
+                {
+                    "operation": operation,
+                    "error": str(e),
+                    "event_ids": event_ids,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "calendar_name": calendar_name,
+                },
+                "ERROR",
+            )
+            return {"error": error_msg}
+
+        if result.get("committed"):
+            self.agenda.invalidate()
+        log_json_data(
+            "BULK EDIT",
+            {
+                "operation": operation,
+                "span": span,
+                "atomic": atomic,
+                **{key: value for key, value in result.items() if key != "results"},
+            },
+            "SYSTEM",
+        )
+        return result
+
+    def _apply_bulk(
+        self,
+        event_ids: Optional[List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        calendar_name: Optional[str],
+        span: str,
+        atomic: bool,
+        change: Optional[Change],
+    ) -> Dict[str, Any]:
+        """Resolve the selection and stage every change (runs in a thread)."""
+        with _autorelease_pool():
+            missing = []
+            if event_ids:
+                events = []
+                for event_id in dict.fromkeys(event_ids):
+                    event = self._event_by_identifier(event_id)
+                    if event is None:
+                        missing.append(event_id)
+                    else:
+                        events.append(event)
+            else:
+                events = self._fetch_events(start_date, end_date, calendar_name)
+            if span == "future":
+                events = series_heads(events)
+            if len(events) > MAX_BULK_EVENTS:
+                return {
+                    "error": f"{len(events)} events selected, at most "
+                    f"{MAX_BULK_EVENTS} per call; narrow the range"
+                }
+            # 他の一括編集の commit/reset が保存途中の変更を巻き込まないようにする
+            with self._write_lock:
+                result = apply_bulk(
+                    self.event_store,
+                    events,
+                    getattr(EventKit, BULK_SPANS[span]),
+                    change,
+                    atomic,
+                    missing,
+                )
+            if result["committed"] and self.snapshot is not None:
+                # 保存済みの範囲は変更前の内容なので捨てる
+                self.snapshot.invalidate()
+            return result
+
+    def _save_event(self, event, start_dt: datetime, end_dt: datetime):
+        """Save and commit one event under the write lock (runs in a thread).
+
+        Snapshot ranges overlapping the event's days are dropped once saved.
+        """
+        # 即時 commit は一括編集の保存途中の変更も確定させてしまうので待つ
+        with self._write_lock:
+            result = self.event_store.saveEvent_span_error_(
+                event, EventKit.EKSpanThisEvent, None
+            )
+        if objc_result(result)[0] and self.snapshot is not None:
+            self.snapshot.invalidate(
+                start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d")
+            )
+        return result
+
+    def _calendar_by_name(self, name: str):
+        """Return the event calendar titled `name` or raise ValueError."""
+        for calendar in self.event_store.calendarsForEntityType_(
+            EventKit.EKEntityTypeEvent
+        ):
+            if str(calendar.title()) == name:
+                return calendar
+        raise ValueError(f"Calendar '{name}' not found")
+
+    def _get_event_records(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        calendar_name: Optional[str] = None,
+    ) -> List[EventRecord]:
+        """Return converted records for a range, using the snapshot if enabled."""
+        if self.snapshot is not None and start_date and end_date:
+            key = (start_date, end_date, calendar_name or "")
+            records, stale = self._load_snapshot(key)
+            if stale:
+                self._schedule_snapshot_reconcile(key)
+            return records
+        events = self._fetch_events(start_date, end_date, calendar_name)
+        with _autorelease_pool():
+            return [EventRecord.from_event(event) for event in events]
+
+    def _load_snapshot(
+        self, key, deadline: Optional[RequestDeadline] = None
+    ) -> Tuple[List[EventRecord], bool]:
+        """Serve a range from the on-disk snapshot, fetching it on a miss.
+
+        Safe to run on a worker thread. Returns (records, stale); the caller
+        schedules a background reconcile for stale ranges. With a deadline
+        a miss is fetched window by window and stops when it is aborted.
+        """
+        cached = self.snapshot.load(key)
+        if cached is None:
+            if deadline is None:
+                records = self._snapshot_records(key, {})
+            else:
+                start_date, end_date, calendar_name = key
+                records = self._fetch_records(
+                    start_date, end_date, calendar_name or None, deadline
+                )
+                deadline.check("snapshot")
+            self.snapshot.save(key, records)
+            return records, False
+
+        fetched_at, records = cached
+        return records, time.time() - fetched_at >= self.snapshot_max_age
+
+    def _snapshot_records(self, key, previous: Dict[Any, Any]) -> List[EventRecord]:
+        """Fetch a range and convert only events that changed since `previous`."""
+        start_date, end_date, calendar_name = key
+        records = []
+        events = self._fetch_events(start_date, end_date, calendar_name or None)
+        with _autorelease_pool():
+            for event in events:
+                modified = event.lastModifiedDate()
+                prev = None
+                if modified:
+                    prev = previous.get(
+                        (str(event.eventIdentifier() or ""), _event_start(event))
+                    )
+                if (
+                    prev is not None
+                    and prev.last_modified == modified.timeIntervalSince1970()
+                ):
+                    records.append(prev)
+                else:
+                    records.append(EventRecord.from_event(event))
+        return records
+
+    def _schedule_snapshot_reconcile(self, key):
+        """Start a background reconcile for a range unless one is running."""
+        if key in self._snapshot_tasks:
+            return
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self._reconcile_snapshot, key)
+        )
+        self._snapshot_tasks[key] = task
+        task.add_done_callback(lambda _: self._snapshot_tasks.pop(key, None))
+
+    def _reconcile_snapshot(self, key):
+        """Bring a stored range up to date with the live EventKit store."""
+        try:
+            cached = self.snapshot.load(key)
+            previous = {}
+            if cached is not None:
+                previous = {(r.identifier, r.start_ts): r for r in cached[1]}
+
+            records = self._snapshot_records(key, previous)
+            unchanged = len(records) == len(previous) and all(
+                previous.get((r.identifier, r.start_ts)) == r for r in records
+            )
+            if unchanged:
+                self.snapshot.touch(key)
+            else:
+                self.snapshot.save(key, records)
+            log_json_data(
+                "SNAPSHOT RECONCILE",
+                {
+                    "start_date": key[0],
+                    "end_date": key[1],
+                    "calendar_name": key[2] or None,
+                    "events": len(records),
+                    "changed": not unchanged,
+                },
+                "SYSTEM",
+            )
+        except Exception as e:
+            logger.error(f"Snapshot reconcile failed: {e}")
+            log_json_data(
+                "SNAPSHOT ERROR",
+                {"operation": "reconcile", "error": str(e), "range": list(key)},
+                "ERROR",
+            )
+
+    async def _summarize_events(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        group_by: str = "day",
+        calendar_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Aggregate events per day, week or calendar without building JSON."""
+        from .stats import GROUP_BY_CHOICES, summarize_events
+
+        # 取得してから失敗しないように、集計単位は取得前に検証する
+        if group_by not in GROUP_BY_CHOICES:
+            return {
+                "error": f"Invalid group_by '{group_by}', "
+                f"expected one of {GROUP_BY_CHOICES}"
+            }
+        if not self._ensure_event_store():
+            return {"error": "EventKit not available"}
+
+        try:
+            records = await self._collect_records(
+                start_date,
+                end_date,
+                calendar_name,
+                RequestDeadline(self.request_timeout),
             )
-            result = []
-            for calendar in calendars:
-                result.append(
-                    {
-                        "title": str(calendar.title()),
-                        "identifier": str(calendar.calendarIdentifier()),
-                        "type": str(calendar.type()),
-                        "allowsContentModifications": bool(
-                            calendar.allowsContentModifications()
-                        ),
-                    }
-                )
-            logger.info(f"Successfully retrieved {len(result)} calendars")
-            return result
+            return summarize_events(records, group_by)
+        except RequestAbortedError as e:
+            return {"error": str(e)}
         except Exception as e:
-            error_msg = f"Failed to get calendars: {str(e)}"
+            error_msg = f"Failed to summarize events: {str(e)}"
             logger.error(error_msg)
             log_json_data(
-                "CALENDAR ERROR",
-                {"operation": "get_calendars", "error": str(e)},
+                "EVENT ERROR",
+                {
+                    "operation": "summarize_events",
+                    "error": str(e),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "group_by": group_by,
+                    "calendar_name": calendar_name,
+                },
                 "ERROR",
             )
-            return [{"error": error_msg}]
+            return {"error": error_msg}
 
-    async def _get_events(
+    async def _count_events(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
+        start_date: str,
+        end_date: str,
         calendar_name: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
-        """Get calendar events."""
-        if not EVENTKIT_AVAILABLE or not self.event_store:
-            return [{"error": "EventKit not available"}]
+    ) -> Dict[str, Any]:
+        """Count a range per calendar, from the snapshot index if it is fresh."""
+        from .preflight import count_summary
+
+        if not self._ensure_event_store():
+            return {"error": "EventKit not available"}
 
+        deadline = RequestDeadline(self.request_timeout)
         try:
-            # Default to today and next 7 days
-            if not start_date:
-                start = Foundation.NSDate.date()
-            else:
-                start = Foundation.NSDate.dateWithTimeIntervalSince1970_(
-                    datetime.strptime(start_date, "%Y-%m-%d").timestamp()
+            self._date_range(start_date, end_date)
+            counted = self._count_from_snapshot(
+                (start_date, end_date, calendar_name or "")
+            )
+            source = "snapshot"
+            if counted is None:
+                source = "eventkit"
+                work = asyncio.to_thread(
+                    self._count_fetched, start_date, end_date, calendar_name, deadline
                 )
+                counted = await asyncio.wait_for(work, deadline.remaining())
+            counts, sample = counted
+            return {
+                "start_date": start_date,
+                "end_date": end_date,
+                "calendar_name": calendar_name,
+                "source": source,
+                **count_summary(counts, sample, self.max_response_bytes),
+            }
+        except asyncio.TimeoutError:
+            deadline.cancel("deadline_exceeded")
+            return {"error": str(RequestAbortedError("fetch", "deadline_exceeded"))}
+        except asyncio.CancelledError:
+            deadline.cancel("cancelled")
+            raise
+        except RequestAbortedError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            error_msg = f"Failed to count events: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "EVENT ERROR",
+                {
+                    "operation": "count_events",
+                    "error": str(e),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "calendar_name": calendar_name,
+                },
+                "ERROR",
+            )
+            return {"error": error_msg}
+
+    def _count_from_snapshot(self, key):
+        """Return (counts, sample) for a fresh snapshot range, else None."""
+        from .preflight import sample_positions
+
+        if self.snapshot is None:
+            return None
+        found = self.snapshot.count(key)
+        if found is None or time.time() - found[0] >= self.snapshot_max_age:
+            return None
+        positions = sample_positions(sum(found[1].values()))
+        _, counts, sample = self.snapshot.count(key, positions)
+        return counts, sample
+
+    def _count_fetched(
+        self,
+        start_date: str,
+        end_date: str,
+        calendar_name: Optional[str],
+        deadline: RequestDeadline,
+    ) -> Tuple[Dict[str, int], List[EventRecord]]:
+        """Fetch a range and count it without converting it (bar a sample)."""
+        from .preflight import sample_positions
+
+        events = self._fetch_events(start_date, end_date, calendar_name)
+        deadline.check("fetch")
+        with _autorelease_pool():
+            # カレンダーのタイトル取得はカレンダー毎に1回だけにする
+            per_calendar: Dict[Any, int] = {}
+            for index, event in enumerate(events, 1):
+                calendar = event.calendar()
+                per_calendar[calendar] = per_calendar.get(calendar, 0) + 1
+                if index % CHECK_EVERY == 0:
+                    deadline.check("convert")
+            counts: Dict[str, int] = {}
+            for calendar, count in per_calendar.items():
+                title = str(calendar.title())
+                counts[title] = counts.get(title, 0) + count
+            sample = [
+                EventRecord.from_event(events[i]) for i in sample_positions(len(events))
+            ]
+        return counts, sample
+
+    async def _export_events(
+        self,
+        start_date: str,
+        end_date: str,
+        fmt: str = "ndjson",
+        calendar_name: Optional[str] = None,
+        output_path: Optional[str] = None,
+        overwrite: bool = False,
+    ) -> Dict[str, Any]:
+        """Stream a date range to an NDJSON or ICS file window by window."""
+        if not self._ensure_event_store():
+            return {"error": "EventKit not available"}
 
-            if not end_date:
-                end = Foundation.NSDate.dateWithTimeIntervalSinceNow_(7 * 24 * 60 * 60)
-            else:
-                end = Foundation.NSDate.dateWithTimeIntervalSince1970_(
-                    datetime.strptime(end_date, "%Y-%m-%d").timestamp()
-                )
+        try:
+            start_ts = datetime.strptime(start_date, "%Y-%m-%d").timestamp()
+            end_ts = datetime.strptime(end_date, "%Y-%m-%d").timestamp()
+            path = self._export_path(output_path, fmt, start_date, end_date, overwrite)
+            # 取得・変換・書き込みはすべてワーカースレッドで行う
+            result = await asyncio.to_thread(
+                self._write_export, path, fmt, start_ts, end_ts, calendar_name
+            )
+            log_json_data("EVENTS EXPORTED", result, "SYSTEM")
+            return result
+        except Exception as e:
+            error_msg = f"Failed to export events: {str(e)}"
+            logger.error(error_msg)
+            log_json_data(
+                "EXPORT ERROR",
+                {
+                    "operation": "export_events",
+                    "error": str(e),
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "format": fmt,
+                    "calendar_name": calendar_name,
+                },
+                "ERROR",
+            )
+            return {"error": error_msg}
 
-            calendars = self.event_store.calendarsForEntityType_(
-                EventKit.EKEntityTypeEvent
+    def _write_export(
+        self,
+        path: str,
+        fmt: str,
+        start_ts: float,
+        end_ts: float,
+        calendar_name: Optional[str],
+    ) -> Dict[str, Any]:
+        """Fetch, convert and write an export (runs on a worker thread)."""
+        from .export import EXPORT_WINDOW_DAYS, EventExporter
+
+        exporter = EventExporter(path, fmt)
+        try:
+            chunks = self.planner.iter_windows(
+                lambda ws, we: self._query_events(ws, we, calendar_name),
+                start_ts,
+                end_ts,
+                _event_start,
+                window_seconds=EXPORT_WINDOW_DAYS * DAY_SECONDS,
             )
-            predicate = (
-                self.event_store.predicateForEventsWithStartDate_endDate_calendars_(
-                    start, end, calendars
-                )
+            for events in chunks:
+                with _autorelease_pool():
+                    for event in events:
+                        exporter.add(EventRecord.from_event(event))
+                del events
+                exporter.flush()
+            return exporter.close()
+        except BaseException:
+            exporter.abort()
+            raise
+
+    def _export_path(
+        self,
+        output_path: Optional[str],
+        fmt: str,
+        start_date: str,
+        end_date: str,
+        overwrite: bool = False,
+    ) -> str:
+        """Resolve an export file path, which must stay inside export_dir."""
+        import tempfile
+
+        export_dir = os.path.realpath(
+            self.export_dir
+            or os.path.join(tempfile.gettempdir(), "calendar-mcp-exports")
+        )
+        if not output_path:
+            output_path = f"calendar-{start_date}-{end_date}.{fmt}"
+        # シンボリックリンクや ../ を解決してから export_dir の外を拒否する
+        path = os.path.realpath(os.path.join(export_dir, output_path))
+        if path == export_dir or os.path.commonpath([path, export_dir]) != export_dir:
+            raise ValueError(
+                f"output_path must be a file inside the export directory {export_dir}"
             )
+        if os.path.exists(path) and not overwrite:
+            raise ValueError(
+                f"{path} already exists (pass overwrite=true to replace it)"
+            )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
 
-            events = self.event_store.eventsMatchingPredicate_(predicate)
-            result = []
+    async def _request_access(
+        self, entity_type: Any, entity_name: str, operation: str
+    ) -> bool:
+        """Ask for access to events or reminders and await the user's answer."""
+        if self._access_granted.get(entity_type):
+            return True
 
-            for event in events:
-                if calendar_name and str(event.calendar().title()) != calendar_name:
-                    continue
+        logger.info("Requesting calendar access permissions...")
+        log_json_data(
+            "CALENDAR ACCESS REQUEST",
+            {"entity_type": entity_name, "operation": operation},
+            "SYSTEM",
+        )
+        granted, error = await call_with_completion(
+            self.event_store.requestAccessToEntityType_completion_,
+            entity_type,
+            timeout=ACCESS_TIMEOUT,
+        )
 
-                result.append(
-                    {
-                        "title": str(event.title()) if event.title() else "No Title",
-                        "start": str(event.startDate()),
-                        "end": str(event.endDate()),
-                        "calendar": str(event.calendar().title()),
-                        "notes": str(event.notes()) if event.notes() else "",
-                        "allDay": bool(event.isAllDay()),
-                    }
-                )
+        if not granted:
+            logger.warning("Calendar access denied by user")
+            log_json_data(
+                "CALENDAR ACCESS DENIED",
+                {
+                    "reason": "user_denied_permission",
+                    "operation": operation,
+                    "error": str(error) if error else None,
+                },
+                "WARNING",
+            )
+            return False
+
+        logger.info("Calendar access granted")
+        log_json_data("CALENDAR ACCESS GRANTED", {"operation": operation}, "SYSTEM")
+        self._access_granted[entity_type] = True
+        return True
+
+    @staticmethod
+    def _optional_nsdate(date_str: Optional[str]):
+        """Convert a YYYY-MM-DD string to an NSDate, or None (nil) if empty."""
+        if not date_str:
+            return None
+        return Foundation.NSDate.dateWithTimeIntervalSince1970_(
+            datetime.strptime(date_str, "%Y-%m-%d").timestamp()
+        )
+
+    async def _get_reminders(
+        self,
+        list_name: Optional[str] = None,
+        status: str = "incomplete",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch reminders without blocking the event loop."""
+        from .reminders import REMINDER_PREDICATES, REMINDER_STATUSES, reminder_to_dict
 
+        if status not in REMINDER_STATUSES:
+            return [
+                {
+                    "error": f"Invalid status '{status}', "
+                    f"expected one of {REMINDER_STATUSES}"
+                }
+            ]
+        if not self._ensure_event_store():
+            return [{"error": "EventKit not available"}]
+
+        try:
+            if not await self._request_access(
+                EventKit.EKEntityTypeReminder, "EKEntityTypeReminder", "get_reminders"
+            ):
+                return [{"error": "Reminders access denied"}]
+
+            lists = self.event_store.calendarsForEntityType_(
+                EventKit.EKEntityTypeReminder
+            )
+            if list_name:
+                lists = [c for c in lists if str(c.title()) == list_name]
+                if not lists:
+                    return [{"error": f"Reminder list '{list_name}' not found"}]
+
+            start = self._optional_nsdate(start_date)
+            end = self._optional_nsdate(end_date)
+            store = self.event_store
+            if status == "all":
+                predicate = store.predicateForRemindersInCalendars_(lists)
+            else:
+                make_predicate = getattr(store, REMINDER_PREDICATES[status])
+                predicate = make_predicate(start, end, lists)
+
+            reminders = await call_with_completion(
+                store.fetchRemindersMatchingPredicate_completion_,
+                predicate,
+                timeout=FETCH_TIMEOUT,
+                cancel=store.cancelFetchRequest_,
+            )
+            with _autorelease_pool():
+                result = [reminder_to_dict(r) for r in reminders or []]
+            logger.info(f"Successfully retrieved {len(result)} reminders")
             return result
         except Exception as e:
-            error_msg = f"Failed to get events: {str(e)}"
+            error_msg = f"Failed to get reminders: {str(e)}"
             logger.error(error_msg)
             log_json_data(
-                "EVENT ERROR",
+                "REMINDER ERROR",
                 {
-                    "operation": "get_events",
+                    "operation": "get_reminders",
                     "error": str(e),
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "calendar_name": calendar_name,
+                    "list_name": list_name,
+                    "status": status,
                 },
                 "ERROR",
             )
@@ -476,37 +2722,55 @@ class CalendarMCPServer:
         end_date: str,
         calendar_name: Optional[str] = None,
         notes: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> str:
-        """Create a new event."""
-        if not EVENTKIT_AVAILABLE or not self.event_store:
-            return "EventKit not available"
+        """Create a new event.
+
+        With an idempotency key, a repeated call with the same arguments
+        returns the first call's result without touching EventKit.
+        """
+        if not idempotency_key:
+            result, _ = await self._save_new_event(
+                title, start_date, end_date, calendar_name, notes
+            )
+            return result
 
         try:
-            # Request access to calendar
-            logger.info("Requesting calendar access permissions...")
+            result, replayed = await self.idempotency.run(
+                idempotency_key,
+                (title, start_date, end_date, calendar_name, notes),
+                lambda: self._save_new_event(
+                    title, start_date, end_date, calendar_name, notes
+                ),
+            )
+        except IdempotencyConflictError as e:
+            logger.warning(str(e))
+            return str(e)
+        if replayed:
             log_json_data(
-                "CALENDAR ACCESS REQUEST",
-                {"entity_type": "EKEntityTypeEvent", "operation": "create_event"},
+                "IDEMPOTENT REPLAY",
+                {"idempotency_key": idempotency_key, "title": title},
                 "SYSTEM",
             )
+        return result
 
-            access_granted = self.event_store.requestAccessToEntityType_completion_(
-                EventKit.EKEntityTypeEvent, None
-            )
+    async def _save_new_event(
+        self,
+        title: str,
+        start_date: str,
+        end_date: str,
+        calendar_name: Optional[str],
+        notes: Optional[str],
+    ) -> Tuple[str, bool]:
+        """Create a new event; returns the message and whether it was saved."""
+        if not self._ensure_event_store():
+            return "EventKit not available", False
 
-            if not access_granted:
-                logger.warning("Calendar access denied by user")
-                log_json_data(
-                    "CALENDAR ACCESS DENIED",
-                    {"reason": "user_denied_permission", "operation": "create_event"},
-                    "WARNING",
-                )
-                return "Calendar access denied"
-            else:
-                logger.info("Calendar access granted")
-                log_json_data(
-                    "CALENDAR ACCESS GRANTED", {"operation": "create_event"}, "SYSTEM"
-                )
+        try:
+            if not await self._request_access(
+                EventKit.EKEntityTypeEvent, "EKEntityTypeEvent", "create_event"
+            ):
+                return "Calendar access denied", False
 
             event = EventKit.EKEvent.eventWithEventStore_(self.event_store)
             event.setTitle_(title)
@@ -542,13 +2806,14 @@ class CalendarMCPServer:
 
             event.setCalendar_(target_calendar)
 
-            # Save event
-            success = self.event_store.saveEvent_span_error_(
-                event, EventKit.EKSpanThisEvent, None
+            # Save event (PyObjC は (BOOL, NSError) を返すので展開して判定する)
+            saved, save_error = objc_result(
+                await asyncio.to_thread(self._save_event, event, start_dt, end_dt)
             )
 
-            if success:
+            if saved:
                 logger.info(f"Event '{title}' created successfully")
+                self.agenda.invalidate()
                 log_json_data(
                     "EVENT CREATED",
                     {
@@ -560,15 +2825,21 @@ class CalendarMCPServer:
                     },
                     "SYSTEM",
                 )
-                return f"Event '{title}' created successfully"
+                return f"Event '{title}' created successfully", True
             else:
-                logger.error("Failed to save event to calendar")
+                logger.error(f"Failed to save event to calendar: {save_error}")
                 log_json_data(
                     "EVENT SAVE FAILED",
-                    {"title": title, "reason": "save_operation_failed"},
+                    {
+                        "title": title,
+                        "reason": "save_operation_failed",
+                        "error": save_error,
+                    },
                     "ERROR",
                 )
-                return "Failed to save event"
+                if save_error:
+                    return f"Failed to save event: {save_error}", False
+                return "Failed to save event", False
 
         except Exception as e:
             error_msg = f"Failed to create event: {str(e)}"
@@ -585,13 +2856,60 @@ class CalendarMCPServer:
                 },
                 "ERROR",
             )
-            return error_msg
+            return error_msg, False
+
+
+def log_encoding_environment():
+    """エンコーディング環境の確認と設定"""
+    import locale
+
+    try:
+        system_encoding = locale.getpreferredencoding()
+        env_lang = os.environ.get("LANG", "Not set")
+        env_lc_all = os.environ.get("LC_ALL", "Not set")
+
+        logger.info(f"🌐 System encoding: {system_encoding}")
+        logger.info(f"🌐 LANG environment: {env_lang}")
+        logger.info(f"🌐 LC_ALL environment: {env_lc_all}")
+
+        # UTF-8が利用可能かテスト
+        test_japanese = "テスト"
+        test_japanese.encode("utf-8")
+        logger.info("✅ UTF-8 encoding test passed")
+
+    except Exception as e:
+        logger.warning(f"⚠️ Encoding check failed: {e}")
 
 
 async def main():
     """Main entry point for the MCP server."""
     import argparse
 
+    from .admission import (
+        DEFAULT_MAX_CONCURRENT,
+        DEFAULT_MAX_QUEUED,
+        DEFAULT_QUEUE_TIMEOUT,
+        DEFAULT_SESSION_BURST,
+        DEFAULT_SESSION_RATE,
+        AdmissionController,
+    )
+    from .lifecycle import (
+        CONFIG_FILE_ENV,
+        DEFAULT_DRAIN_TIMEOUT,
+        RequestDrain,
+        http_server,
+        install_signal_handlers,
+        load_tunables,
+    )
+    from .logpipe import (
+        DEFAULT_LOG_FILE_BACKUPS,
+        DEFAULT_LOG_FILE_BYTES,
+        DEFAULT_QUEUE_SIZE,
+        setup_log_pipeline,
+    )
+    from .profiling import PROFILE_DIR_ENV, PROFILE_RATE_ENV
+    from .trace import TRACE_FILE_ENV
+
     parser = argparse.ArgumentParser(description="macOS Calendar MCP Server")
     parser.add_argument(
         "--transport",
@@ -603,32 +2921,196 @@ async def main():
     parser.add_argument(
         "--mount-path", type=str, default=None, help="Mount path for SSE transport"
     )
+    parser.add_argument(
+        "--snapshot-path",
+        type=str,
+        default=None,
+        help="SQLite file used to persist converted events across restarts",
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=str,
+        default=None,
+        help="Directory for export_macos_calendar_events files (default: temp dir)",
+    )
+    parser.add_argument(
+        "--query-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="Worker threads used to fetch wide date ranges in parallel",
+    )
+    parser.add_argument(
+        "--max-response-bytes",
+        type=int,
+        default=DEFAULT_MAX_RESPONSE_BYTES,
+        help=(
+            "Default size limit for event list responses in bytes "
+            "(0 disables the limit)"
+        ),
+    )
+    parser.add_argument(
+        "--log-file",
+        type=str,
+        default=None,
+        help="Also write logs to this file, rotated by size",
+    )
+    parser.add_argument(
+        "--log-file-bytes",
+        type=int,
+        default=DEFAULT_LOG_FILE_BYTES,
+        help="Rotate the log file after this many bytes",
+    )
+    parser.add_argument(
+        "--log-file-backups",
+        type=int,
+        default=DEFAULT_LOG_FILE_BACKUPS,
+        help="Number of rotated log files to keep",
+    )
+    parser.add_argument(
+        "--log-queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Log records buffered before new ones are dropped",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=str,
+        default=os.environ.get(PROFILE_DIR_ENV),
+        help=(
+            "Enable request profiling and write cProfile/tracemalloc reports "
+            f"here (env: {PROFILE_DIR_ENV})"
+        ),
+    )
+    parser.add_argument(
+        "--profile-sample-rate",
+        type=float,
+        default=None,
+        help=(
+            "Fraction of requests to profile, 0-1 (env: "
+            f"{PROFILE_RATE_ENV}; default 1 when --profile-dir is set)"
+        ),
+    )
+    parser.add_argument(
+        "--max-concurrent-calls",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT,
+        help=(
+            "HTTP transports: tool calls run at once before new ones queue "
+            "(0 disables admission control)"
+        ),
+    )
+    parser.add_argument(
+        "--max-queued-calls",
+        type=int,
+        default=DEFAULT_MAX_QUEUED,
+        help="HTTP transports: queued calls before new ones are rejected as busy",
+    )
+    parser.add_argument(
+        "--queue-timeout",
+        type=float,
+        default=DEFAULT_QUEUE_TIMEOUT,
+        help="HTTP transports: seconds a call may wait for a slot",
+    )
+    parser.add_argument(
+        "--session-rate",
+        type=float,
+        default=DEFAULT_SESSION_RATE,
+        help="HTTP transports: sustained calls per second per session (0: no limit)",
+    )
+    parser.add_argument(
+        "--session-burst",
+        type=int,
+        default=DEFAULT_SESSION_BURST,
+        help="HTTP transports: calls a session may make in a burst",
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=DEFAULT_REQUEST_TIMEOUT,
+        help="Default per-request deadline in seconds (0 disables it)",
+    )
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        default=os.environ.get(TRACE_FILE_ENV),
+        help=(
+            "Append every tool/resource request to this NDJSON trace "
+            "(replay it with script/replay_trace.py; "
+            f"default: ${TRACE_FILE_ENV})"
+        ),
+    )
+    parser.add_argument(
+        "--idempotency-ttl",
+        type=float,
+        default=DEFAULT_IDEMPOTENCY_TTL,
+        help="Seconds a create_macos_calendar_event idempotency key is remembered",
+    )
+    parser.add_argument(
+        "--agenda-max-age",
+        type=float,
+        default=DEFAULT_AGENDA_MAX_AGE,
+        help=(
+            "Seconds after which a precomputed agenda view is rebuilt even "
+            "without a change notification (0 disables it)"
+        ),
+    )
+    parser.add_argument(
+        "--ready-max-probe-ms",
+        type=float,
+        default=DEFAULT_READY_PROBE_MS,
+        help=(
+            "/readyz reports not ready when the EventKit probe is slower "
+            "than this (0 disables the check)"
+        ),
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=DEFAULT_DRAIN_TIMEOUT,
+        help=(
+            "Seconds to wait for in-flight calls on SIGTERM/SIGINT before "
+            "stopping (0 waits indefinitely)"
+        ),
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=os.environ.get(CONFIG_FILE_ENV),
+        help=(
+            "JSON file of tunables (log_level, query_workers, request_timeout, "
+            "...) applied at startup and re-read on SIGHUP "
+            f"(default: ${CONFIG_FILE_ENV})"
+        ),
+    )
+    parser.add_argument(
+        "--lazy-init",
+        action="store_true",
+        help=(
+            "Defer EventKit initialization until the first tool call "
+            "(always enabled for stdio transport)"
+        ),
+    )
     args = parser.parse_args()
+    lazy_init = args.lazy_init or args.transport == "stdio"
 
-    logging.basicConfig(level=logging.INFO)
-
-    # エンコーディング環境の確認と設定
-    try:
-        system_encoding = locale.getpreferredencoding()
-        env_lang = os.environ.get("LANG", "Not set")
-        env_lc_all = os.environ.get("LC_ALL", "Not set")
-
-        logger.info(f"🌐 System encoding: {system_encoding}")
-        logger.info(f"🌐 LANG environment: {env_lang}")
-        logger.info(f"🌐 LC_ALL environment: {env_lc_all}")
-
-        # UTF-8が利用可能かテスト
-        test_japanese = "テスト"
-        test_japanese.encode("utf-8")
-        logger.info("✅ UTF-8 encoding test passed")
+    profile_sample_rate = args.profile_sample_rate
+    if profile_sample_rate is None:
+        env_rate = os.environ.get(PROFILE_RATE_ENV)
+        profile_sample_rate = (
+            float(env_rate) if env_rate else (1.0 if args.profile_dir else 0.0)
+        )
 
-    except Exception as e:
-        logger.warning(f"⚠️ Encoding check failed: {e}")
+    # ログ出力はキュー経由でバックグラウンドスレッドが書き込む
+    log_pipeline = setup_log_pipeline(
+        log_file=args.log_file,
+        log_file_bytes=args.log_file_bytes,
+        log_file_backups=args.log_file_backups,
+        queue_size=args.log_queue_size,
+    )
 
-    # JSONロガーの設定
-    json_handler = logging.StreamHandler()
-    json_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(message)s"))
-    json_logger.addHandler(json_handler)
+    # stdio ではクライアントがセッション毎に起動するため、診断は省略する
+    if not lazy_init:
+        log_encoding_environment()
 
     logger.info(
         f"🚀 Starting macOS Calendar MCP Server with {args.transport} transport"
@@ -641,30 +3123,143 @@ async def main():
         {
             "transport": args.transport,
             "mount_path": args.mount_path,
+            "lazy_init": lazy_init,
+            "snapshot_path": args.snapshot_path,
+            "profile_sample_rate": profile_sample_rate,
+            "trace_file": args.trace_file,
             "timestamp": datetime.now().isoformat(),
         },
         "SYSTEM",
     )
 
+    admission = None
+    if args.transport != "stdio" and args.max_concurrent_calls > 0:
+        admission = AdmissionController(
+            max_concurrent=args.max_concurrent_calls,
+            max_queued=args.max_queued_calls,
+            queue_timeout=args.queue_timeout,
+            session_rate=args.session_rate,
+            session_burst=args.session_burst,
+        )
+
+    drain = RequestDrain()
+    settings = {"drain_timeout": args.drain_timeout}
+    server_instance = None
+
+    def reload_config(startup: bool = False):
+        """Apply the --config file to the running server (SIGHUP)."""
+        if not args.config:
+            if not startup:
+                logger.info("🔄 SIGHUP received, but no --config file is set")
+            return
+        try:
+            tunables = load_tunables(args.config)
+        except (OSError, ValueError) as e:
+            if startup:
+                raise
+            logger.error(f"Config reload failed, keeping current settings: {e}")
+            return
+        if "log_level" in tunables:
+            logging.getLogger().setLevel(tunables["log_level"])
+        settings["drain_timeout"] = tunables.get(
+            "drain_timeout", settings["drain_timeout"]
+        )
+        changed = server_instance.apply_tunables(tunables)
+        logger.info(
+            f"🔄 Config loaded from {args.config}: {sorted(changed) or 'no changes'}"
+        )
+
     try:
-        server_instance = CalendarMCPServer()
+        server_instance = CalendarMCPServer(
+            lazy_init=lazy_init,
+            snapshot_path=args.snapshot_path,
+            export_dir=args.export_dir,
+            planner_workers=args.query_workers,
+            max_response_bytes=args.max_response_bytes,
+            profile_dir=args.profile_dir,
+            profile_sample_rate=profile_sample_rate,
+            admission=admission,
+            request_timeout=args.request_timeout,
+            agenda_max_age=args.agenda_max_age,
+            trace_path=args.trace_file,
+            idempotency_ttl=args.idempotency_ttl,
+            drain=drain,
+            ready_max_probe_ms=args.ready_max_probe_ms,
+        )
+        reload_config(startup=True)
 
-        # FastMCP provides multiple transport options
-        # Use the async version to avoid event loop conflicts
+        # HTTP は uvicorn を自前で組み立て、停止はドレインの完了後に指示する
+        http = None
         if args.transport == "sse":
-            logger.info(f"Starting SSE server on mount path: {args.mount_path}")
-            await server_instance.mcp.run_sse_async(mount_path=args.mount_path)
-        elif args.transport == "stdio":
-            logger.info("Starting STDIO server")
-            await server_instance.mcp.run_stdio_async()
+            http = http_server(
+                server_instance.mcp.sse_app(args.mount_path),
+                server_instance.mcp.settings,
+            )
         elif args.transport == "streamable-http":
-            logger.info("Starting Streamable HTTP server")
-            await server_instance.mcp.run_streamable_http_async()
-        else:
-            logger.warning(f"Unknown transport: {args.transport}, using fallback")
-            server_instance.mcp.run(
-                transport=args.transport, mount_path=args.mount_path
+            http = http_server(
+                server_instance.mcp.streamable_http_app(),
+                server_instance.mcp.settings,
+            )
+
+        async def serve():
+            # FastMCP provides multiple transport options
+            # Use the async version to avoid event loop conflicts
+            if args.transport == "sse":
+                logger.info(f"Starting SSE server on mount path: {args.mount_path}")
+                await http.serve()
+            elif args.transport == "stdio":
+                logger.info("Starting STDIO server")
+                await server_instance.mcp.run_stdio_async()
+            elif args.transport == "streamable-http":
+                logger.info("Starting Streamable HTTP server")
+                await http.serve()
+            else:
+                logger.warning(f"Unknown transport: {args.transport}, using fallback")
+                server_instance.mcp.run(
+                    transport=args.transport, mount_path=args.mount_path
+                )
+
+        transport = asyncio.ensure_future(serve())
+
+        async def finish_drain():
+            drained = await drain.wait(settings["drain_timeout"])
+            if not drained:
+                logger.warning(
+                    f"⏱️ Drain timed out, abandoning {drain.in_flight} call(s)"
+                )
+            if http is None:
+                transport.cancel()
+                return
+            # 待ち受けを止めて serve() を返させる (時間切れなら残りの接続は待たない)
+            http.force_exit = not drained
+            http.should_exit = True
+
+        def shutdown(signame: str):
+            if drain.draining:
+                # 2 回目のシグナルでは実行中の呼び出しを待たずに止める
+                transport.cancel()
+                return
+            logger.info(f"🛑 {signame} received, draining {drain.in_flight} call(s)...")
+            log_json_data(
+                "SERVER SHUTDOWN",
+                {
+                    "reason": signame,
+                    "in_flight": drain.in_flight,
+                    "drain_timeout": settings["drain_timeout"],
+                    "timestamp": datetime.now().isoformat(),
+                },
+                "SYSTEM",
             )
+            drain.start()
+            asyncio.ensure_future(finish_drain())
+
+        install_signal_handlers(asyncio.get_running_loop(), shutdown, reload_config)
+        try:
+            await transport
+        except asyncio.CancelledError:
+            # シグナルによる停止以外 (呼び出し元のキャンセル) はそのまま伝える
+            if not drain.draining:
+                raise
     except KeyboardInterrupt:
         logger.info("🚫 Server shutdown requested by user")
         log_json_data(
@@ -685,7 +3280,17 @@ async def main():
         )
         raise
     finally:
+        # スナップショット・トレースを閉じてから、最後にログを書き出す
+        if server_instance is not None:
+            await server_instance.aclose(settings["drain_timeout"])
         logger.info("💯 Server stopped")
         log_json_data(
-            "SERVER STOPPED", {"timestamp": datetime.now().isoformat()}, "SYSTEM"
+            "SERVER STOPPED",
+            {
+                "timestamp": datetime.now().isoformat(),
+                "log_pipeline": log_pipeline.stats(),
+                "drain": drain.stats(),
+            },
+            "SYSTEM",
         )
+        log_pipeline.stop()
@@ -0,0 +1,262 @@
+"""Persistent on-disk snapshot of converted calendar events."""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .records import EventRecord
+
+# スキーマ変更時は上げる (古いスナップショットは破棄して作り直す)
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ranges (
+    id INTEGER PRIMARY KEY,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    calendar_name TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    UNIQUE (start_date, end_date, calendar_name)
+);
+CREATE TABLE IF NOT EXISTS events (
+    range_id INTEGER NOT NULL REFERENCES ranges (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    identifier TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    last_modified REAL,
+    title TEXT NOT NULL,
+    calendar TEXT NOT NULL,
+    source TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    all_day INTEGER NOT NULL,
+    external_id TEXT NOT NULL,
+    organizer TEXT NOT NULL,
+    PRIMARY KEY (range_id, position)
+);
+CREATE INDEX IF NOT EXISTS events_identifier ON events (identifier);
+CREATE INDEX IF NOT EXISTS events_external_id ON events (external_id);
+"""
+
+# EventRecord のコンストラクタ引数と同じ順序
+RECORD_COLUMNS = (
+    "identifier, title, start_ts, end_ts, calendar, source, notes, all_day, "
+    "last_modified, external_id, organizer"
+)
+
+# (start_date, end_date, calendar_name) - calendar_name は全カレンダーなら ""
+RangeKey = Tuple[str, str, str]
+
+# 保存しておく範囲の上限 (超えたら取得・照合が古いものから捨てる)
+DEFAULT_MAX_RANGES = 256
+
+
+def _record(row) -> EventRecord:
+    return EventRecord(*row[:7], bool(row[7]), *row[8:])
+
+
+class EventSnapshot:
+    """SQLite-backed store of converted events keyed by query range.
+
+    The store is safe to share between the event loop and worker threads;
+    every operation runs under a single lock on one connection. At most
+    `max_ranges` ranges are kept; saving beyond that drops the ranges that
+    were fetched or reconciled longest ago.
+    """
+
+    def __init__(self, path: str, max_ranges: int = DEFAULT_MAX_RANGES):
+        self.path = path
+        self.max_ranges = max_ranges
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS ranges;"
+                )
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def load(self, key: RangeKey) -> Optional[Tuple[float, List[EventRecord]]]:
+        """Return (fetched_at, records) for a range, or None if never saved."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT id, fetched_at FROM ranges "
+                "WHERE start_date = ? AND end_date = ? AND calendar_name = ?",
+                key,
+            ).fetchone()
+            if found is None:
+                return None
+            range_id, fetched_at = found
+            cursor = self._conn.execute(
+                f"SELECT {RECORD_COLUMNS} FROM events "
+                "WHERE range_id = ? ORDER BY position",
+                (range_id,),
+            )
+            records = [_record(row) for row in cursor]
+        return fetched_at, records
+
+    def count(
+        self, key: RangeKey, positions: Iterable[int] = ()
+    ) -> Optional[Tuple[float, Dict[str, int], List[EventRecord]]]:
+        """Return (fetched_at, events per calendar, records at positions).
+
+        Counts come from the index without loading the range; only the
+        records at the requested positions are read. None if never saved.
+        """
+        wanted = list(positions)
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT id, fetched_at FROM ranges "
+                "WHERE start_date = ? AND end_date = ? AND calendar_name = ?",
+                key,
+            ).fetchone()
+            if found is None:
+                return None
+            range_id, fetched_at = found
+            counts = dict(
+                self._conn.execute(
+                    "SELECT calendar, COUNT(*) FROM events "
+                    "WHERE range_id = ? GROUP BY calendar",
+                    (range_id,),
+                ).fetchall()
+            )
+            records = []
+            if wanted:
+                marks = ", ".join("?" * len(wanted))
+                records = [
+                    _record(row)
+                    for row in self._conn.execute(
+                        f"SELECT {RECORD_COLUMNS} FROM events "
+                        f"WHERE range_id = ? AND position IN ({marks}) "
+                        "ORDER BY position",
+                        [range_id, *wanted],
+                    )
+                ]
+        return fetched_at, counts, records
+
+    def find(self, identifiers: Iterable[str]) -> Dict[str, Tuple[float, EventRecord]]:
+        """Look events up by event or external identifier across all ranges.
+
+        Returns {requested id: (fetched_at, record)} for the ids found, taking
+        the row from the most recently fetched range (and the earliest
+        occurrence of a recurring event).
+        """
+        wanted = list(dict.fromkeys(i for i in identifiers if i))
+        if not wanted:
+            return {}
+        marks = ", ".join("?" * len(wanted))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {RECORD_COLUMNS}, ranges.fetched_at FROM events "
+                "JOIN ranges ON ranges.id = events.range_id "
+                f"WHERE identifier IN ({marks}) OR external_id IN ({marks}) "
+                "ORDER BY ranges.fetched_at DESC, start_ts",
+                wanted * 2,
+            ).fetchall()
+        requested = set(wanted)
+        found: Dict[str, Tuple[float, EventRecord]] = {}
+        for row in rows:
+            for key in (row[0], row[9]):
+                if key in requested and key not in found:
+                    found[key] = (row[-1], _record(row[:-1]))
+        return found
+
+    def save(
+        self,
+        key: RangeKey,
+        records: List[EventRecord],
+        fetched_at: Optional[float] = None,
+    ):
+        """Replace the stored records for a range."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM ranges "
+                    "WHERE start_date = ? AND end_date = ? AND calendar_name = ?",
+                    key,
+                )
+                range_id = self._conn.execute(
+                    "INSERT INTO ranges "
+                    "(start_date, end_date, calendar_name, fetched_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (*key, fetched_at),
+                ).lastrowid
+                self._conn.executemany(
+                    f"INSERT INTO events (range_id, position, {RECORD_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            range_id,
+                            position,
+                            record.identifier,
+                            record.title,
+                            record.start_ts,
+                            record.end_ts,
+                            record.calendar,
+                            record.source,
+                            record.notes,
+                            int(record.all_day),
+                            record.last_modified,
+                            record.external_id,
+                            record.organizer,
+                        )
+                        for position, record in enumerate(records)
+                    ),
+                )
+                # 読み出しの度に書き込まないよう、利用順ではなく fetched_at 順で捨てる
+                # (使われ続ける範囲は照合で touch されるので新しいまま残る)
+                self._conn.execute(
+                    "DELETE FROM ranges WHERE id NOT IN "
+                    "(SELECT id FROM ranges ORDER BY fetched_at DESC, id DESC LIMIT ?)",
+                    (self.max_ranges,),
+                )
+
+    def touch(self, key: RangeKey, fetched_at: Optional[float] = None):
+        """Mark a range as freshly reconciled without rewriting its rows."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE ranges SET fetched_at = ? "
+                    "WHERE start_date = ? AND end_date = ? AND calendar_name = ?",
+                    (fetched_at, *key),
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of stored ranges and events and the newest fetch."""
+        with self._lock:
+            ranges, newest = self._conn.execute(
+                "SELECT COUNT(*), MAX(fetched_at) FROM ranges"
+            ).fetchone()
+            (events,) = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
+        return {"ranges": ranges, "events": events, "newest_fetched_at": newest}
+
+    def invalidate(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ):
+        """Drop stored ranges, e.g. after the server changed events.
+
+        With `start_date`/`end_date` (YYYY-MM-DD, the first and last day of
+        the change) only the ranges overlapping those days are dropped.
+        """
+        with self._lock:
+            with self._conn:
+                if start_date is None or end_date is None:
+                    self._conn.execute("DELETE FROM ranges")
+                    return
+                # 範囲の end_date は含まないので、最終日と同じ日付で始まる範囲は重なる
+                self._conn.execute(
+                    "DELETE FROM ranges WHERE start_date <= ? AND end_date > ?",
+                    (end_date, start_date),
+                )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
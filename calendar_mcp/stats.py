@@ -0,0 +1,97 @@
+"""Server-side aggregation of calendar events."""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from .records import EventRecord
+
+GROUP_BY_CHOICES = ("day", "week", "calendar")
+
+
+class _GroupStats:
+    """Running totals for one summary group."""
+
+    __slots__ = (
+        "count",
+        "busy_seconds",
+        "all_day",
+        "longest_title",
+        "longest_start",
+        "longest_seconds",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.busy_seconds = 0.0
+        self.all_day = 0
+        self.longest_title: Optional[str] = None
+        self.longest_start = 0.0
+        self.longest_seconds = -1.0
+
+    def add(self, record: EventRecord):
+        self.count += 1
+        if record.all_day:
+            self.all_day += 1
+            return
+        seconds = max(record.end_ts - record.start_ts, 0.0)
+        self.busy_seconds += seconds
+        if seconds > self.longest_seconds:
+            self.longest_title = record.title
+            self.longest_start = record.start_ts
+            self.longest_seconds = seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        longest = None
+        if self.longest_title is not None:
+            longest = {
+                "title": self.longest_title,
+                "start": datetime.fromtimestamp(self.longest_start).isoformat(),
+                "minutes": round(self.longest_seconds / 60, 1),
+            }
+        return {
+            "count": self.count,
+            "busy_minutes": round(self.busy_seconds / 60, 1),
+            "all_day": self.all_day,
+            "longest": longest,
+        }
+
+
+def _group_key(group_by: str, start_ts: float, calendar: str) -> str:
+    if group_by == "calendar":
+        return calendar
+    start = datetime.fromtimestamp(start_ts)
+    if group_by == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    return start.strftime("%Y-%m-%d")
+
+
+def summarize_events(
+    records: Iterable[EventRecord], group_by: str = "day"
+) -> Dict[str, Any]:
+    """Aggregate events into per-group statistics in a single pass.
+
+    Timed events contribute their duration to ``busy_minutes`` and compete for
+    ``longest``; all-day events are only counted. Events are grouped by the
+    local date (or ISO week) of their start.
+    """
+    if group_by not in GROUP_BY_CHOICES:
+        raise ValueError(
+            f"Invalid group_by '{group_by}', expected one of {GROUP_BY_CHOICES}"
+        )
+
+    groups: Dict[str, _GroupStats] = {}
+    totals = _GroupStats()
+    for record in records:
+        key = _group_key(group_by, record.start_ts, record.calendar)
+        stats = groups.get(key)
+        if stats is None:
+            stats = groups[key] = _GroupStats()
+        stats.add(record)
+        totals.add(record)
+
+    return {
+        "group_by": group_by,
+        "groups": [{"key": key, **groups[key].as_dict()} for key in sorted(groups)],
+        "totals": totals.as_dict(),
+    }
@@ -0,0 +1,229 @@
+"""Capture tool/resource requests to an NDJSON trace and replay them.
+
+The recorder wraps every handler (like the profiler and the admission
+controller) and appends one line per call with its name, arguments, start
+time, duration and response size. replay() plays a trace back against a
+server at the recorded pace, or faster, keeping the recorded overlap
+between requests, and reports latency distributions.
+"""
+
+import asyncio
+import functools
+import json
+import math
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+TRACE_FILE_ENV = "CALENDAR_MCP_TRACE_FILE"
+
+# 再生時にこれより長い無通信区間は詰める (秒)
+DEFAULT_MAX_IDLE = 60.0
+
+# 書き込み待ちの行数の上限 (超えた分は捨てて数える)
+DEFAULT_QUEUE_SIZE = 10000
+
+_STOP = object()
+
+
+class TraceRecorder:
+    """Append one JSON line per handler call to a trace file.
+
+    The file is opened in append mode and line buffered, so a trace
+    survives a crash up to its last complete request. Calls are written
+    when they finish, so lines are ordered by end time; replay() sorts
+    them by start time.
+
+    Entries are handed to a writer thread through a bounded queue, like
+    the log pipeline, so a slow disk never blocks the event loop; when the
+    queue is full the entry is dropped and counted.
+    """
+
+    def __init__(self, path: str, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.path = path
+        self.recorded = 0
+        self.dropped = 0
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._writer = threading.Thread(
+            target=self._run, name="trace-writer", daemon=True
+        )
+        self._writer.start()
+
+    def wrap(self, name: str, kind: str, fn: Callable) -> Callable:
+        """Return an async handler that records each call to `fn`."""
+
+        @functools.wraps(fn)
+        async def traced(*args, **kwargs):
+            started_at = time.time()
+            began = time.perf_counter()
+            entry: Dict[str, Any] = {
+                "ts": round(started_at, 6),
+                "kind": kind,
+                "name": name,
+                # 省略された引数も既定値で渡ってくる。None は省略として記録
+                # する (明示的な null は int/float 引数の検証で拒否される)
+                "arguments": {k: v for k, v in kwargs.items() if v is not None},
+            }
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException as e:
+                # キャンセル (クライアント切断) も記録してから伝える
+                entry["error"] = type(e).__name__
+                raise
+            else:
+                if isinstance(result, str):
+                    entry["bytes"] = len(result.encode("utf-8"))
+                return result
+            finally:
+                entry["duration_ms"] = round((time.perf_counter() - began) * 1000, 3)
+                self._write(entry)
+
+        return traced
+
+    def flush(self):
+        """Block until every queued entry has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write the queued entries, stop the writer and close the file."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._file.close()
+
+    def _write(self, entry: Dict[str, Any]):
+        if not self._writer.is_alive():
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        # JSON への変換もこのスレッドで行う
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is _STOP:
+                    return
+                line = json.dumps(entry, ensure_ascii=False, default=str)
+                self._file.write(line + "\n")
+                self.recorded += 1
+            finally:
+                self._queue.task_done()
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """Read a trace, skipping a truncated last line, ordered by start time."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+def schedule(
+    entries: List[Dict[str, Any]], max_idle: Optional[float] = DEFAULT_MAX_IDLE
+) -> List[float]:
+    """Return each entry's start offset in seconds from the first one.
+
+    Gaps longer than max_idle (e.g. between two captured server runs) are
+    shortened to max_idle.
+    """
+    offsets = []
+    offset = 0.0
+    previous = None
+    for entry in entries:
+        if previous is not None:
+            gap = entry["ts"] - previous
+            offset += min(gap, max_idle) if max_idle else gap
+        offsets.append(offset)
+        previous = entry["ts"]
+    return offsets
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    """Return count, mean and nearest-rank percentiles of latencies in ms."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def percentile(p: float) -> float:
+        return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(percentile(50), 3),
+        "p90_ms": round(percentile(90), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def _play(server, entry: Dict[str, Any]) -> Any:
+    arguments = entry.get("arguments") or {}
+    if entry.get("kind") == "resource":
+        return await server.mcp.read_resource(entry["name"].format(**arguments))
+    return await server.mcp.call_tool(entry["name"], arguments)
+
+
+async def replay(
+    server,
+    entries: List[Dict[str, Any]],
+    speed: float = 1.0,
+    max_idle: Optional[float] = DEFAULT_MAX_IDLE,
+) -> Dict[str, Any]:
+    """Play trace entries against `server` and report latencies.
+
+    speed scales the recorded pace (2.0 plays twice as fast); 0 sends every
+    request at once. Requests start on schedule whether or not earlier ones
+    have finished, so the recorded concurrency is preserved.
+    """
+    offsets = schedule(entries, max_idle)
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    latencies: Dict[str, List[float]] = {}
+    lags: List[float] = []
+    errors: List[Dict[str, Any]] = []
+
+    async def play(entry, offset):
+        if speed > 0:
+            delay = began + offset / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # 予定時刻からの遅れ (イベントループが詰まっている目安)
+            lags.append(max(loop.time() - began - offset / speed, 0.0) * 1000)
+        start = time.perf_counter()
+        try:
+            await _play(server, entry)
+        except Exception as e:
+            errors.append({"name": entry["name"], "error": str(e)})
+        latencies.setdefault(entry["name"], []).append(
+            (time.perf_counter() - start) * 1000
+        )
+
+    await asyncio.gather(
+        *(play(entry, offset) for entry, offset in zip(entries, offsets))
+    )
+    recorded = [e["duration_ms"] for e in entries if "duration_ms" in e]
+    return {
+        "requests": len(entries),
+        "errors": len(errors),
+        "error_samples": errors[:10],
+        "speed": speed,
+        "wall_s": round(loop.time() - began, 3),
+        "latency": latency_summary([v for vs in latencies.values() for v in vs]),
+        "by_name": {
+            name: latency_summary(vs) for name, vs in sorted(latencies.items())
+        },
+        "schedule_lag": latency_summary(lags),
+        "recorded_latency": latency_summary(recorded),
+    }
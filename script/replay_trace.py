@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Replay a captured request trace against the server with a fake backend.
+
+Capture a trace with `--trace-file` (or CALENDAR_MCP_TRACE_FILE), then:
+
+    uv run python script/replay_trace.py trace.ndjson --speed 4
+
+The server runs in-process on the in-memory EventKit stand-ins used by the
+tests, filled with synthetic events covering the dates in the trace, and
+a JSON report of latency distributions is printed.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# フェイクはパッケージに含めず tests/ に置いているので、ここでパスを通す
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "tests"))
+
+from fakes import FAKE_EVENTKIT, FakeEventStore, fake_foundation  # noqa: E402
+
+import calendar_mcp.server as server_module  # noqa: E402
+from calendar_mcp.trace import DEFAULT_MAX_IDLE, load_trace, replay  # noqa: E402
+
+CALENDARS = ("Work", "Home", "Family", "Holidays")
+
+
+def trace_dates(entries):
+    """Return the first and last date any request in the trace asks for."""
+    dates = []
+    for entry in entries:
+        arguments = entry.get("arguments") or {}
+        specs = [arguments] + list(arguments.get("queries") or [])
+        for spec in specs:
+            for key in ("start_date", "end_date"):
+                try:
+                    dates.append(datetime.strptime(spec[key], "%Y-%m-%d").date())
+                except (KeyError, TypeError, ValueError):
+                    continue
+    if not dates:
+        today = date.today()
+        return today - timedelta(days=7), today + timedelta(days=30)
+    # アジェンダ (今日から1週間) も範囲に含める
+    return min(dates + [date.today()]), max(dates + [date.today()]) + timedelta(days=7)
+
+
+def populate(store, first, last, per_day):
+    """Add `per_day` events a day between 08:00 and 20:00, spread over calendars."""
+    day = first
+    count = 0
+    while day <= last:
+        start_of_day = datetime.combine(day, datetime.min.time())
+        for i in range(per_day):
+            start = start_of_day + timedelta(hours=8, minutes=i * 720 // per_day)
+            duration = timedelta(minutes=(15, 30, 45, 60, 90)[count % 5])
+            notes = f"Agenda item {count}" if count % 3 == 0 else None
+            store.add_event(
+                f"Meeting {count}",
+                start,
+                start + duration,
+                CALENDARS[count % len(CALENDARS)],
+                notes=notes,
+            )
+            count += 1
+        day += timedelta(days=1)
+
+
+async def run(args):
+    entries = load_trace(args.trace)
+    if not entries:
+        sys.exit(f"No requests in {args.trace}")
+
+    store = FakeEventStore(
+        latency=args.fetch_latency_ms / 1000,
+        latency_per_event=args.latency_per_event_us / 1_000_000,
+    )
+    populate(store, *trace_dates(entries), args.events_per_day)
+
+    server_module.EVENTKIT_AVAILABLE = True
+    server_module.EventKit = FAKE_EVENTKIT
+    server_module.Foundation = fake_foundation()
+    server = server_module.CalendarMCPServer(
+        lazy_init=True,
+        snapshot_path=args.snapshot_path,
+        planner_workers=args.query_workers,
+    )
+    server.event_store = store
+
+    report = await replay(server, entries, speed=args.speed, max_idle=args.max_idle)
+    report["backend"] = {"events": len(store.events), "fetches": store.fetch_count}
+    await server.agenda.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="NDJSON trace written with --trace-file")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed (1 = recorded pace, 10 = ten times faster, 0 = all at once)",
+    )
+    parser.add_argument(
+        "--max-idle",
+        type=float,
+        default=DEFAULT_MAX_IDLE,
+        help="Shorten recorded gaps longer than this many seconds (0 keeps them)",
+    )
+    parser.add_argument("--events-per-day", type=int, default=20)
+    parser.add_argument(
+        "--fetch-latency-ms", type=float, default=0.0, help="Simulated fetch latency"
+    )
+    parser.add_argument(
+        "--latency-per-event-us",
+        type=float,
+        default=0.0,
+        help="Simulated fetch latency per matched event",
+    )
+    parser.add_argument("--snapshot-path", type=str, default=None)
+    parser.add_argument("--query-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # 再生中のリクエストログは結果を読みにくくするので抑える
+    server_module.json_logger.disabled = True
+    sys.stdout.write(json.dumps(asyncio.run(run(args)), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
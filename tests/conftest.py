@@ -9,7 +9,41 @@ import pytest
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from fakes import (  # noqa: E402
+    FAKE_EVENTKIT,
+    FakeEventStore,
+    FakeObjC,
+    fake_foundation,
+)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture
+def fake_objc(monkeypatch):
+    """Patch calendar_mcp.server with an objc module that counts pools."""
+    objc = FakeObjC()
+    monkeypatch.setattr("calendar_mcp.server.objc", objc)
+    return objc
+
+
+@pytest.fixture
+def fake_store(monkeypatch, fake_objc):
+    """Patch calendar_mcp.server with an in-memory EventKit backend."""
+    monkeypatch.setattr("calendar_mcp.server.EVENTKIT_AVAILABLE", True)
+    monkeypatch.setattr("calendar_mcp.server.EventKit", FAKE_EVENTKIT)
+    monkeypatch.setattr("calendar_mcp.server.Foundation", fake_foundation())
+    return FakeEventStore()
+
+
+@pytest.fixture
+def fake_server(fake_store):
+    """Create a CalendarMCPServer wired to the in-memory EventKit backend."""
+    from calendar_mcp.server import CalendarMCPServer
+
+    server = CalendarMCPServer(lazy_init=True)
+    server.event_store = fake_store
+    return server
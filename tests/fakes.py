@@ -0,0 +1,658 @@
+"""In-memory stand-ins for the EventKit / Foundation objects used by the server.
+
+Shared by the test suite and script/replay_trace.py.
+"""
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List, Optional
+
+
+class FakeNSDate:
+    """Minimal NSDate replacement backed by a POSIX timestamp."""
+
+    def __init__(self, timestamp: float):
+        self._timestamp = float(timestamp)
+
+    @classmethod
+    def date(cls) -> "FakeNSDate":
+        return cls(datetime.now().timestamp())
+
+    @classmethod
+    def dateWithTimeIntervalSince1970_(cls, timestamp: float) -> "FakeNSDate":
+        return cls(timestamp)
+
+    @classmethod
+    def dateWithTimeIntervalSinceNow_(cls, seconds: float) -> "FakeNSDate":
+        return cls(datetime.now().timestamp() + seconds)
+
+    def timeIntervalSince1970(self) -> float:
+        return self._timestamp
+
+    def dateByAddingTimeInterval_(self, seconds: float) -> "FakeNSDate":
+        return FakeNSDate(self._timestamp + seconds)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeNSDate) and self._timestamp == other._timestamp
+
+    def __hash__(self):
+        return hash(self._timestamp)
+
+    def __str__(self):
+        # NSDate の description と同じく UTC で表示する
+        dt = datetime.fromtimestamp(self._timestamp, tz=timezone.utc)
+        return dt.strftime("%Y-%m-%d %H:%M:%S +0000")
+
+
+class FakeSource:
+    def __init__(self, title: str):
+        self._title = title
+
+    def title(self) -> str:
+        return self._title
+
+
+class FakeCalendar:
+    def __init__(self, title: str, identifier: str, source: str = "iCloud"):
+        self._title = title
+        self._identifier = identifier
+        self._source = FakeSource(source)
+
+    def title(self) -> str:
+        return self._title
+
+    def calendarIdentifier(self) -> str:
+        return self._identifier
+
+    def type(self) -> int:
+        return 1
+
+    def source(self) -> FakeSource:
+        return self._source
+
+    def allowsContentModifications(self) -> bool:
+        return True
+
+
+class FakeEvent:
+    """Subset of the EKEvent API used by the server."""
+
+    def __init__(
+        self,
+        title: Optional[str],
+        start: datetime,
+        end: datetime,
+        calendar: FakeCalendar,
+        notes: Optional[str] = None,
+        all_day: bool = False,
+        identifier: str = "",
+        external_identifier: str = "",
+    ):
+        self._title = title
+        self._start = FakeNSDate(start.timestamp())
+        self._end = FakeNSDate(end.timestamp())
+        self._calendar = calendar
+        self._notes = notes
+        self._all_day = all_day
+        self._identifier = identifier
+        self._external_identifier = external_identifier
+        self._modified = FakeNSDate(datetime.now().timestamp())
+        # 未コミットの変更前の状態 (FakeEventStore.reset で戻す)
+        self._committed = None
+        # 繰り返しイベントのオカレンスとして展開された場合の情報
+        self._rules: List[FakeRecurrenceRule] = []
+        self._detached = False
+        self._occurrence = self._start
+        self._organizer: Optional[FakeParticipant] = None
+
+    def title(self):
+        return self._title
+
+    def startDate(self) -> FakeNSDate:
+        return self._start
+
+    def endDate(self) -> FakeNSDate:
+        return self._end
+
+    def calendar(self) -> FakeCalendar:
+        return self._calendar
+
+    def notes(self):
+        return self._notes
+
+    def isAllDay(self) -> bool:
+        return self._all_day
+
+    def eventIdentifier(self) -> str:
+        return self._identifier
+
+    def calendarItemExternalIdentifier(self) -> str:
+        return self._external_identifier
+
+    def lastModifiedDate(self) -> FakeNSDate:
+        return self._modified
+
+    def organizer(self):
+        return self._organizer
+
+    def hasRecurrenceRules(self) -> bool:
+        return bool(self._rules)
+
+    def recurrenceRules(self):
+        return list(self._rules) or None
+
+    def isDetached(self) -> bool:
+        return self._detached
+
+    def occurrenceDate(self) -> FakeNSDate:
+        return self._occurrence
+
+    @classmethod
+    def eventWithEventStore_(cls, store) -> "FakeEvent":
+        epoch = datetime.fromtimestamp(0)
+        return cls(None, epoch, epoch, None)
+
+    def update(self, **changes):
+        """Apply attribute changes and bump the last-modified date."""
+        for name, value in changes.items():
+            setattr(self, f"_{name}", value)
+        self._modified = FakeNSDate(self._modified.timeIntervalSince1970() + 1)
+
+    def _edit(self, **changes):
+        if self._committed is None:
+            self._committed = dict(vars(self))
+        self.update(**changes)
+
+    def setTitle_(self, title):
+        self._edit(title=title)
+
+    def setNotes_(self, notes):
+        self._edit(notes=notes)
+
+    def setStartDate_(self, date):
+        self._edit(start=date)
+
+    def setEndDate_(self, date):
+        self._edit(end=date)
+
+    def setCalendar_(self, calendar):
+        self._edit(calendar=calendar)
+
+
+class FakeParticipant:
+    def __init__(self, name: str, email: str):
+        self._name = name
+        self._url = f"mailto:{email}"
+
+    def name(self) -> str:
+        return self._name
+
+    def URL(self) -> str:
+        return self._url
+
+
+class FakeRecurrenceEnd:
+    def __init__(self, end_date: Optional[datetime] = None, count: int = 0):
+        self._end = FakeNSDate(end_date.timestamp()) if end_date else None
+        self._count = count
+
+    def endDate(self):
+        return self._end
+
+    def occurrenceCount(self) -> int:
+        return self._count
+
+
+class FakeDayOfWeek:
+    def __init__(self, day: int, week: int = 0):
+        self._day = day
+        self._week = week
+
+    def dayOfTheWeek(self) -> int:
+        return self._day
+
+    def weekNumber(self) -> int:
+        return self._week
+
+
+class FakeRecurrenceRule:
+    """Subset of EKRecurrenceRule (frequency: 0 daily ... 3 yearly)."""
+
+    def __init__(
+        self,
+        frequency: int = 0,
+        interval: int = 1,
+        days: Optional[List[FakeDayOfWeek]] = None,
+        days_of_month: Optional[List[int]] = None,
+        months: Optional[List[int]] = None,
+        end: Optional[FakeRecurrenceEnd] = None,
+    ):
+        self._frequency = frequency
+        self._interval = interval
+        self._days = days
+        self._days_of_month = days_of_month
+        self._months = months
+        self._end = end
+
+    def frequency(self) -> int:
+        return self._frequency
+
+    def interval(self) -> int:
+        return self._interval
+
+    def daysOfTheWeek(self):
+        return self._days
+
+    def daysOfTheMonth(self):
+        return self._days_of_month
+
+    def monthsOfTheYear(self):
+        return self._months
+
+    def recurrenceEnd(self):
+        return self._end
+
+
+# NSDateComponents の未設定値
+UNDEFINED_COMPONENT = 0x7FFFFFFFFFFFFFFF
+
+
+class FakeDateComponents:
+    def __init__(self, when: datetime, with_time: bool):
+        self._when = when
+        self._with_time = with_time
+
+    def year(self) -> int:
+        return self._when.year
+
+    def month(self) -> int:
+        return self._when.month
+
+    def day(self) -> int:
+        return self._when.day
+
+    def hour(self) -> int:
+        return self._when.hour if self._with_time else UNDEFINED_COMPONENT
+
+    def minute(self) -> int:
+        return self._when.minute if self._with_time else UNDEFINED_COMPONENT
+
+
+class FakeReminder:
+    """Subset of the EKReminder API used by the server."""
+
+    def __init__(
+        self,
+        title: Optional[str],
+        calendar: FakeCalendar,
+        due: Optional[datetime] = None,
+        due_has_time: bool = False,
+        completed_at: Optional[datetime] = None,
+        priority: int = 0,
+        notes: Optional[str] = None,
+    ):
+        self._title = title
+        self._calendar = calendar
+        self.due = due
+        self._due_has_time = due_has_time
+        self.completed_at = completed_at
+        self._priority = priority
+        self._notes = notes
+
+    def title(self):
+        return self._title
+
+    def calendar(self) -> FakeCalendar:
+        return self._calendar
+
+    def dueDateComponents(self):
+        if self.due is None:
+            return None
+        return FakeDateComponents(self.due, self._due_has_time)
+
+    def isCompleted(self) -> bool:
+        return self.completed_at is not None
+
+    def completionDate(self):
+        if self.completed_at is None:
+            return None
+        return FakeNSDate(self.completed_at.timestamp())
+
+    def priority(self) -> int:
+        return self._priority
+
+    def notes(self):
+        return self._notes
+
+
+def _in_range(when: Optional[datetime], start, end) -> bool:
+    if start is None and end is None:
+        return True
+    if when is None:
+        return False
+    ts = when.timestamp()
+    if start is not None and ts < start.timeIntervalSince1970():
+        return False
+    return end is None or ts < end.timeIntervalSince1970()
+
+
+class FakeEventStore:
+    """In-memory EKEventStore replacement."""
+
+    # EKEventStore.authorizationStatusForEntityType_ の戻り値 (3: full access)
+    authorization_status = 3
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_per_event: float = 0.0,
+        max_span_seconds: Optional[float] = None,
+    ):
+        self.calendars: List[FakeCalendar] = []
+        self.events: List[FakeEvent] = []
+        self.fetch_count = 0
+        self.lookup_count = 0
+        # 遅延コミットの模擬: 保存・削除は commit_ まで確定せず reset で戻る
+        self.saves: List[tuple] = []
+        self.removals: List[tuple] = []
+        self.commits = 0
+        self.fail_saves: set = set()
+        self.fail_commit = False
+        self._staged_removals: List[FakeEvent] = []
+        # 取得時の遅延 (固定 + イベント数比例) と EventKit の述語期間上限を模擬する
+        self.latency = latency
+        self.latency_per_event = latency_per_event
+        self.max_span_seconds = max_span_seconds
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        # リマインダーと完了ハンドラ系 API (ハンドラは別スレッドから呼ぶ)
+        self.reminder_lists: List[FakeCalendar] = []
+        self.reminders: List[FakeReminder] = []
+        self.access_granted = True
+        self.access_requests = 0
+        self.completion_delay = 0.0
+        self.hang_fetches = False
+        # カレンダー一覧取得 (readiness の応答確認) の遅延
+        self.calendar_latency = 0.0
+        self.cancelled_fetches: List[int] = []
+        self._fetch_ids = 0
+
+    def add_calendar(self, title: str, source: str = "iCloud") -> FakeCalendar:
+        for calendar in self.calendars:
+            if calendar.title() == title:
+                return calendar
+        calendar = FakeCalendar(title, f"cal-{len(self.calendars) + 1}", source)
+        self.calendars.append(calendar)
+        return calendar
+
+    def add_event(
+        self,
+        title: Optional[str],
+        start: datetime,
+        end: datetime,
+        calendar: str = "Work",
+        notes: Optional[str] = None,
+        all_day: bool = False,
+    ) -> FakeEvent:
+        event = FakeEvent(
+            title,
+            start,
+            end,
+            self.add_calendar(calendar),
+            notes=notes,
+            all_day=all_day,
+            identifier=f"evt-{len(self.events) + 1}",
+            external_identifier=f"ext-{len(self.events) + 1}",
+        )
+        self.events.append(event)
+        return event
+
+    def add_series(
+        self,
+        title: str,
+        start: datetime,
+        duration: timedelta,
+        count: int,
+        every: timedelta = timedelta(days=1),
+        rule: Optional[FakeRecurrenceRule] = None,
+        calendar: str = "Work",
+    ) -> List[FakeEvent]:
+        """Add the expanded occurrences of a recurring event."""
+        rule = rule or FakeRecurrenceRule()
+        identifier = f"series-{len(self.events) + 1}"
+        occurrences = []
+        for i in range(count):
+            begin = start + every * i
+            event = self.add_event(title, begin, begin + duration, calendar)
+            event._identifier = identifier
+            event._external_identifier = f"ext-{identifier}"
+            event._rules = [rule]
+            occurrences.append(event)
+        return occurrences
+
+    def add_reminder(
+        self, title: Optional[str], list_name: str = "Reminders", **kwargs
+    ) -> FakeReminder:
+        reminder_list = next(
+            (c for c in self.reminder_lists if c.title() == list_name), None
+        )
+        if reminder_list is None:
+            reminder_list = FakeCalendar(
+                list_name, f"list-{len(self.reminder_lists) + 1}"
+            )
+            self.reminder_lists.append(reminder_list)
+        reminder = FakeReminder(title, reminder_list, **kwargs)
+        self.reminders.append(reminder)
+        return reminder
+
+    def _complete(self, completion, *values):
+        timer = threading.Timer(self.completion_delay, completion, values)
+        timer.daemon = True
+        timer.start()
+
+    # EKEventStore API
+
+    @classmethod
+    def authorizationStatusForEntityType_(cls, entity_type):
+        return cls.authorization_status
+
+    def calendarsForEntityType_(self, entity_type):
+        if self.calendar_latency:
+            time.sleep(self.calendar_latency)
+        if entity_type == FAKE_EVENTKIT.EKEntityTypeReminder:
+            return list(self.reminder_lists)
+        return list(self.calendars)
+
+    def requestAccessToEntityType_completion_(self, entity_type, completion):
+        self.access_requests += 1
+        self._complete(completion, self.access_granted, None)
+
+    def predicateForRemindersInCalendars_(self, calendars):
+        return ("all", None, None, calendars)
+
+    def predicateForIncompleteRemindersWithDueDateStarting_ending_calendars_(
+        self, start, end, calendars
+    ):
+        return ("incomplete", start, end, calendars)
+
+    def predicateForCompletedRemindersWithCompletionDateStarting_ending_calendars_(
+        self, start, end, calendars
+    ):
+        return ("completed", start, end, calendars)
+
+    def fetchRemindersMatchingPredicate_completion_(self, predicate, completion):
+        status, start, end, calendars = predicate
+        matched = []
+        for reminder in self.reminders:
+            if reminder.calendar() not in calendars:
+                continue
+            if status == "incomplete":
+                ok = not reminder.isCompleted() and _in_range(reminder.due, start, end)
+            elif status == "completed":
+                ok = reminder.isCompleted() and _in_range(
+                    reminder.completed_at, start, end
+                )
+            else:
+                ok = True
+            if ok:
+                matched.append(reminder)
+        self._fetch_ids += 1
+        if not self.hang_fetches:
+            self._complete(completion, matched)
+        return self._fetch_ids
+
+    def cancelFetchRequest_(self, request_id):
+        self.cancelled_fetches.append(request_id)
+
+    def predicateForEventsWithStartDate_endDate_calendars_(self, start, end, calendars):
+        return (start.timeIntervalSince1970(), end.timeIntervalSince1970(), calendars)
+
+    def eventsMatchingPredicate_(self, predicate):
+        start, end, calendars = predicate
+        if self.max_span_seconds is not None:
+            end = min(end, start + self.max_span_seconds)
+        with self._lock:
+            self.fetch_count += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            matched = [
+                event
+                for event in self.events
+                if event.calendar() in calendars
+                and event.startDate().timeIntervalSince1970() < end
+                and event.endDate().timeIntervalSince1970() > start
+            ]
+            delay = self.latency + self.latency_per_event * len(matched)
+            if delay:
+                time.sleep(delay)
+            return sorted(matched, key=lambda e: e.startDate().timeIntervalSince1970())
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def eventWithIdentifier_(self, identifier):
+        with self._lock:
+            self.lookup_count += 1
+        return next((e for e in self.events if e.eventIdentifier() == identifier), None)
+
+    def calendarItemsWithExternalIdentifier_(self, identifier):
+        with self._lock:
+            self.lookup_count += 1
+        return [
+            e for e in self.events if e.calendarItemExternalIdentifier() == identifier
+        ]
+
+    def saveEvent_span_error_(self, event, span, error):
+        # 新規イベントは識別子を振って即時に保存する
+        if event not in self.events:
+            event._identifier = f"evt-{len(self.events) + 1}"
+            event._external_identifier = f"ext-{len(self.events) + 1}"
+            self.events.append(event)
+        event._committed = None
+        return True, None
+
+    def saveEvent_span_commit_error_(self, event, span, commit, error):
+        if event.eventIdentifier() in self.fail_saves:
+            return False, "Event cannot be saved"
+        self.saves.append((event.eventIdentifier(), span, commit))
+        if commit:
+            return self.commit_(None)
+        return True, None
+
+    def removeEvent_span_commit_error_(self, event, span, commit, error):
+        if event.eventIdentifier() in self.fail_saves:
+            return False, "Event cannot be removed"
+        self.removals.append((event.eventIdentifier(), span, commit))
+        self._staged_removals.append(event)
+        if commit:
+            return self.commit_(None)
+        return True, None
+
+    def commit_(self, error):
+        if self.fail_commit:
+            return False, "Commit failed"
+        self.commits += 1
+        for event in self._staged_removals:
+            if event in self.events:
+                self.events.remove(event)
+        self._staged_removals = []
+        for event in self.events:
+            event._committed = None
+        return True, None
+
+    def reset(self):
+        self._staged_removals = []
+        for event in self.events:
+            if event._committed is not None:
+                event.__dict__.update(event._committed)
+                event._committed = None
+
+    def defaultCalendarForNewEvents(self):
+        return self.calendars[0] if self.calendars else None
+
+
+FAKE_EVENTKIT = SimpleNamespace(
+    EKEvent=FakeEvent,
+    EKEventStore=FakeEventStore,
+    EKEntityTypeEvent=0,
+    EKEntityTypeReminder=1,
+    EKSpanThisEvent=0,
+    EKSpanFutureEvents=1,
+    EKEventStoreChangedNotification="EKEventStoreChangedNotification",
+)
+
+
+class FakeNotificationCenter:
+    """Stand-in for NSNotificationCenter that delivers posts synchronously."""
+
+    def __init__(self):
+        self.observers: List[tuple] = []
+
+    def defaultCenter(self) -> "FakeNotificationCenter":
+        return self
+
+    def addObserverForName_object_queue_usingBlock_(self, name, obj, queue, block):
+        observer = (name, obj, block)
+        self.observers.append(observer)
+        return observer
+
+    def removeObserver_(self, observer):
+        self.observers.remove(observer)
+
+    def post(self, name: str, obj=None):
+        for observed, sender, block in self.observers:
+            if observed == name and (sender is None or sender is obj):
+                block(SimpleNamespace(name=name, object=obj))
+
+
+def fake_foundation() -> SimpleNamespace:
+    """Return a Foundation stand-in with its own notification center."""
+    return SimpleNamespace(
+        NSDate=FakeNSDate, NSNotificationCenter=FakeNotificationCenter()
+    )
+
+
+class FakeObjC:
+    """Stand-in for the objc module that records autorelease pools per thread."""
+
+    def __init__(self):
+        self.pools: Counter = Counter()
+        self.open = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def autorelease_pool(self):
+        with self._lock:
+            self.pools[threading.current_thread().name] += 1
+            self.open += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.open -= 1
@@ -0,0 +1,218 @@
+"""Test cases for admission control (calendar_mcp.admission)."""
+
+import asyncio
+import json
+from contextlib import AsyncExitStack
+
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from calendar_mcp.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    TokenBucket,
+)
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _server(fake_store, **limits):
+    server = CalendarMCPServer(lazy_init=True, admission=AdmissionController(**limits))
+    server.event_store = fake_store
+    # 完了ハンドラを遅らせて、呼び出しが実際に並行して滞留するようにする
+    fake_store.completion_delay = 0.2
+    fake_store.add_reminder("Buy milk")
+    return server
+
+
+async def _clients(server, count, stack):
+    return [
+        await stack.enter_async_context(
+            create_connected_server_and_client_session(server.mcp._mcp_server)
+        )
+        for _ in range(count)
+    ]
+
+
+async def _reminders(client):
+    result = await client.call_tool("get_macos_reminders", {})
+    return json.loads(result.content[0].text)
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    def test_burst_then_refill(self):
+        """A full bucket allows `burst` calls, then refills at `rate`."""
+        bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+        assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.take(0.0) == pytest.approx(0.5)
+        assert bucket.take(0.5) == 0.0
+
+
+class TestAdmissionController:
+    """Test cases for AdmissionController."""
+
+    async def test_concurrency_cap_and_queue(self):
+        """Calls beyond the cap wait; beyond the queue they are rejected."""
+        controller = AdmissionController(
+            max_concurrent=2, max_queued=1, queue_timeout=1.0, session_rate=0
+        )
+        release = asyncio.Event()
+        peak = []
+
+        async def call():
+            async with controller.admit("s"):
+                peak.append(controller.active)
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(call()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.waiting) == (2, 1)
+
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            async with controller.admit("s"):
+                pass
+        assert rejected.value.reason == "busy"
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert max(peak) == 2
+        assert controller.stats()["sessions"]["s"] == {
+            "admitted": 3,
+            "rejected_busy": 1,
+            "rejected_rate": 0,
+            "in_flight": 0,
+        }
+
+    async def test_queue_timeout(self):
+        """A queued call gives up after queue_timeout."""
+        controller = AdmissionController(
+            max_concurrent=1, max_queued=5, queue_timeout=0.05, session_rate=0
+        )
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit("a"):
+                await release.wait()
+
+        task = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError):
+            async with controller.admit("b"):
+                pass
+        assert controller.waiting == 0
+        release.set()
+        await task
+
+    async def test_lower_cap_peak(self):
+        """After lowering the cap no more than the new cap run at once."""
+        controller = AdmissionController(
+            max_concurrent=4, max_queued=10, queue_timeout=1.0, session_rate=0
+        )
+        release = asyncio.Event()
+        peak = []
+
+        async def call():
+            async with controller.admit("s"):
+                peak.append(controller.active)
+                await release.wait()
+
+        running = asyncio.ensure_future(call())
+        await asyncio.sleep(0)
+        controller.configure(max_concurrent=2)
+        tasks = [asyncio.ensure_future(call()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.waiting) == (2, 3)
+
+        release.set()
+        await asyncio.gather(running, *tasks)
+        assert max(peak) == 2
+
+        release.clear()
+        peak.clear()
+        tasks = [asyncio.ensure_future(call()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert controller.active == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        assert max(peak) == 2
+
+    async def test_raise_cap_admits_queued(self):
+        """Raising the cap lets queued calls in without waiting for a release."""
+        controller = AdmissionController(
+            max_concurrent=1, max_queued=10, queue_timeout=1.0, session_rate=0
+        )
+        release = asyncio.Event()
+
+        async def call():
+            async with controller.admit("s"):
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(call()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.waiting) == (1, 2)
+        controller.configure(max_concurrent=3)
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.waiting) == (3, 0)
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.active == 0
+
+
+class TestAdmissionServer:
+    """Test cases for admission control with concurrent in-process clients."""
+
+    async def test_global_cap(self, fake_store):
+        """Concurrent sessions never exceed the cap; overflow is busy."""
+        server = _server(
+            fake_store,
+            max_concurrent=2,
+            max_queued=2,
+            queue_timeout=5.0,
+            session_rate=0,
+        )
+        async with AsyncExitStack() as stack:
+            clients = await _clients(server, 6, stack)
+            results = await asyncio.gather(*(_reminders(c) for c in clients))
+
+        served = [r for r in results if isinstance(r, list)]
+        busy = [r for r in results if isinstance(r, dict)]
+        assert len(served) == 4
+        assert len(busy) == 2
+        assert all(r["reason"] == "busy" for r in busy)
+        stats = server.admission.stats()
+        assert stats["totals"]["admitted"] == 4
+        assert stats["totals"]["rejected_busy"] == 2
+        assert len(stats["sessions"]) == 6
+
+    async def test_per_session_rate(self, fake_store):
+        """A runaway session is rate limited without affecting others."""
+        server = _server(
+            fake_store, max_concurrent=50, session_rate=0.1, session_burst=3
+        )
+        async with AsyncExitStack() as stack:
+            runaway, polite = await _clients(server, 2, stack)
+            flood = await asyncio.gather(*(_reminders(runaway) for _ in range(10)))
+            polite_result = await _reminders(polite)
+
+            limited = [r for r in flood if isinstance(r, dict)]
+            assert len(limited) == 7
+            assert limited[0]["reason"] == "rate_limited"
+            assert limited[0]["retry_after"] > 0
+            assert polite_result[0]["title"] == "Buy milk"
+
+            stats = json.loads(
+                (await polite.call_tool("get_admission_stats", {})).content[0].text
+            )
+        counters = sorted(
+            (s["admitted"], s["rejected_rate"]) for s in stats["sessions"].values()
+        )
+        assert counters == [(1, 0), (3, 7)]
+
+    async def test_disabled_by_default(self, fake_server):
+        """Without a controller handlers are not wrapped."""
+        tools = {tool.name for tool in await fake_server.mcp.list_tools()}
+        assert fake_server.admission is None
+        assert "get_admission_stats" not in tools
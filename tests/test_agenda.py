@@ -0,0 +1,202 @@
+"""Test cases for precomputed agenda views (calendar_mcp.agenda)."""
+
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import calendar_mcp.agenda as agenda_module
+import calendar_mcp.server as server_module
+from calendar_mcp.agenda import AgendaViews, view_range
+from calendar_mcp.snapshot import EventSnapshot
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+class FakeRenderer:
+    """Renderer that records the requested ranges."""
+
+    def __init__(self, cacheable: bool = True, delay: float = 0.0):
+        self.calls = []
+        self.cacheable = cacheable
+        self.delay = delay
+
+    async def __call__(self, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return f"{start_date}/{end_date}#{len(self.calls)}", self.cacheable
+
+
+class Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _views(render, clock, max_age=None):
+    views = AgendaViews(render, max_age, now=clock)
+    # 背景の再作成はここでは止め、呼び出し毎の挙動だけを見る
+    views._start = lambda: None
+    return views
+
+
+class TestViewRange:
+    """Test cases for view_range."""
+
+    def test_ranges(self):
+        """Ranges are whole days with an exclusive end date."""
+        wednesday = date(2024, 5, 8)
+        assert view_range("today", wednesday) == ("2024-05-08", "2024-05-09")
+        assert view_range("tomorrow", wednesday) == ("2024-05-09", "2024-05-10")
+        assert view_range("week", wednesday) == ("2024-05-06", "2024-05-13")
+        assert view_range("week", date(2024, 5, 12)) == ("2024-05-06", "2024-05-13")
+
+    def test_invalid(self):
+        """Unknown views are rejected."""
+        with pytest.raises(ValueError, match="Invalid view 'month'"):
+            view_range("month", date(2024, 5, 8))
+
+
+class TestAgendaViews:
+    """Test cases for AgendaViews."""
+
+    async def test_served_from_memory(self):
+        """A current view is returned without rendering again."""
+        render = FakeRenderer()
+        views = _views(render, Clock(datetime(2024, 5, 8, 9)))
+        first = await views.get("today")
+        assert await views.get("today") is first
+        assert render.calls == [("2024-05-08", "2024-05-09")]
+        assert (views.hits, views.renders) == (1, 1)
+
+    async def test_invalidate_and_rollover(self):
+        """A store change or a new day makes the view render again."""
+        render = FakeRenderer()
+        clock = Clock(datetime(2024, 5, 8, 23, 59))
+        views = _views(render, clock)
+        await views.get("today")
+        views.invalidate()
+        await views.get("today")
+        clock.now += timedelta(minutes=2)
+        assert await views.get("today") == "2024-05-09/2024-05-10#3"
+
+    async def test_max_age(self, monkeypatch):
+        """Views older than max_age are rebuilt."""
+        render = FakeRenderer()
+        monotonic = [100.0]
+        monkeypatch.setattr(agenda_module.time, "monotonic", lambda: monotonic[0])
+        views = _views(render, Clock(datetime(2024, 5, 8, 9)), max_age=60.0)
+        await views.get("week")
+        monotonic[0] += 30
+        await views.get("week")
+        monotonic[0] += 31
+        await views.get("week")
+        assert len(render.calls) == 2
+
+    async def test_errors_not_kept(self):
+        """Responses the renderer marks as not cacheable are rendered each time."""
+        render = FakeRenderer(cacheable=False)
+        views = _views(render, Clock(datetime(2024, 5, 8, 9)))
+        await views.get("today")
+        await views.get("today")
+        assert len(render.calls) == 2
+
+    async def test_concurrent_requests_share_render(self):
+        """Requests arriving during a render wait for it instead of starting more."""
+        render = FakeRenderer(delay=0.01)
+        views = _views(render, Clock(datetime(2024, 5, 8, 9)))
+        results = await asyncio.gather(*(views.get("today") for _ in range(5)))
+        assert len(set(results)) == 1
+        assert len(render.calls) == 1
+
+    async def test_background_refresh(self):
+        """The refresher builds every view and rebuilds them after a change."""
+        render = FakeRenderer()
+        views = AgendaViews(render, None, now=Clock(datetime(2024, 5, 8, 9)))
+        await views.get("today")
+        await asyncio.sleep(0.01)
+        assert views.stats()["views"] == ["today", "tomorrow", "week"]
+        assert len(render.calls) == 3
+        views.invalidate()
+        await asyncio.sleep(0.01)
+        assert len(render.calls) == 6
+        assert await views.get("week") == "2024-05-06/2024-05-13#6"
+        await views.close()
+
+
+class TestAgendaTool:
+    """Test cases for get_macos_calendar_agenda and calendar://agenda/{view}."""
+
+    @pytest.fixture
+    def today(self, fake_store):
+        start = datetime.combine(date.today(), datetime.min.time())
+        fake_store.add_event(
+            "Standup", start + timedelta(hours=9), start + timedelta(hours=10)
+        )
+        fake_store.add_event(
+            "Review",
+            start + timedelta(days=1, hours=14),
+            start + timedelta(days=1, hours=15),
+        )
+        return fake_store
+
+    async def test_tool_and_resource(self, fake_server, today):
+        """Both entry points return the same prebuilt response."""
+        content, _ = await fake_server.mcp.call_tool("get_macos_calendar_agenda", {})
+        rows = json.loads(content[0].text)
+        assert [row["title"] for row in rows] == ["Standup"]
+        contents = await fake_server.mcp.read_resource("calendar://agenda/tomorrow")
+        assert [row["title"] for row in json.loads(contents[0].content)] == ["Review"]
+        await asyncio.sleep(0.05)
+        fetches = today.fetch_count
+        content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_agenda", {"view": "today"}
+        )
+        assert json.loads(content[0].text) == rows
+        assert today.fetch_count == fetches
+        await fake_server.agenda.close()
+
+    async def test_store_change_notification(self, fake_server, today):
+        """An EKEventStoreChangedNotification makes the next request fresh."""
+        fake_server._watch_store_changes()
+        await fake_server._get_agenda("today")
+        await fake_server.agenda.close()
+        start = datetime.combine(date.today(), datetime.min.time())
+        today.add_event(
+            "Lunch", start + timedelta(hours=12), start + timedelta(hours=13)
+        )
+        server_module.Foundation.NSNotificationCenter.post(
+            "EKEventStoreChangedNotification", today
+        )
+        rows = json.loads(await fake_server._get_agenda("today"))
+        assert [row["title"] for row in rows] == ["Standup", "Lunch"]
+        await fake_server.agenda.close()
+
+    async def test_store_change_drops_snapshot(self, fake_server, today, tmp_path):
+        """With a snapshot, a store change still reaches the rebuilt agenda."""
+        fake_server.snapshot = EventSnapshot(str(tmp_path / "snap.db"))
+        fake_server.snapshot_max_age = 3600
+        fake_server._watch_store_changes()
+        await fake_server._get_agenda("today")
+        await fake_server.agenda.close()
+        start = datetime.combine(date.today(), datetime.min.time())
+        today.add_event(
+            "Lunch", start + timedelta(hours=12), start + timedelta(hours=13)
+        )
+        server_module.Foundation.NSNotificationCenter.post(
+            "EKEventStoreChangedNotification", today
+        )
+        rows = json.loads(await fake_server._get_agenda("today"))
+        assert [row["title"] for row in rows] == ["Standup", "Lunch"]
+        await fake_server.aclose()
+
+    async def test_invalid_view(self, fake_server, today):
+        """Unknown views get an error without rendering anything."""
+        content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_agenda", {"view": "month"}
+        )
+        assert "Invalid view 'month'" in json.loads(content[0].text)[0]["error"]
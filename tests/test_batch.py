@@ -0,0 +1,172 @@
+"""Test cases for batched event queries (calendar_mcp.batch)."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.batch import MAX_BATCH_QUERIES, BatchQuery, merge_ranges
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def calendars(fake_store):
+    fake_store.add_event("Standup", datetime(2024, 5, 6, 9), datetime(2024, 5, 6, 10))
+    fake_store.add_event(
+        "Swim", datetime(2024, 5, 8, 18), datetime(2024, 5, 8, 19), "Family"
+    )
+    fake_store.add_event(
+        "Picnic", datetime(2024, 5, 11, 12), datetime(2024, 5, 11, 15), "Family"
+    )
+    fake_store.add_event(
+        "Holiday", datetime(2024, 6, 10), datetime(2024, 6, 11), "Holidays"
+    )
+    return fake_store
+
+
+async def _batch(server, queries):
+    content, _ = await server.mcp.call_tool(
+        "batch_get_macos_calendar_events", {"queries": queries}
+    )
+    return json.loads(content[0].text)
+
+
+def _titles(rows):
+    return [row["title"] for row in rows]
+
+
+class TestMergeRanges:
+    """Test cases for merge_ranges."""
+
+    def test_overlapping_and_touching(self):
+        """Overlapping and adjacent ranges merge; gaps start a new group."""
+        a = BatchQuery("a", 0, 10, frozenset({"Work"}))
+        b = BatchQuery("b", 5, 20, frozenset({"Family"}))
+        c = BatchQuery("c", 20, 30, frozenset({"Work"}))
+        d = BatchQuery("d", 50, 60)
+        groups = merge_ranges([d, c, b, a])
+        assert [(g[0], g[1], g[2], [q.key for q in g[3]]) for g in groups] == [
+            (0, 30, frozenset({"Work", "Family"}), ["a", "b", "c"]),
+            (50, 60, None, ["d"]),
+        ]
+
+    def test_all_calendars_wins(self):
+        """A query for every calendar widens its whole group."""
+        groups = merge_ranges(
+            [BatchQuery("a", 0, 10, frozenset({"Work"})), BatchQuery("b", 5, 15)]
+        )
+        assert groups[0][2] is None
+
+
+class TestBatchTool:
+    """Test cases for batch_get_macos_calendar_events."""
+
+    async def test_results_per_query(self, fake_server, calendars):
+        """Each query gets its own events while overlapping ranges share a fetch."""
+        result = await _batch(
+            fake_server,
+            [
+                {
+                    "key": "today",
+                    "start_date": "2024-05-06",
+                    "end_date": "2024-05-07",
+                    "calendars": ["Work"],
+                },
+                {
+                    "key": "week",
+                    "start_date": "2024-05-06",
+                    "end_date": "2024-05-13",
+                    "calendars": ["Family"],
+                    "fields": ["title", "start"],
+                },
+                {
+                    "start_date": "2024-06-01",
+                    "end_date": "2024-07-01",
+                    "calendars": "Holidays",
+                },
+            ],
+        )
+        results = result["results"]
+        assert list(results) == ["today", "week", "2"]
+        assert _titles(results["today"]) == ["Standup"]
+        assert results["week"] == [
+            {"title": "Swim", "start": str(calendars.events[1].startDate())},
+            {"title": "Picnic", "start": str(calendars.events[2].startDate())},
+        ]
+        assert _titles(results["2"]) == ["Holiday"]
+        assert (result["queries"], result["fetches"]) == (3, 2)
+        assert calendars.fetch_count == 2
+
+    async def test_invalid_queries(self, fake_server, calendars):
+        """Invalid specs get an error entry without failing the others."""
+        result = await _batch(
+            fake_server,
+            [
+                {"start_date": "2024-05-06", "end_date": "2024-05-13"},
+                {"start_date": "2024-05-06", "calendars": ["Work"]},
+                {
+                    "start_date": "2024-05-06",
+                    "end_date": "2024-05-13",
+                    "calendars": ["Nope"],
+                },
+                {
+                    "start_date": "2024-05-06",
+                    "end_date": "2024-05-13",
+                    "fields": ["location"],
+                },
+            ],
+        )
+        results = result["results"]
+        assert _titles(results["0"]) == ["Standup", "Swim", "Picnic"]
+        assert results["1"] == {"error": "Missing end_date"}
+        assert results["2"] == {"error": "Calendar 'Nope' not found"}
+        assert "Invalid field 'location'" in results["3"]["error"]
+        assert result["fetches"] == 1
+
+    async def test_limits(self, fake_server, calendars):
+        """Empty and oversized batches are rejected."""
+        assert await _batch(fake_server, []) == {"error": "No queries given"}
+        spec = {"start_date": "2024-05-06", "end_date": "2024-05-07"}
+        result = await _batch(fake_server, [spec] * (MAX_BATCH_QUERIES + 1))
+        assert "Too many queries" in result["error"]
+
+    async def test_duplicate_keys(self, fake_server, calendars):
+        """Queries that would share a result key are rejected up front."""
+        spec = {"start_date": "2024-05-06", "end_date": "2024-05-07"}
+        result = await _batch(fake_server, [{**spec, "key": "a"}, {**spec, "key": "a"}])
+        assert result == {"error": "Duplicate query key 'a'"}
+        # 明示したキーが他のクエリの位置と重なる場合も同じ
+        result = await _batch(fake_server, [spec, {**spec, "key": "0"}])
+        assert result == {"error": "Duplicate query key '0'"}
+        assert calendars.fetch_count == 0
+
+    async def test_response_budget(self, fake_server, fake_store):
+        """max_response_bytes bounds the whole batch and each result pages on."""
+        for i in range(60):
+            start = datetime(2024, 5, 6, 8) + timedelta(minutes=10 * i)
+            fake_store.add_event(f"Meeting {i}", start, start + timedelta(minutes=5))
+        fake_server.max_response_bytes = 4_000
+        queries = [
+            {"key": "all", "start_date": "2024-05-06", "end_date": "2024-05-07"},
+            {
+                "key": "titles",
+                "start_date": "2024-05-06",
+                "end_date": "2024-05-07",
+                "fields": ["title"],
+            },
+        ]
+        content, _ = await fake_server.mcp.call_tool(
+            "batch_get_macos_calendar_events", {"queries": queries}
+        )
+        size = len(content[0].text.encode("utf-8"))
+        assert 3_500 < size <= 4_000
+        results = json.loads(content[0].text)["results"]
+        marker = results["all"][-1]
+        assert marker["truncated"] and marker["total"] == 60
+        assert 0 < marker["returned"] < 60
+        # 続きは offset を付けて同じクエリを再実行する
+        offset = marker["continuation"]["offset"]
+        rest = await _batch(fake_server, [{**queries[0], "offset": offset}])
+        assert rest["results"]["all"][0]["title"] == f"Meeting {offset}"
+        assert results["titles"][0] == {"title": "Meeting 0"}
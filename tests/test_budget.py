@@ -0,0 +1,233 @@
+"""Test cases for byte-budgeted event responses (calendar_mcp.budget)."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.budget import ELLIPSIS, encode_batch, encode_columnar, encode_rows
+from calendar_mcp.formats import from_columnar
+from calendar_mcp.records import EventRecord
+from calendar_mcp.server import safe_json_dumps
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _records(count, notes=""):
+    return [
+        EventRecord(
+            f"e{i}",
+            f"Event {i}",
+            3600.0 * i,
+            3600.0 * i + 900,
+            "Work" if i % 2 else "家族",
+            notes=notes,
+        )
+        for i in range(count)
+    ]
+
+
+def _size(text):
+    return len(text.encode("utf-8"))
+
+
+class TestEncodeRows:
+    """Test cases for encode_rows."""
+
+    def test_unbounded_matches_safe_json_dumps(self):
+        """Without a budget the output is byte-identical to the old encoding."""
+        records = _records(5, notes="メモ")
+        payload, text = encode_rows(records)
+        assert text == safe_json_dumps([r.to_dict() for r in records])
+        assert payload == [r.to_dict() for r in records]
+        assert encode_rows([]) == ([], "[]")
+
+    def test_fits_within_budget(self):
+        """A response that fits is returned without a marker."""
+        records = _records(3)
+        _, text = encode_rows(records, max_bytes=10_000)
+        assert text == safe_json_dumps([r.to_dict() for r in records])
+
+    def test_cut_at_event_boundary(self):
+        """Oversized lists are cut between events and report a continuation."""
+        records = _records(200)
+        for budget in (600, 2_000, 7_777):
+            payload, text = encode_rows(records, max_bytes=budget)
+            assert _size(text) <= budget
+            assert json.loads(text) == payload
+            marker = payload[-1]
+            returned = marker["returned"]
+            assert marker["truncated"] is True
+            assert marker["total"] == 200
+            assert marker["continuation"] == {"offset": returned}
+            assert payload[:-1] == [r.to_dict() for r in records[:returned]]
+
+    def test_continuation_covers_everything(self):
+        """Following continuation offsets yields every event exactly once."""
+        records = _records(120)
+        seen, offset = [], 0
+        while True:
+            payload, text = encode_rows(records, max_bytes=3_000, offset=offset)
+            if payload and "truncated" in payload[-1]:
+                seen.extend(payload[:-1])
+                offset = payload[-1]["continuation"]["offset"]
+            else:
+                seen.extend(payload)
+                break
+        assert seen == [r.to_dict() for r in records]
+
+    def test_notes_trimmed_before_cutting(self):
+        """Long notes are shortened so more events fit before the cut."""
+        records = _records(4, notes="長いメモ " * 500)
+        payload, text = encode_rows(records, max_bytes=3_000)
+        assert _size(text) <= 3_000
+        marker = payload[-1]
+        assert marker["notes_trimmed"] >= 1
+        trimmed = payload[0]["notes"]
+        assert trimmed.endswith(ELLIPSIS)
+        assert records[0].notes.startswith(trimmed[: -len(ELLIPSIS)])
+
+    def test_stops_converting_after_budget(self, monkeypatch):
+        """Events past the cut are never converted to dicts."""
+        records = _records(1_000)
+        calls = []
+        original = EventRecord.to_dict
+        monkeypatch.setattr(
+            EventRecord,
+            "to_dict",
+            lambda self: calls.append(self) or original(self),
+        )
+        payload, _ = encode_rows(records, max_bytes=2_000)
+        assert len(calls) == payload[-1]["returned"] + 1
+
+    def test_oversized_event_makes_progress(self):
+        """An event too big even when trimmed still advances the offset."""
+        records = _records(3)
+        records[1].title = "長い" * 2500
+        records[1].notes = "n" * 5000
+        seen, offset = [], 0
+        for _ in range(len(records) + 1):
+            payload, text = encode_rows(records, max_bytes=600, offset=offset)
+            marker = payload[-1] if "truncated" in payload[-1] else None
+            events = payload[:-1] if marker else payload
+            assert events, "every page returns at least one event"
+            seen.extend(event["id"] for event in events)
+            if not marker or not marker["continuation"]:
+                break
+            offset = marker["continuation"]["offset"]
+        assert seen == ["e0", "e1", "e2"]
+
+    def test_title_trimmed_to_fit(self):
+        """A long title is shortened when trimming the notes is not enough."""
+        records = _records(2)
+        records[0].title = "長い" * 2500
+        payload, text = encode_rows(records, max_bytes=2_000)
+        assert _size(text) <= 2_000
+        marker = payload[-1]
+        assert marker["titles_trimmed"] == 1
+        assert marker["over_budget"] is False
+        assert payload[0]["title"].endswith(ELLIPSIS)
+        assert payload[0]["id"] == "e0"
+
+
+class TestEncodeColumnar:
+    """Test cases for encode_columnar."""
+
+    def test_cut_and_continue(self):
+        """Columnar pages stay within budget and decode to the full list."""
+        records = _records(300, notes="n" * 40)
+        rows, offset = [], 0
+        while True:
+            payload, text = encode_columnar(records, max_bytes=2_500, offset=offset)
+            assert _size(text) <= 2_500
+            assert json.loads(text) == payload
+            rows.extend(from_columnar(payload))
+            if not payload.get("continuation"):
+                break
+            offset = payload["continuation"]["offset"]
+        assert [row["title"] for row in rows] == [r.title for r in records]
+        for row, record in zip(rows, records):
+            # 境界のイベントはメモが短縮されて返ることがある
+            assert record.notes.startswith(row["notes"].rstrip(ELLIPSIS))
+
+    def test_oversized_event_makes_progress(self):
+        """The columnar encoder also never returns an empty page."""
+        records = _records(2)
+        records[0].title = "x" * 5000
+        payload, _ = encode_columnar(records, max_bytes=300)
+        assert payload["count"] == 1
+        assert payload["over_budget"] is True
+        assert payload["continuation"] == {"offset": 1}
+        payload, _ = encode_columnar(records, max_bytes=300, offset=1)
+        assert from_columnar(payload)[0]["id"] == "e1"
+
+    def test_unbounded(self):
+        """Without a budget no truncation keys are added."""
+        payload, _ = encode_columnar(_records(10))
+        assert payload["count"] == 10
+        assert "truncated" not in payload
+
+
+class TestEncodeBatch:
+    """Test cases for encode_batch."""
+
+    def test_matches_safe_json_dumps(self):
+        """Spliced results give the same text as encoding the whole response."""
+        response = {
+            "results": {"予定": [], "bad": [{"error": "Unknown calendar 'X'"}]},
+            "queries": 4,
+            "fetches": 1,
+        }
+        encoded = {}
+        for key, max_bytes in (("all", None), ("page", 600)):
+            response["results"][key], encoded[key] = encode_rows(
+                _records(6, notes="メモ"), max_bytes, depth=3
+            )
+        encoded["予定"] = encode_rows([], depth=3)[1]
+        assert encode_batch(response, encoded) == safe_json_dumps(response)
+        assert response["results"]["page"][-1]["truncated"]
+
+        empty = {"results": {}, "queries": 0, "fetches": 0}
+        assert encode_batch(empty, {}) == safe_json_dumps(empty)
+
+
+class TestBudgetTool:
+    """Test cases for max_bytes on get_macos_calendar_events."""
+
+    async def test_tool_max_bytes(self, fake_server, fake_store):
+        """The tool honours max_bytes and offset."""
+        begin = datetime(2024, 1, 1, 8)
+        for i in range(40):
+            start = begin + timedelta(hours=2 * i)
+            fake_store.add_event(f"Event {i}", start, start + timedelta(hours=1))
+        args = {"start_date": "2024-01-01", "end_date": "2024-01-10"}
+
+        content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events", {**args, "max_bytes": 1_500}
+        )
+        first = json.loads(content[0].text)
+        assert _size(content[0].text) <= 1_500
+        offset = first[-1]["continuation"]["offset"]
+
+        content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events", {**args, "max_bytes": 0, "offset": offset}
+        )
+        rest = json.loads(content[0].text)
+        assert [e["title"] for e in first[:-1] + rest] == [
+            f"Event {i}" for i in range(40)
+        ]
+
+    async def test_server_default(self, fake_server, fake_store):
+        """The server-wide limit applies when max_bytes is omitted."""
+        fake_server.max_response_bytes = 1_000
+        begin = datetime(2024, 1, 1, 8)
+        for i in range(20):
+            start = begin + timedelta(hours=i)
+            fake_store.add_event(f"Event {i}", start, start + timedelta(hours=1))
+
+        content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-03"},
+        )
+        assert _size(content[0].text) <= 1_000
+        assert json.loads(content[0].text)[-1]["truncated"] is True
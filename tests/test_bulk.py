@@ -0,0 +1,200 @@
+"""Test cases for the bulk update, shift and delete tools."""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.bulk import objc_result
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def offsite(fake_store):
+    """Three off-site sessions and one unrelated event in another week."""
+    for day in range(3):
+        start = datetime(2024, 3, 4 + day, 9)
+        fake_store.add_event(f"Off-site {day + 1}", start, start + timedelta(hours=8))
+    fake_store.add_event(
+        "Dentist", datetime(2024, 3, 12, 9), datetime(2024, 3, 12, 10), "Personal"
+    )
+    return fake_store
+
+
+async def _call(server, name, **arguments):
+    content, _ = await server.mcp.call_tool(name, arguments)
+    return json.loads(content[0].text)
+
+
+def _starts(store):
+    return [event.startDate().timeIntervalSince1970() for event in store.events]
+
+
+class TestBulkTools:
+    """Test cases for bulk edits through the server."""
+
+    async def test_shift_range_single_commit(self, fake_server, offsite):
+        """A range shift moves every event in it and commits once."""
+        before = _starts(offsite)
+        result = await _call(
+            fake_server,
+            "shift_macos_calendar_events",
+            start_date="2024-03-04",
+            end_date="2024-03-09",
+            days=1,
+        )
+        assert result["committed"] is True
+        assert (result["requested"], result["succeeded"], result["failed"]) == (
+            3,
+            3,
+            0,
+        )
+        assert [r["status"] for r in result["results"]] == ["saved"] * 3
+        assert _starts(offsite) == [t + DAY for t in before[:3]] + before[3:]
+        assert offsite.events[0].endDate().timeIntervalSince1970() == before[0] + (
+            DAY + 8 * 3600
+        )
+        assert offsite.commits == 1
+        assert all(commit is False for _, _, commit in offsite.saves)
+
+    async def test_update_by_ids(self, fake_server, offsite):
+        """Fields are set on the selected events; unknown ids are reported."""
+        result = await _call(
+            fake_server,
+            "update_macos_calendar_events",
+            event_ids=["evt-1", "ext-3", "missing"],
+            notes="Bring laptop",
+            new_calendar="Personal",
+        )
+        assert [(r["id"], r["status"]) for r in result["results"]] == [
+            ("evt-1", "saved"),
+            ("evt-3", "saved"),
+            ("missing", "not_found"),
+        ]
+        assert result["failed"] == 1
+        assert offsite.events[0].notes() == "Bring laptop"
+        assert offsite.events[2].calendar().title() == "Personal"
+        assert offsite.events[1].notes() is None
+
+    async def test_delete_series_future_span(self, fake_server, offsite):
+        """With span='future' each series is removed once from its first occurrence."""
+        for event in offsite.events[:3]:
+            event._identifier = "series-1"
+        result = await _call(
+            fake_server,
+            "delete_macos_calendar_events",
+            start_date="2024-03-01",
+            end_date="2024-03-31",
+            span="future",
+        )
+        assert [r["status"] for r in result["results"]] == ["deleted", "deleted"]
+        assert offsite.removals == [("series-1", 1, False), ("evt-4", 1, False)]
+        assert offsite.commits == 1
+
+    async def test_partial_failure(self, fake_server, offsite):
+        """Failed items are reported and the rest is still committed."""
+        offsite.fail_saves = {"evt-2"}
+        result = await fake_server._update_events(
+            ["evt-1", "evt-2"], None, None, None, title="Renamed"
+        )
+        assert result["committed"] is True
+        assert [r["status"] for r in result["results"]] == ["saved", "failed"]
+        assert result["results"][1]["error"] == "Event cannot be saved"
+        assert offsite.events[0].title() == "Renamed"
+
+    async def test_atomic_rolls_back(self, fake_server, offsite):
+        """In atomic mode one failure discards every staged change."""
+        offsite.fail_saves = {"evt-2"}
+        result = await fake_server._shift_events(
+            ["evt-1", "evt-2"], None, None, None, minutes=30, atomic=True
+        )
+        assert result["committed"] is False
+        assert [r["status"] for r in result["results"]] == ["rolled_back", "failed"]
+        assert offsite.events[0].startDate().timeIntervalSince1970() == (
+            datetime(2024, 3, 4, 9).timestamp()
+        )
+        assert offsite.commits == 0
+
+    async def test_commit_failure(self, fake_server, offsite):
+        """A failed commit resets the store and fails every item."""
+        offsite.fail_commit = True
+        result = await fake_server._update_events(
+            ["evt-1"], None, None, None, title="Renamed"
+        )
+        assert result["committed"] is False
+        assert result["results"][0]["status"] == "failed"
+        assert "Commit failed" in result["results"][0]["error"]
+        assert offsite.events[0].title() == "Off-site 1"
+
+    async def test_validation(self, fake_server, offsite):
+        """Bad selections, spans and no-op changes are rejected up front."""
+        neither = await fake_server._bulk_edit("delete_events", None, None, None, None)
+        both = await fake_server._bulk_edit(
+            "delete_events", ["evt-1"], "2024-03-01", "2024-03-31", None
+        )
+        assert neither == both
+        assert "either event_ids" in neither["error"]
+        span = await fake_server._bulk_edit(
+            "delete_events", ["evt-1"], None, None, None, span="all"
+        )
+        assert "Invalid span" in span["error"]
+        noop = await fake_server._update_events(["evt-1"], None, None, None)
+        assert "Nothing to update" in noop["error"]
+        noop = await fake_server._shift_events(["evt-1"], None, None, None)
+        assert "Nothing to shift" in noop["error"]
+        unknown = await fake_server._update_events(
+            ["evt-1"], None, None, None, new_calendar="Nope"
+        )
+        assert "Calendar 'Nope' not found" in unknown["error"]
+        assert offsite.commits == 0
+
+    async def test_invalidates_snapshot(self, offsite, tmp_path):
+        """A committed bulk edit drops stale snapshot ranges."""
+        server = CalendarMCPServer(
+            lazy_init=True, snapshot_path=str(tmp_path / "snap.db")
+        )
+        server.event_store = offsite
+        await server._get_events("2024-03-01", "2024-03-31")
+        await server._shift_events(["evt-1"], None, None, None, days=1)
+        assert server.snapshot.load(("2024-03-01", "2024-03-31", "")) is None
+
+    async def test_concurrent_edits_serialised(self, fake_server, offsite):
+        """One edit's rollback does not discard another edit's staged changes."""
+        offsite.fail_saves = {"evt-4"}
+        save = offsite.saveEvent_span_commit_error_
+
+        def slow_save(event, span, commit, error):
+            time.sleep(0.02)
+            return save(event, span, commit, error)
+
+        offsite.saveEvent_span_commit_error_ = slow_save
+        renamed, shifted = await asyncio.gather(
+            fake_server._update_events(
+                ["evt-1", "evt-2"], None, None, None, title="Renamed"
+            ),
+            fake_server._shift_events(
+                ["evt-3", "evt-4"], None, None, None, days=1, atomic=True
+            ),
+        )
+        assert renamed["committed"] is True
+        assert shifted["committed"] is False
+        assert [event.title() for event in offsite.events[:2]] == ["Renamed"] * 2
+        assert offsite.events[2].startDate().timeIntervalSince1970() == (
+            datetime(2024, 3, 6, 9).timestamp()
+        )
+
+
+class TestObjcResult:
+    """Test cases for objc_result."""
+
+    def test_shapes(self):
+        """PyObjC tuples and bare bools are both accepted."""
+        assert objc_result((True, None)) == (True, None)
+        assert objc_result((False, "denied")) == (False, "denied")
+        assert objc_result(True) == (True, None)
@@ -0,0 +1,188 @@
+"""Test cases for request deadlines and cancellation (calendar_mcp.deadline)."""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.budget import encode_rows
+from calendar_mcp.deadline import RequestAbortedError, RequestDeadline
+from calendar_mcp.records import EventRecord
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def slow_server(fake_store):
+    """A server with 10 one-day windows, each taking 50ms to fetch."""
+    server = CalendarMCPServer(lazy_init=True, planner_window_days=1, planner_workers=1)
+    server.event_store = fake_store
+    fake_store.latency = 0.05
+    for day in range(10):
+        start = datetime(2024, 1, 1 + day, 9)
+        fake_store.add_event(f"Day {day}", start, start + timedelta(hours=1))
+    return server
+
+
+async def _wait_for_abort(server):
+    # 打ち切りはワーカースレッドが次の確認点で記録する
+    for _ in range(100):
+        if server.abort_metrics.as_dict()["total_aborted"]:
+            break
+        await asyncio.sleep(0.01)
+    return server.abort_metrics.as_dict()
+
+
+class TestRequestDeadline:
+    """Test cases for RequestDeadline."""
+
+    def test_no_timeout(self):
+        """Without a timeout only cancellation aborts."""
+        deadline = RequestDeadline(None)
+        assert deadline.remaining() is None
+        deadline.check("fetch")
+        deadline.cancel()
+        with pytest.raises(RequestAbortedError) as aborted:
+            deadline.check("convert")
+        assert (aborted.value.stage, aborted.value.reason) == ("convert", "cancelled")
+
+    def test_expiry(self):
+        """An expired deadline aborts with deadline_exceeded."""
+        deadline = RequestDeadline(0.01)
+        time.sleep(0.02)
+        assert deadline.remaining() == 0.0
+        with pytest.raises(RequestAbortedError, match="deadline exceeded"):
+            deadline.check("fetch")
+        # 最初の理由が保持される
+        deadline.cancel("cancelled")
+        assert deadline.reason == "deadline_exceeded"
+
+    def test_encoder_check(self):
+        """The encoder check callback stops serialisation."""
+        records = [EventRecord("e1", "t", 0.0, 900.0, "Work")] * 200
+        calls = []
+
+        def check():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RequestAbortedError("serialize", "cancelled")
+
+        with pytest.raises(RequestAbortedError):
+            encode_rows(records, check=check)
+        assert len(calls) == 2
+
+
+class TestDeadlineServer:
+    """Test cases for deadlines in the events tool."""
+
+    async def test_deadline_stops_fetch(self, slow_server, fake_store):
+        """A short deadline returns an error and skips the remaining windows."""
+        started = time.perf_counter()
+        content, _ = await slow_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-11", "timeout": 0.12},
+        )
+        elapsed = time.perf_counter() - started
+        result = json.loads(content[0].text)
+
+        assert result == [{"error": "Request deadline exceeded during fetch"}]
+        assert elapsed < 0.4
+        metrics = await _wait_for_abort(slow_server)
+        assert metrics["aborted"] == {"fetch:deadline_exceeded": 1}
+        assert metrics["windows_skipped"] > 0
+        assert fake_store.fetch_count < 10
+
+    async def test_no_deadline(self, slow_server):
+        """A timeout of 0 disables the deadline."""
+        _, text = await slow_server._render_events(
+            "2024-01-01", "2024-01-11", timeout=0
+        )
+        assert len(json.loads(text)) == 10
+        assert slow_server.abort_metrics.as_dict()["total_aborted"] == 0
+
+    async def test_client_cancel(self, slow_server, fake_store):
+        """Cancelling the handler task stops the worker thread."""
+        task = asyncio.ensure_future(
+            slow_server._render_events("2024-01-01", "2024-01-11")
+        )
+        await asyncio.sleep(0.08)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        metrics = await _wait_for_abort(slow_server)
+        assert metrics["aborted"] == {"fetch:cancelled": 1}
+        assert metrics["windows_skipped"] > 0
+        assert fake_store.fetch_count < 10
+
+    async def test_convert_abort(self, slow_server, fake_store, monkeypatch):
+        """Slow conversion is interrupted between chunks of events."""
+        fake_store.latency = 0.0
+        start = datetime(2024, 1, 1, 12)
+        for i in range(200):
+            fake_store.add_event(f"Busy {i}", start, start + timedelta(minutes=10))
+        original = EventRecord.from_event.__func__
+
+        def slow_from_event(cls, event):
+            time.sleep(0.002)
+            return original(cls, event)
+
+        monkeypatch.setattr(EventRecord, "from_event", classmethod(slow_from_event))
+
+        _, text = await slow_server._render_events(
+            "2024-01-01", "2024-01-02", timeout=0.05
+        )
+        assert "deadline exceeded" in json.loads(text)[0]["error"]
+        metrics = await _wait_for_abort(slow_server)
+        assert metrics["aborted"] == {"convert:deadline_exceeded": 1}
+        assert 0 < metrics["events_discarded"] < 201
+
+    async def test_batch_convert_abort(self, slow_server, fake_store, monkeypatch):
+        """Batch conversion stops within a chunk of events once aborted."""
+        fake_store.latency = 0.0
+        start = datetime(2024, 1, 1, 12)
+        for i in range(200):
+            fake_store.add_event(f"Busy {i}", start, start + timedelta(minutes=10))
+        original = EventRecord.from_event.__func__
+
+        def slow_from_event(cls, event):
+            time.sleep(0.002)
+            return original(cls, event)
+
+        monkeypatch.setattr(EventRecord, "from_event", classmethod(slow_from_event))
+        slow_server.request_timeout = 0.05
+
+        _, text = await slow_server._batch_events(
+            [{"start_date": "2024-01-01", "end_date": "2024-01-02"}]
+        )
+        assert "deadline exceeded" in json.loads(text)["error"]
+        metrics = await _wait_for_abort(slow_server)
+        assert metrics["aborted"] == {"convert:deadline_exceeded": 1}
+
+    async def test_snapshot_miss_off_loop(self, fake_store, tmp_path):
+        """A snapshot miss is fetched in a worker under the deadline."""
+        server = CalendarMCPServer(
+            lazy_init=True, snapshot_path=str(tmp_path / "snap.db")
+        )
+        server.event_store = fake_store
+        fake_store.latency = 0.5
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        probe = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        _, text = await server._render_events("2024-01-01", "2024-01-02", timeout=0.1)
+        elapsed = time.perf_counter() - started
+        probe.cancel()
+
+        assert json.loads(text) == [{"error": "Request deadline exceeded during fetch"}]
+        assert elapsed < 0.4
+        # フェッチ中もイベントループは止まらない
+        assert len(ticks) >= 5
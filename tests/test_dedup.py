@@ -0,0 +1,98 @@
+"""Test cases for cross-calendar duplicate collapsing (calendar_mcp.dedup)."""
+
+import json
+from datetime import datetime
+
+import pytest
+from fakes import FakeParticipant
+
+from calendar_mcp.dedup import MergedRecord, dedupe_records
+from calendar_mcp.records import EventRecord
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _record(identifier, calendar, external_id="", title="Sync", start=0.0):
+    return EventRecord(
+        identifier, title, start, start + 900.0, calendar, external_id=external_id
+    )
+
+
+@pytest.fixture
+def shared(fake_store):
+    """One meeting in three calendars plus a same-titled one in another slot."""
+    start, end = datetime(2024, 4, 2, 10), datetime(2024, 4, 2, 11)
+    boss = FakeParticipant("Boss", "boss@example.com")
+    for calendar in ("Work", "iCloud", "Shared"):
+        event = fake_store.add_event("Planning", start, end, calendar)
+        event._organizer = boss
+    # 別アカウントのコピーは外部 ID が異なることがある
+    fake_store.events[1]._external_identifier = "ext-1"
+    fake_store.add_event("Planning", start, end, "Work")
+    fake_store.add_event(
+        "Planning", datetime(2024, 4, 3, 10), datetime(2024, 4, 3, 11), "iCloud"
+    )
+    return fake_store
+
+
+async def _events(server, **arguments):
+    arguments = {"start_date": "2024-04-01", "end_date": "2024-04-08", **arguments}
+    content, _ = await server.mcp.call_tool("get_macos_calendar_events", arguments)
+    return json.loads(content[0].text)
+
+
+class TestDedupeRecords:
+    """Test cases for dedupe_records."""
+
+    def test_external_id_and_fields(self):
+        """Either fingerprint matches; order and the first copy are kept."""
+        records = [
+            _record("a", "Work", "uid-1"),
+            _record("b", "iCloud", "uid-1"),
+            _record("c", "Shared", "other"),
+            _record("d", "Work", title="Lunch", start=3600.0),
+        ]
+        result = dedupe_records(records)
+        assert [r.identifier for r in result] == ["a", "d"]
+        assert isinstance(result[0], MergedRecord)
+        assert result[0].to_dict()["calendars"] == ["Work", "iCloud", "Shared"]
+        assert result[0].start_ts == 0.0
+        assert "calendars" not in result[1].to_dict()
+
+    def test_same_calendar_kept(self):
+        """Two identical entries of one calendar are not folded."""
+        records = [_record("a", "Work"), _record("b", "Work")]
+        assert dedupe_records(records) == records
+
+    def test_recurring_occurrences_kept(self):
+        """Occurrences sharing an external id but not a start stay apart."""
+        records = [
+            _record("a", "Work", "uid-1", start=0.0),
+            _record("a", "Work", "uid-1", start=86400.0),
+            _record("b", "iCloud", "uid-1", start=86400.0),
+        ]
+        result = dedupe_records(records)
+        assert len(result) == 2
+        assert result[1].calendars == ["Work", "iCloud"]
+
+
+class TestDedupeOption:
+    """Test cases for dedupe in get_macos_calendar_events."""
+
+    async def test_default_unchanged(self, fake_server, shared):
+        """Without the option every copy is returned."""
+        assert len(await _events(fake_server)) == 5
+
+    async def test_collapsed(self, fake_server, shared):
+        """Copies collapse; a different organizer or day is another event."""
+        rows = await _events(fake_server, dedupe=True)
+        assert [(r["id"], r.get("calendars")) for r in rows] == [
+            ("evt-1", ["Work", "iCloud", "Shared"]),
+            ("evt-4", None),
+            ("evt-5", None),
+        ]
+
+    async def test_rows_only(self, fake_server, shared):
+        """The columnar format is rejected."""
+        result = await _events(fake_server, dedupe=True, format="columnar")
+        assert "requires format='rows'" in result[0]["error"]
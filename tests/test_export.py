@@ -0,0 +1,177 @@
+"""Test cases for streaming event export (calendar_mcp.export)."""
+
+import asyncio
+import hashlib
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.export import EventExporter, _ics_fold
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _fill(fake_store, days, per_day=4):
+    start = datetime(2023, 1, 1, 9)
+    for day in range(days):
+        for slot in range(per_day):
+            begin = start + timedelta(days=day, hours=slot * 2)
+            fake_store.add_event(
+                f"Event {day}-{slot}",
+                begin,
+                begin + timedelta(hours=1),
+                notes="n" * 200,
+            )
+
+
+class TestExportHelpers:
+    """Test cases for export helpers."""
+
+    def test_ics_fold_limits_line_length(self):
+        """Long lines are folded at 75 octets without splitting characters."""
+        folded = _ics_fold("SUMMARY:" + "会議" * 40)
+        for line in folded.split("\r\n"):
+            assert len(line.encode("utf-8")) <= 75
+
+    def test_invalid_format(self, tmp_path):
+        """Unknown formats are rejected before any file is created."""
+        with pytest.raises(ValueError):
+            EventExporter(str(tmp_path / "out.csv"), "csv")
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestExportTool:
+    """Test cases for the export_macos_calendar_events tool."""
+
+    async def test_ndjson_export(self, fake_server, fake_store, tmp_path):
+        """NDJSON exports one line per event and reports a valid checksum."""
+        _fill(fake_store, days=90)
+        fake_server.export_dir = str(tmp_path)
+
+        content_list, _ = await fake_server.mcp.call_tool(
+            "export_macos_calendar_events",
+            {"start_date": "2023-01-01", "end_date": "2023-04-01"},
+        )
+        result = json.loads(content_list[0].text)
+
+        data = (tmp_path / "calendar-2023-01-01-2023-04-01.ndjson").read_bytes()
+        assert result["path"] == str(tmp_path / "calendar-2023-01-01-2023-04-01.ndjson")
+        assert result["count"] == 360
+        assert result["bytes"] == len(data)
+        assert result["sha256"] == hashlib.sha256(data).hexdigest()
+        lines = data.decode("utf-8").splitlines()
+        assert json.loads(lines[0])["title"] == "Event 0-0"
+        # 複数ウィンドウに分割して取得している
+        assert fake_store.fetch_count == 3
+
+    async def test_boundary_events_exported_once(
+        self, fake_server, fake_store, tmp_path
+    ):
+        """Events spanning a window boundary appear exactly once."""
+        fake_store.add_event(
+            "Overnight", datetime(2023, 1, 31, 22), datetime(2023, 2, 2, 2)
+        )
+        fake_server.export_dir = str(tmp_path)
+        result = await fake_server._export_events(
+            "2023-01-01", "2023-03-01", output_path=str(tmp_path / "out.ndjson")
+        )
+        assert result["count"] == 1
+
+    async def test_ics_export(self, fake_server, fake_store, tmp_path):
+        """ICS exports are well-formed VCALENDAR documents."""
+        fake_store.add_event(
+            "Launch, v2; final",
+            datetime(2023, 1, 5, 10),
+            datetime(2023, 1, 5, 11),
+            notes="line1\nline2",
+        )
+        fake_store.add_event(
+            "Holiday",
+            datetime(2023, 1, 6),
+            datetime(2023, 1, 6, 23, 59, 59),
+            all_day=True,
+        )
+        fake_server.export_dir = str(tmp_path)
+        result = await fake_server._export_events(
+            "2023-01-01", "2023-02-01", fmt="ics", output_path="archive.ics"
+        )
+        with open(result["path"], encoding="utf-8", newline="") as f:
+            text = f.read()
+
+        assert text.startswith("BEGIN:VCALENDAR\r\n")
+        assert text.endswith("END:VCALENDAR\r\n")
+        assert text.count("BEGIN:VEVENT") == 2
+        assert "SUMMARY:Launch\\, v2\\; final" in text
+        assert "DESCRIPTION:line1\\nline2" in text
+        assert "DTSTART;VALUE=DATE:20230106" in text
+        assert "DTEND;VALUE=DATE:20230107" in text
+
+    async def test_memory_stays_flat(self, fake_server, fake_store, tmp_path):
+        """Peak memory does not grow with the size of the exported range."""
+        _fill(fake_store, days=365)
+        fake_server.export_dir = str(tmp_path)
+
+        peaks = []
+        for end_date in ("2023-02-01", "2024-01-01"):
+            tracemalloc.start()
+            await fake_server._export_events(
+                "2023-01-01", end_date, output_path=str(tmp_path / f"{end_date}.ndjson")
+            )
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        small, large = peaks
+        assert large < small * 2
+
+    async def test_invalid_format_reports_error(self, fake_server, tmp_path):
+        """Invalid formats come back as an error object."""
+        fake_server.export_dir = str(tmp_path)
+        result = await fake_server._export_events(
+            "2023-01-01", "2023-02-01", fmt="csv", output_path=str(tmp_path / "x")
+        )
+        assert "error" in result
+
+    @pytest.mark.parametrize(
+        "output_path", ["/tmp/escaped.ndjson", "../escaped.ndjson"]
+    )
+    async def test_path_outside_export_dir(self, fake_server, tmp_path, output_path):
+        """Absolute or ../ paths that leave the export directory are rejected."""
+        fake_server.export_dir = str(tmp_path / "exports")
+        result = await fake_server._export_events(
+            "2023-01-01", "2023-02-01", output_path=output_path
+        )
+        assert "inside the export directory" in result["error"]
+        assert not (tmp_path / "escaped.ndjson").exists()
+
+    async def test_no_overwrite_by_default(self, fake_server, fake_store, tmp_path):
+        """An existing file is only replaced when overwrite is set."""
+        fake_server.export_dir = str(tmp_path)
+        (tmp_path / "out.ndjson").write_text("keep")
+        result = await fake_server._export_events(
+            "2023-01-01", "2023-02-01", output_path="out.ndjson"
+        )
+        assert "already exists" in result["error"]
+        assert (tmp_path / "out.ndjson").read_text() == "keep"
+        result = await fake_server._export_events(
+            "2023-01-01", "2023-02-01", output_path="out.ndjson", overwrite=True
+        )
+        assert result["count"] == 0
+
+    async def test_runs_off_event_loop(self, fake_server, fake_store, tmp_path):
+        """A slow export leaves the event loop free for other requests."""
+        fake_store.latency = 0.05
+        fake_server.export_dir = str(tmp_path)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await fake_server._export_events("2023-01-01", "2023-04-01")
+        task.cancel()
+        assert ticks > 5
@@ -0,0 +1,116 @@
+"""Test cases for columnar event responses (calendar_mcp.formats)."""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.formats import COLUMNAR_FIELDS, from_columnar, to_columnar
+from calendar_mcp.records import EventRecord
+from calendar_mcp.server import safe_json_dumps
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _fill(fake_store, count):
+    start = datetime(2024, 1, 1, 8)
+    calendars = ["Work", "Family", "Holidays"]
+    for i in range(count):
+        begin = start + timedelta(hours=3 * i)
+        fake_store.add_event(
+            f"Event {i}",
+            begin,
+            begin + timedelta(hours=1),
+            calendar=calendars[i % 3],
+            notes="Room 4" if i % 4 == 0 else None,
+        )
+
+
+def _best_of(runs, func):
+    best = float("inf")
+    for _ in range(runs):
+        began = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - began)
+    return best
+
+
+class TestColumnar:
+    """Test cases for to_columnar / from_columnar."""
+
+    def test_round_trip(self):
+        """Decoding a columnar payload yields the row dicts."""
+        records = [
+            EventRecord("a", "Standup", 0.0, 900.0, "Work"),
+            EventRecord("b", "Dinner", 3600.0, 7200.0, "Home", notes="x"),
+            EventRecord("c", "Trip", 0.0, 86400.0, "Work", all_day=True),
+        ]
+        payload = to_columnar(records)
+
+        assert payload["fields"] == list(COLUMNAR_FIELDS)
+        assert payload["calendars"] == ["Work", "Home"]
+        assert payload["columns"][COLUMNAR_FIELDS.index("calendar")] == [0, 1, 0]
+        assert payload["count"] == 3
+        assert from_columnar(payload) == [r.to_dict() for r in records]
+
+    def test_empty(self):
+        """An empty range encodes to empty columns."""
+        payload = to_columnar([])
+        assert payload["count"] == 0
+        assert from_columnar(payload) == []
+
+
+class TestColumnarTool:
+    """Test cases for get_macos_calendar_events(format='columnar')."""
+
+    async def test_default_format_unchanged(self, fake_server, fake_store):
+        """Without a format argument the tool still returns a list of rows."""
+        _fill(fake_store, 3)
+        content_list, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-02"},
+        )
+        rows = json.loads(content_list[0].text)
+        assert isinstance(rows, list)
+        assert rows[0]["title"] == "Event 0"
+
+    async def test_columnar_matches_rows(self, fake_server, fake_store):
+        """The columnar payload decodes to exactly the default rows."""
+        _fill(fake_store, 50)
+        args = {"start_date": "2024-01-01", "end_date": "2024-01-10"}
+
+        rows_content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events", args
+        )
+        columnar_content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events", {**args, "format": "columnar"}
+        )
+
+        payload = json.loads(columnar_content[0].text)
+        assert from_columnar(payload) == json.loads(rows_content[0].text)
+
+    async def test_columnar_is_smaller_and_faster(self, fake_server, fake_store):
+        """Multi-thousand-event ranges shrink and encode faster."""
+        _fill(fake_store, 3000)
+        rows = await fake_server._get_events("2024-01-01", "2025-02-01")
+        columnar = await fake_server._get_events(
+            "2024-01-01", "2025-02-01", response_format="columnar"
+        )
+        assert columnar["count"] == len(rows) == 3000
+
+        def encode_rows():
+            return safe_json_dumps(rows)
+
+        def encode_columnar():
+            return safe_json_dumps(columnar, indent=None, separators=(",", ":"))
+
+        assert len(encode_columnar()) < len(encode_rows()) * 0.5
+        assert _best_of(3, encode_columnar) < _best_of(3, encode_rows)
+
+    async def test_invalid_format(self, fake_server):
+        """Unknown formats are reported as an error."""
+        result = await fake_server._get_events(
+            "2024-01-01", "2024-01-02", response_format="xml"
+        )
+        assert "error" in result[0]
@@ -0,0 +1,133 @@
+"""Test cases for liveness, readiness and diagnostics (calendar_mcp.health)."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fakes import FakeEventStore
+
+import calendar_mcp.server as server_module
+from calendar_mcp.admission import AdmissionController
+from calendar_mcp.health import LatencyWindow, authorization_name
+from calendar_mcp.lifecycle import RequestDrain
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+async def _diagnostics(server):
+    content, _ = await server.mcp.call_tool("get_macos_calendar_diagnostics", {})
+    return json.loads(content[0].text)
+
+
+async def _get(server, path):
+    transport = httpx.ASGITransport(app=server.mcp.streamable_http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        return await c.get(path)
+
+
+class TestLatencyWindow:
+    """Test cases for LatencyWindow."""
+
+    async def test_keeps_recent_calls(self):
+        window = LatencyWindow(size=3)
+
+        async def call():
+            return "ok"
+
+        timed = window.wrap("call", call)
+        for _ in range(5):
+            assert await timed() == "ok"
+        summary = window.summary()
+        assert summary["count"] == 3
+        assert summary["p95_ms"] >= 0
+
+    def test_authorization_name(self):
+        assert authorization_name(3) == "full_access"
+        assert authorization_name(2) == "denied"
+        assert authorization_name(9) == "unknown (9)"
+
+
+class TestDiagnostics:
+    """Test cases for get_macos_calendar_diagnostics and readiness."""
+
+    async def test_ready(self, fake_server, fake_store):
+        """An authorised, responsive store is ready."""
+        fake_store.add_calendar("Work")
+        await fake_server.mcp.call_tool("list_macos_calendars", {})
+        report = await _diagnostics(fake_server)
+        assert report["ready"] is True
+        assert report["reasons"] == []
+        assert report["authorization"] == "full_access"
+        assert report["probe"]["ok"] and report["probe"]["calendars"] == 1
+        assert report["latency"]["count"] == 1
+        assert report["cache"]["agenda"]["views"] == []
+
+    async def test_slow_store_not_ready(self, fake_server, fake_store):
+        """A probe slower than the limit makes the instance not ready."""
+        fake_store.calendar_latency = 0.05
+        fake_server.ready_max_probe_ms = 10
+        report = await _diagnostics(fake_server)
+        assert report["ready"] is False
+        assert report["probe"]["ms"] >= 50
+        assert "store probe took" in report["reasons"][0]
+
+    async def test_hung_probe_not_repeated(self, fake_server, fake_store, monkeypatch):
+        """A timed-out probe still running blocks new probes and readiness."""
+        monkeypatch.setattr(server_module, "PROBE_TIMEOUT", 0.05)
+        fake_store.calendar_latency = 0.3
+        report = await _diagnostics(fake_server)
+        assert report["probe"]["error"] == "no answer within 0.05s"
+        report = await _diagnostics(fake_server)
+        assert report["ready"] is False
+        assert report["probe"]["error"] == "previous probe still running"
+
+        await asyncio.sleep(0.3)
+        fake_store.calendar_latency = 0.0
+        report = await _diagnostics(fake_server)
+        assert report["probe"]["ok"]
+
+    async def test_denied_not_ready(self, fake_server, monkeypatch):
+        monkeypatch.setattr(FakeEventStore, "authorization_status", 2)
+        report = await _diagnostics(fake_server)
+        assert report["reasons"] == ["calendar access is denied"]
+
+    async def test_queue_and_cache(self, fake_store, tmp_path):
+        """Queue depth and snapshot warmth are reported."""
+        server = CalendarMCPServer(
+            lazy_init=True,
+            snapshot_path=str(tmp_path / "snap.db"),
+            admission=AdmissionController(max_concurrent=2),
+            drain=RequestDrain(),
+        )
+        server.event_store = fake_store
+        await server._get_events("2024-04-01", "2024-04-02")
+        report = await _diagnostics(server)
+        assert report["queue"] == {
+            "in_flight": 0,
+            "active": 0,
+            "waiting": 0,
+            "max_concurrent": 2,
+        }
+        assert report["cache"]["snapshot"]["ranges"] == 1
+
+
+class TestRoutes:
+    """Test cases for /healthz and /readyz."""
+
+    async def test_healthz(self, fake_server):
+        response = await _get(fake_server, "/healthz")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+
+    async def test_readyz(self, fake_store):
+        """/readyz turns 503 once the server starts draining."""
+        drain = RequestDrain()
+        server = CalendarMCPServer(lazy_init=True, drain=drain)
+        server.event_store = fake_store
+        assert (await _get(server, "/readyz")).status_code == 200
+        drain.start()
+        response = await _get(server, "/readyz")
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["shutting down"]
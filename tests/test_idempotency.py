@@ -0,0 +1,143 @@
+"""Test cases for idempotency keys (calendar_mcp.idempotency)."""
+
+import asyncio
+
+import pytest
+
+from calendar_mcp.idempotency import IdempotencyConflictError, IdempotencyStore
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+EVENT = {
+    "title": "Dentist",
+    "start_date": "2024-07-01 09:00",
+    "end_date": "2024-07-01 10:00",
+}
+
+
+class Counter:
+    """Async call that counts invocations and can be made slow."""
+
+    def __init__(self, remember: bool = True, delay: float = 0.0):
+        self.calls = 0
+        self.remember = remember
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return f"result {self.calls}", self.remember
+
+
+async def _create(server, **arguments):
+    content, _ = await server.mcp.call_tool(
+        "create_macos_calendar_event", {**EVENT, **arguments}
+    )
+    return content[0].text
+
+
+class TestIdempotencyStore:
+    """Test cases for IdempotencyStore."""
+
+    async def test_replays_result(self):
+        store = IdempotencyStore()
+        call = Counter()
+        assert await store.run("k", ("a",), call) == ("result 1", False)
+        assert await store.run("k", ("a",), call) == ("result 1", True)
+        assert call.calls == 1
+        assert store.replayed == 1
+
+    async def test_conflicting_arguments(self):
+        """Reusing a key for different arguments is an error."""
+        store = IdempotencyStore()
+        await store.run("k", ("a",), Counter())
+        with pytest.raises(IdempotencyConflictError, match="'k'"):
+            await store.run("k", ("b",), Counter())
+
+    async def test_failures_not_remembered(self):
+        """Results marked not to remember run again on retry."""
+        store = IdempotencyStore()
+        call = Counter(remember=False)
+        await store.run("k", ("a",), call)
+        await store.run("k", ("a",), call)
+        assert call.calls == 2
+        assert len(store) == 0
+
+    async def test_ttl_and_bound(self):
+        """Keys expire after the TTL and the oldest go beyond max_keys."""
+        now = [0.0]
+        store = IdempotencyStore(ttl=10, max_keys=2, clock=lambda: now[0])
+        for key in ("a", "b", "c"):
+            await store.run(key, (), Counter())
+        assert len(store) == 2
+        assert (await store.run("a", (), Counter()))[1] is False
+        now[0] = 11
+        assert len(store) == 0
+
+    async def test_concurrent_calls_coalesced(self):
+        """Calls arriving while the first runs share its result."""
+        store = IdempotencyStore()
+        call = Counter(delay=0.02)
+        results = await asyncio.gather(*(store.run("k", (), call) for _ in range(4)))
+        assert call.calls == 1
+        assert [replayed for _, replayed in results] == [False, True, True, True]
+        assert {result for result, _ in results} == {"result 1"}
+        assert store.coalesced == 3
+
+    async def test_cancelled_caller_still_remembered(self):
+        """A caller cancelled mid-call (client timeout) does not lose the result."""
+        store = IdempotencyStore()
+        call = Counter(delay=0.02)
+        task = asyncio.ensure_future(store.run("k", (), call))
+        await asyncio.sleep(0.005)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.03)
+        assert await store.run("k", (), call) == ("result 1", True)
+        assert call.calls == 1
+
+
+class TestCreateEventIdempotency:
+    """Test cases for idempotency_key in create_macos_calendar_event."""
+
+    async def test_retry_creates_once(self, fake_server, fake_store):
+        first = await _create(fake_server, idempotency_key="req-1")
+        access_requests = fake_store.access_requests
+        retry = await _create(fake_server, idempotency_key="req-1")
+        assert retry == first
+        assert "created successfully" in first
+        assert [e.title() for e in fake_store.events] == ["Dentist"]
+        assert fake_store.access_requests == access_requests
+
+    async def test_without_key_duplicates(self, fake_server, fake_store):
+        """Calls without a key keep the old behaviour."""
+        await _create(fake_server)
+        await _create(fake_server)
+        assert len(fake_store.events) == 2
+
+    async def test_concurrent_submissions(self, fake_server, fake_store):
+        """Duplicate submissions racing each other create one event."""
+        fake_store.completion_delay = 0.02
+        await asyncio.gather(
+            *(_create(fake_server, idempotency_key="req-2") for _ in range(3))
+        )
+        assert len(fake_store.events) == 1
+        assert fake_store.access_requests == 1
+
+    async def test_key_reused_for_other_event(self, fake_server, fake_store):
+        await _create(fake_server, idempotency_key="req-3")
+        result = await _create(fake_server, idempotency_key="req-3", title="Other")
+        assert "already used with different arguments" in result
+        assert len(fake_store.events) == 1
+
+    async def test_denied_access_not_remembered(self, fake_server, fake_store):
+        """A failed create can be retried with the same key."""
+        fake_store.access_granted = False
+        assert "access denied" in await _create(fake_server, idempotency_key="req-4")
+        fake_store.access_granted = True
+        assert "created successfully" in await _create(
+            fake_server, idempotency_key="req-4"
+        )
+        assert len(fake_store.events) == 1
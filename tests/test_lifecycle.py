@@ -0,0 +1,249 @@
+"""Test cases for graceful shutdown and reload (calendar_mcp.lifecycle)."""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+import calendar_mcp.server as server_module
+from calendar_mcp.admission import AdmissionController
+from calendar_mcp.lifecycle import (
+    RequestDrain,
+    install_signal_handlers,
+    load_tunables,
+)
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+# 一覧の取得に 1 秒かかるサーバーを Streamable HTTP で起動する
+SLOW_HTTP_SERVER = """
+import asyncio
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+import calendar_mcp.server as server_module
+
+# main() にポートの指定はないので FastMCP の既定値を差し替える
+FastMCP.__init__.__kwdefaults__["port"] = int(sys.argv[1])
+
+
+async def slow_calendars(self):
+    await asyncio.sleep(1.0)
+    return [{"title": "Work", "type": "local", "identifier": "cal-1"}]
+
+
+server_module.CalendarMCPServer._get_calendars = slow_calendars
+sys.argv = ["calendar-mcp", "--transport", "streamable-http", "--lazy-init"]
+asyncio.run(server_module.main())
+"""
+
+
+def _write(tmp_path, data):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+class TestRequestDrain:
+    """Test cases for RequestDrain."""
+
+    async def test_waits_for_in_flight(self):
+        """Draining rejects new calls and waits for the running ones."""
+        drain = RequestDrain()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "done"
+
+        handler = drain.wrap("slow", slow)
+        running = asyncio.ensure_future(handler())
+        await asyncio.sleep(0)
+        assert drain.in_flight == 1
+
+        drain.start()
+        assert json.loads(await handler())["reason"] == "draining"
+        waiter = asyncio.ensure_future(drain.wait(1.0))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        release.set()
+        assert await waiter is True
+        assert await running == "done"
+        assert drain.stats() == {"in_flight": 0, "draining": True, "rejected": 1}
+
+    async def test_deadline(self):
+        drain = RequestDrain()
+        handler = drain.wrap("stuck", asyncio.Event().wait)
+        task = asyncio.ensure_future(handler())
+        await asyncio.sleep(0)
+        drain.start()
+        assert await drain.wait(0.01) is False
+        task.cancel()
+
+    async def test_server_rejects_while_draining(self, fake_store):
+        """Tool calls made after shutdown began get an error response."""
+        drain = RequestDrain()
+        server = CalendarMCPServer(lazy_init=True, drain=drain)
+        server.event_store = fake_store
+        drain.start()
+        content, _ = await server.mcp.call_tool("list_macos_calendars", {})
+        assert json.loads(content[0].text)["error"] == "Server is shutting down"
+
+
+class TestTunables:
+    """Test cases for load_tunables and CalendarMCPServer.apply_tunables."""
+
+    def test_load(self, tmp_path):
+        path = _write(tmp_path, {"log_level": "debug", "request_timeout": 5})
+        assert load_tunables(path) == {"log_level": "DEBUG", "request_timeout": 5.0}
+
+    @pytest.mark.parametrize(
+        "data, message",
+        [
+            ({"query_worker": 2}, "unknown setting"),
+            ({"query_workers": "2"}, "must be int"),
+            ({"session_burst": True}, "must be int"),
+            ({"log_level": "loud"}, "unknown log level"),
+            ([], "expected a JSON object"),
+        ],
+    )
+    def test_invalid(self, tmp_path, data, message):
+        with pytest.raises(ValueError, match=message):
+            load_tunables(_write(tmp_path, data))
+
+    async def test_apply_keeps_warm_state(self, fake_store, tmp_path):
+        """Reloading changes limits without dropping caches or sessions."""
+        server = CalendarMCPServer(
+            lazy_init=True,
+            snapshot_path=str(tmp_path / "snap.db"),
+            admission=AdmissionController(max_concurrent=4, session_rate=5.0),
+        )
+        server.event_store = fake_store
+        fake_store.add_event(
+            "Standup", datetime(2024, 4, 1, 9), datetime(2024, 4, 1, 9, 15)
+        )
+        await server._get_events("2024-04-01", "2024-04-02")
+        async with server.admission.admit("client"):
+            pass
+
+        changed = server.apply_tunables(
+            {
+                "log_level": "DEBUG",
+                "query_workers": 2,
+                "request_timeout": 5.0,
+                "agenda_max_age": 60.0,
+                "max_concurrent_calls": 6,
+                "session_rate": 1.0,
+            }
+        )
+        assert changed == {
+            "query_workers": 2,
+            "request_timeout": 5.0,
+            "max_concurrent_calls": 6,
+            "session_rate": 1.0,
+        }
+        assert server.planner.max_workers == 2
+        assert server.admission.max_concurrent == 6
+        assert server.admission._sessions["client"].bucket.rate == 1.0
+        assert server.snapshot.load(("2024-04-01", "2024-04-02", "")) is not None
+
+    async def test_lower_concurrency(self):
+        """A lower cap takes effect once the running calls finish."""
+        controller = AdmissionController(max_concurrent=2, session_rate=0)
+        async with controller.admit("a"):
+            controller.configure(max_concurrent=1)
+        async with controller.admit("a"):
+            assert controller.active == controller.max_concurrent
+        controller.configure(max_concurrent=3)
+        async with controller.admit("a"), controller.admit("b"):
+            assert controller.active < controller.max_concurrent
+
+
+class TestShutdown:
+    """Test cases for signal routing and CalendarMCPServer.aclose."""
+
+    async def test_signals(self):
+        loop = asyncio.get_running_loop()
+        received = []
+        install_signal_handlers(
+            loop, received.append, lambda: received.append("reload")
+        )
+        try:
+            os.kill(os.getpid(), signal.SIGHUP)
+            os.kill(os.getpid(), signal.SIGTERM)
+            for _ in range(50):
+                if len(received) == 2:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+                loop.remove_signal_handler(sig)
+        assert sorted(received) == ["SIGTERM", "reload"]
+
+    async def test_http_drain(self, tmp_path):
+        """SIGTERM under HTTP lets the running call answer before stopping."""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        log = open(tmp_path / "server.log", "w")
+        proc = subprocess.Popen(
+            [sys.executable, "-c", SLOW_HTTP_SERVER, str(port)],
+            cwd=Path(__file__).parent.parent,
+            stderr=log,
+        )
+        try:
+            for _ in range(200):
+                try:
+                    socket.create_connection(("127.0.0.1", port)).close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.05)
+            else:
+                pytest.fail("server did not start listening")
+            url = f"http://127.0.0.1:{port}/mcp"
+            async with streamablehttp_client(url) as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    call = asyncio.ensure_future(
+                        session.call_tool("list_macos_calendars", {})
+                    )
+                    await asyncio.sleep(0.3)
+                    proc.send_signal(signal.SIGTERM)
+                    result = await asyncio.wait_for(call, 5)
+            assert not result.isError
+            assert "Work" in result.content[0].text
+            assert await asyncio.to_thread(proc.wait, 10) == 0
+        finally:
+            proc.kill()
+            log.close()
+        assert "draining 1 call(s)" in (tmp_path / "server.log").read_text()
+
+    async def test_aclose_flushes(self, fake_store, tmp_path):
+        """Closing stops the pool, the observer and the persistent stores."""
+        server = CalendarMCPServer(
+            lazy_init=True,
+            snapshot_path=str(tmp_path / "snap.db"),
+            trace_path=str(tmp_path / "trace.ndjson"),
+        )
+        server.event_store = fake_store
+        server._watch_store_changes()
+        await server.mcp.call_tool("list_macos_calendars", {})
+        await server.aclose(1.0)
+
+        center = server_module.Foundation.NSNotificationCenter
+        assert center.observers == []
+        assert server.tracer._file.closed
+        assert server.planner._executor is None
+        lines = (tmp_path / "trace.ndjson").read_text().splitlines()
+        assert json.loads(lines[0])["name"] == "list_macos_calendars"
@@ -0,0 +1,141 @@
+"""Test cases for the queued logging pipeline (calendar_mcp.logpipe)."""
+
+import logging
+import threading
+import time
+
+import pytest
+
+from calendar_mcp.logpipe import (
+    DroppingQueueHandler,
+    LogPipeline,
+    setup_log_pipeline,
+)
+from calendar_mcp.server import log_json_data
+
+
+class SlowHandler(logging.Handler):
+    """Handler that blocks like a congested stderr pipe."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.messages = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.messages.append(self.format(record))
+
+
+class ThreadRecorder:
+    """Log argument that records which thread formatted it."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "payload"
+
+
+@pytest.fixture
+def isolated_logger():
+    target = logging.getLogger("calendar_mcp.tests.logpipe")
+    target.propagate = False
+    target.setLevel(logging.INFO)
+    yield target
+    target.handlers.clear()
+
+
+@pytest.fixture
+def restore_root():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestDroppingQueueHandler:
+    """Test cases for DroppingQueueHandler."""
+
+    def test_drops_when_full(self, isolated_logger):
+        """A full queue drops records instead of blocking the caller."""
+        handler = DroppingQueueHandler(maxsize=3)
+        isolated_logger.addHandler(handler)
+        for i in range(10):
+            isolated_logger.info("record %d", i)
+        assert handler.queue.qsize() == 3
+        assert handler.dropped == 7
+
+
+class TestLogPipeline:
+    """Test cases for LogPipeline."""
+
+    def test_slow_sink_does_not_block(self, isolated_logger):
+        """Logging returns immediately even when the sink is slow."""
+        sink = SlowHandler(delay=0.05)
+        pipeline = LogPipeline([sink], queue_size=100)
+        pipeline.start(isolated_logger)
+
+        began = time.perf_counter()
+        for i in range(20):
+            isolated_logger.info("record %d", i)
+        elapsed = time.perf_counter() - began
+        pipeline.stop()
+
+        assert elapsed < 0.5
+        assert sink.messages == [f"record {i}" for i in range(20)]
+        assert pipeline.stats()["dropped"] == 0
+
+    def test_formatting_happens_on_listener(self, isolated_logger):
+        """Message arguments are formatted by the background thread."""
+        sink = SlowHandler(delay=0)
+        pipeline = LogPipeline([sink])
+        pipeline.start(isolated_logger)
+        recorder = ThreadRecorder()
+        isolated_logger.info("%s", recorder)
+        pipeline.stop()
+
+        assert sink.messages == ["payload"]
+        assert threading.current_thread() not in recorder.threads
+
+    def test_stop_restores_direct_handlers(self, isolated_logger):
+        """Records logged after stop() still reach the sinks."""
+        sink = SlowHandler(delay=0)
+        pipeline = LogPipeline([sink])
+        pipeline.start(isolated_logger)
+        pipeline.stop()
+        isolated_logger.info("late")
+        assert sink.messages == ["late"]
+
+    def test_json_data_snapshot(self, restore_root):
+        """A payload changed after logging is written as it was logged."""
+        sink = SlowHandler(delay=0.05)
+        pipeline = LogPipeline([sink])
+        pipeline.start(restore_root)
+        restore_root.setLevel(logging.INFO)
+        payload = {"name": "x", "status": "pending"}
+        # 先に遅い行を入れ、リスナーが JSON 化する前に変更する
+        restore_root.info("busy")
+        log_json_data("TOOL RESPONSE", payload)
+        payload["status"] = "changed"
+        pipeline.stop()
+
+        assert '"status": "pending"' in sink.messages[1]
+
+
+class TestSetupLogPipeline:
+    """Test cases for setup_log_pipeline."""
+
+    def test_json_data_to_rotating_file(self, restore_root, tmp_path):
+        """JSON request logs reach the rotating log file via the root logger."""
+        log_file = tmp_path / "server.log"
+        pipeline = setup_log_pipeline(log_file=str(log_file), log_file_bytes=2_000)
+        for i in range(20):
+            log_json_data("TOOL REQUEST", {"name": "x", "i": i, "pad": "y" * 100})
+        pipeline.stop()
+
+        assert restore_root.handlers[0] in pipeline.handlers
+        assert '"i": 19' in log_file.read_text(encoding="utf-8")
+        assert (tmp_path / "server.log.1").exists()
@@ -0,0 +1,109 @@
+"""Test cases for event identifiers and get_macos_calendar_event."""
+
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from calendar_mcp.server import MAX_LOOKUP_IDS, CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def events(fake_store):
+    fake_store.add_event("Standup", datetime(2024, 1, 2, 9), datetime(2024, 1, 2, 10))
+    fake_store.add_event(
+        "Review", datetime(2024, 1, 3, 14), datetime(2024, 1, 3, 15), "Family"
+    )
+    return fake_store
+
+
+async def _call(server, name, **arguments):
+    content, _ = await server.mcp.call_tool(name, arguments)
+    return json.loads(content[0].text)
+
+
+class TestEventLookup:
+    """Test cases for identifier lookups."""
+
+    async def test_ids_in_range_results(self, fake_server, events):
+        """Rows and columnar payloads carry both identifiers."""
+        rows = await _call(
+            fake_server,
+            "get_macos_calendar_events",
+            start_date="2024-01-01",
+            end_date="2024-01-08",
+        )
+        assert [(r["id"], r["externalId"]) for r in rows] == [
+            ("evt-1", "ext-1"),
+            ("evt-2", "ext-2"),
+        ]
+        columnar = await _call(
+            fake_server,
+            "get_macos_calendar_events",
+            start_date="2024-01-01",
+            end_date="2024-01-08",
+            format="columnar",
+        )
+        assert columnar["columns"][columnar["fields"].index("id")] == [
+            "evt-1",
+            "evt-2",
+        ]
+
+    async def test_lookup_by_either_id(self, fake_server, events):
+        """Event and external identifiers resolve without a range query."""
+        result = await _call(
+            fake_server,
+            "get_macos_calendar_event",
+            event_ids=["ext-2", "nope", "evt-1"],
+        )
+        assert [r.get("title") for r in result] == ["Review", None, "Standup"]
+        assert result[0]["calendar"] == "Family"
+        assert result[1] == {"id": "nope", "error": "Event not found"}
+        assert events.fetch_count == 0
+
+    async def test_lookup_off_event_loop(self, fake_server, events):
+        """EventKit lookups run on a worker thread, not the event loop."""
+        threads = []
+        lookup = events.eventWithIdentifier_
+
+        def recording_lookup(event_id):
+            threads.append(threading.current_thread())
+            return lookup(event_id)
+
+        events.eventWithIdentifier_ = recording_lookup
+        result = await fake_server._lookup_events(["evt-1"])
+        assert result[0]["title"] == "Standup"
+        assert threads and threading.main_thread() not in threads
+
+    async def test_limits(self, fake_server, events):
+        """Empty and oversized id lists are rejected."""
+        result = await _call(fake_server, "get_macos_calendar_event", event_ids=[])
+        assert result == [{"error": "No event IDs given"}]
+        too_many = [f"evt-{i}" for i in range(MAX_LOOKUP_IDS + 1)]
+        result = await _call(
+            fake_server, "get_macos_calendar_event", event_ids=too_many
+        )
+        assert "Too many event IDs" in result[0]["error"]
+
+    async def test_snapshot_index(self, events, tmp_path):
+        """Fresh snapshot rows answer lookups; stale ones go to EventKit."""
+        server = CalendarMCPServer(
+            lazy_init=True,
+            snapshot_path=str(tmp_path / "snap.db"),
+            snapshot_max_age=3600,
+        )
+        server.event_store = events
+        await server._get_events("2024-01-01", "2024-01-08")
+        events.events[0].update(title="Standup (moved)")
+
+        cached = await server._lookup_events(["evt-1", "ext-2"])
+        assert [r["title"] for r in cached] == ["Standup", "Review"]
+        assert events.lookup_count == 0
+
+        server.snapshot_max_age = 0
+        live = await server._lookup_events(["evt-1"])
+        assert live[0]["title"] == "Standup (moved)"
+        assert events.lookup_count == 1
@@ -0,0 +1,141 @@
+"""Test cases for the range query planner (calendar_mcp.planner)."""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fakes import FakeEventStore
+
+from calendar_mcp.planner import (
+    DAY_SECONDS,
+    MAX_PREDICATE_DAYS,
+    RangeQueryPlanner,
+    split_range,
+)
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _fill(store, start, days, step_hours=12):
+    """Add events every `step_hours`, each lasting 20 hours (crossing days)."""
+    current = start
+    end = start + timedelta(days=days)
+    while current < end:
+        store.add_event("Shift", current, current + timedelta(hours=20))
+        current += timedelta(hours=step_hours)
+
+
+def _single_shot(store, start, end):
+    return store.eventsMatchingPredicate_(
+        (start.timestamp(), end.timestamp(), list(store.calendars))
+    )
+
+
+class TestRangeQueryPlanner:
+    """Test cases for RangeQueryPlanner."""
+
+    def test_split_range_covers_range(self):
+        """Windows are contiguous and the last one is clipped."""
+        assert list(split_range(0, 25, 10)) == [(0, 10), (10, 20), (20, 25)]
+        assert list(split_range(5, 5, 10)) == []
+
+    def test_window_must_fit_eventkit_limit(self):
+        """Windows longer than the EventKit predicate cap are rejected."""
+        with pytest.raises(ValueError):
+            RangeQueryPlanner(window_days=MAX_PREDICATE_DAYS + 1)
+        with pytest.raises(ValueError):
+            RangeQueryPlanner(window_days=0)
+
+    def test_merge_matches_single_shot(self):
+        """Windowed results equal a single-shot fetch, without duplicates."""
+        store = FakeEventStore()
+        start = datetime(2024, 1, 1)
+        _fill(store, start - timedelta(days=1), days=40)
+        planner = RangeQueryPlanner(window_days=3, max_workers=4)
+
+        end = start + timedelta(days=30)
+        merged = planner.fetch(
+            lambda ws, we: store.eventsMatchingPredicate_(
+                (ws, we, list(store.calendars))
+            ),
+            start.timestamp(),
+            end.timestamp(),
+            lambda e: e.startDate().timeIntervalSince1970(),
+        )
+        planner.shutdown()
+
+        assert merged == _single_shot(store, start, end)
+        assert len(set(map(id, merged))) == len(merged)
+        assert store.fetch_count == 11
+
+    def test_in_flight_windows_are_bounded(self):
+        """No more than max_workers windows are fetched at once."""
+        store = FakeEventStore(latency=0.01)
+        planner = RangeQueryPlanner(window_days=1, max_workers=3)
+        chunks = list(
+            planner.iter_windows(
+                lambda ws, we: store.eventsMatchingPredicate_((ws, we, [])),
+                0,
+                20 * DAY_SECONDS,
+                lambda e: e.startDate().timeIntervalSince1970(),
+            )
+        )
+        planner.shutdown()
+
+        assert len(chunks) == 20
+        assert store.max_in_flight <= 3
+
+    def test_resize_during_iteration(self):
+        """Resizing mid-fetch lets the running iteration finish on its pool."""
+        planner = RangeQueryPlanner(window_days=1, max_workers=3)
+        chunks = planner.iter_windows(
+            lambda ws, we: [ws], 0, 10 * DAY_SECONDS, lambda start: start
+        )
+        first = next(chunks)
+        old = planner._executor
+        planner.resize(2)
+        rest = list(chunks)
+
+        assert [first] + rest == [[day * DAY_SECONDS] for day in range(10)]
+        # 最後の利用者が終わった時点で古いプールは止まる
+        assert old._shutdown
+        assert planner._executor is None
+        assert len(planner.fetch(lambda ws, we: [ws], 0, 4 * DAY_SECONDS, float)) == 4
+        assert planner._executor._max_workers == 2
+        planner.shutdown()
+
+
+class TestPlannedServerFetch:
+    """Test cases for planned fetches through CalendarMCPServer."""
+
+    async def test_multi_year_range_beyond_predicate_cap(self, fake_server, fake_store):
+        """Ranges wider than EventKit's ~4 year cap are no longer truncated."""
+        fake_store.max_span_seconds = MAX_PREDICATE_DAYS * DAY_SECONDS
+        start = datetime(2018, 1, 1)
+        for month in range(0, 72, 3):
+            day = start + timedelta(days=30 * month)
+            fake_store.add_event(f"Q{month}", day, day + timedelta(hours=1))
+
+        events = fake_server._fetch_events("2018-01-01", "2024-01-01")
+        truncated = _single_shot(fake_store, start, datetime(2024, 1, 1))
+
+        assert len(events) == 24
+        assert len(truncated) < len(events)
+
+    async def test_planned_fetch_is_faster(self, fake_server, fake_store):
+        """Parallel windows beat one large fetch when latency scales with size."""
+        fake_store.latency_per_event = 0.0002
+        start = datetime(2022, 1, 1)
+        _fill(fake_store, start, days=720, step_hours=6)
+        end = start + timedelta(days=720)
+
+        began = time.perf_counter()
+        baseline = _single_shot(fake_store, start, end)
+        single_shot_seconds = time.perf_counter() - began
+
+        began = time.perf_counter()
+        planned = fake_server._fetch_events("2022-01-01", end.strftime("%Y-%m-%d"))
+        planned_seconds = time.perf_counter() - began
+
+        assert planned == baseline
+        assert planned_seconds < single_shot_seconds * 0.75
@@ -0,0 +1,130 @@
+"""Test cases for event counts and size estimates (calendar_mcp.preflight)."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import calendar_mcp.server as server_module
+from calendar_mcp.budget import encode_columnar, encode_rows
+from calendar_mcp.preflight import SAMPLE_SIZE, estimate_sizes, sample_positions
+from calendar_mcp.records import EventRecord
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def month(fake_store):
+    """300 events in April 2024 across three calendars."""
+    begin = datetime(2024, 4, 1, 8)
+    for i in range(300):
+        start = begin + timedelta(hours=2 * i)
+        calendar = ("Work", "Work", "Family", "Holidays")[i % 4]
+        notes = "Bring the slides" if i % 5 == 0 else None
+        fake_store.add_event(
+            f"Event {i}", start, start + timedelta(minutes=45), calendar, notes
+        )
+    return fake_store
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Count EventRecord.from_event calls made by the server."""
+    converted = []
+    original = EventRecord.from_event.__func__
+
+    def counting(cls, event):
+        converted.append(event)
+        return original(cls, event)
+
+    monkeypatch.setattr(server_module.EventRecord, "from_event", classmethod(counting))
+    return converted
+
+
+async def _count(server, **arguments):
+    arguments = {"start_date": "2024-04-01", "end_date": "2024-05-01", **arguments}
+    content, _ = await server.mcp.call_tool("count_macos_calendar_events", arguments)
+    return json.loads(content[0].text)
+
+
+def _records(n):
+    return [
+        EventRecord(f"e{i}", f"Event {i}", i * 3600.0, i * 3600.0 + 900, "Work")
+        for i in range(n)
+    ]
+
+
+class TestEstimates:
+    """Test cases for sample_positions and estimate_sizes."""
+
+    def test_sample_positions(self):
+        """Small lists are taken whole, large ones at even steps."""
+        assert sample_positions(3) == [0, 1, 2]
+        positions = sample_positions(1000, 8)
+        assert positions == [0, 125, 250, 375, 500, 625, 750, 875]
+
+    def test_exact_for_full_sample(self):
+        """With every record in the sample the estimate is the real size."""
+        records = _records(10)
+        sizes = estimate_sizes(records, len(records))
+        assert sizes["rows"] == len(encode_rows(records)[1].encode("utf-8"))
+        assert sizes["columnar"] == len(encode_columnar(records)[1].encode("utf-8"))
+
+    def test_extrapolated(self):
+        """A sample of similar events predicts the size within a few percent."""
+        records = _records(500)
+        sample = [records[i] for i in sample_positions(len(records))]
+        actual = len(encode_rows(records)[1].encode("utf-8"))
+        assert abs(estimate_sizes(sample, 500)["rows"] - actual) < actual * 0.05
+        assert estimate_sizes([], 0)["rows"] == len(encode_rows([])[1])
+
+
+class TestCountTool:
+    """Test cases for count_macos_calendar_events."""
+
+    async def test_counts_without_converting(self, fake_server, month, conversions):
+        """Counts are per calendar and only a sample is converted."""
+        result = await _count(fake_server)
+        assert result["source"] == "eventkit"
+        assert result["total"] == 300
+        assert result["calendars"] == {"Work": 150, "Family": 75, "Holidays": 75}
+        assert len(conversions) == SAMPLE_SIZE
+        assert month.fetch_count == 1
+
+        rows = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-04-01", "end_date": "2024-05-01", "max_bytes": 0},
+        )
+        actual = len(rows[0][0].text.encode("utf-8"))
+        assert abs(result["estimated_bytes"]["rows"] - actual) < actual * 0.1
+        assert result["estimated_bytes"]["columnar"] < actual
+
+    async def test_estimated_responses(self, fake_server, month):
+        """The number of continuation calls follows the response limit."""
+        fake_server.max_response_bytes = 10_000
+        result = await _count(fake_server, calendar_name="Family")
+        assert result["calendars"] == {"Family": 75}
+        rows = result["estimated_bytes"]["rows"]
+        assert result["max_bytes"] == 10_000
+        assert result["estimated_responses"]["rows"] == -(-rows // 10_000)
+
+    async def test_from_snapshot_index(self, month, tmp_path, conversions):
+        """A fresh snapshot range is counted without touching EventKit."""
+        server = CalendarMCPServer(
+            lazy_init=True, snapshot_path=str(tmp_path / "snap.db")
+        )
+        server.event_store = month
+        await server._get_events("2024-04-01", "2024-05-01")
+        fetches = month.fetch_count
+        del conversions[:]
+        result = await _count(server)
+        assert result["source"] == "snapshot"
+        assert result["calendars"] == {"Work": 150, "Family": 75, "Holidays": 75}
+        assert month.fetch_count == fetches
+        assert conversions == []
+
+    async def test_invalid_date(self, fake_server, month):
+        """Malformed dates give an error instead of a count."""
+        result = await _count(fake_server, end_date="May 1st")
+        assert "Failed to count events" in result["error"]
@@ -0,0 +1,121 @@
+"""Test cases for opt-in request profiling (calendar_mcp.profiling)."""
+
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.profiling import RequestProfiler
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def profiled_server(fake_store, tmp_path):
+    server = CalendarMCPServer(
+        lazy_init=True, profile_dir=str(tmp_path), profile_sample_rate=1.0
+    )
+    server.event_store = fake_store
+    begin = datetime(2024, 1, 1, 8)
+    for i in range(200):
+        start = begin + timedelta(hours=i)
+        fake_store.add_event(f"Event {i}", start, start + timedelta(minutes=30))
+    return server
+
+
+class TestRequestProfiler:
+    """Test cases for RequestProfiler."""
+
+    async def test_keeps_slowest(self, tmp_path):
+        """Only the slowest `keep` reports are retained, slowest first."""
+        profiler = RequestProfiler(str(tmp_path), keep=2)
+
+        async def handler(n):
+            return sum(range(n))
+
+        wrapped = profiler.wrap("sum", handler)
+        for n in (10, 2_000_000, 100, 1_000_000):
+            await wrapped(n=n)
+
+        reports = profiler.slowest()
+        assert [r["arguments"]["n"] for r in reports] == [2_000_000, 1_000_000]
+        assert profiler.sampled == 4
+        # 上位から外れたレポートのファイルは削除される
+        assert len(list(tmp_path.glob("*.prof"))) == 2
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+    async def test_records_off_event_loop(self, tmp_path, monkeypatch):
+        """Report files are written from a worker thread."""
+        profiler = RequestProfiler(str(tmp_path))
+        threads = []
+        record = profiler._record
+
+        def spy(*args):
+            threads.append(threading.current_thread())
+            return record(*args)
+
+        monkeypatch.setattr(profiler, "_record", spy)
+
+        async def handler():
+            return "ok"
+
+        assert await profiler.wrap("noop", handler)() == "ok"
+        assert threads and threads[0] is not threading.main_thread()
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+    async def test_unsampled_calls_are_not_profiled(self, tmp_path, monkeypatch):
+        """Calls outside the sample rate run without profiling."""
+        profiler = RequestProfiler(str(tmp_path), sample_rate=0.1)
+        monkeypatch.setattr("calendar_mcp.profiling.random.random", lambda: 0.5)
+
+        async def handler():
+            return "ok"
+
+        assert await profiler.wrap("noop", handler)() == "ok"
+        assert profiler.sampled == 0
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestProfiledServer:
+    """Test cases for profiling wired into CalendarMCPServer."""
+
+    async def test_disabled_by_default(self, fake_server):
+        """Without a sample rate handlers are not wrapped and no tool is added."""
+        tools = {tool.name for tool in await fake_server.mcp.list_tools()}
+        assert fake_server.profiler is None
+        assert "get_slowest_profiled_requests" not in tools
+
+    async def test_tool_schema_preserved(self, profiled_server):
+        """Wrapped tools expose the same arguments."""
+        tools = {tool.name: tool for tool in await profiled_server.mcp.list_tools()}
+        schema = tools["get_macos_calendar_events"].inputSchema
+        assert {"start_date", "end_date", "max_bytes"} <= set(schema["properties"])
+
+    async def test_slowest_requests_tool(self, profiled_server, tmp_path):
+        """Profiled tool calls are dumped and listed by the debug tool."""
+        await profiled_server.mcp.call_tool("list_macos_calendars", {})
+        await profiled_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-10"},
+        )
+        await profiled_server.mcp.read_resource("calendar://calendars")
+
+        content, _ = await profiled_server.mcp.call_tool(
+            "get_slowest_profiled_requests", {"limit": 5}
+        )
+        report = json.loads(content[0].text)
+        names = {r["name"] for r in report["requests"]}
+        assert {"get_macos_calendar_events", "calendar://calendars"} <= names
+        walls = [r["wall_ms"] for r in report["requests"]]
+        assert walls == sorted(walls, reverse=True)
+
+        events = next(
+            r for r in report["requests"] if r["name"] == "get_macos_calendar_events"
+        )
+        assert events["arguments"]["start_date"] == "2024-01-01"
+        assert events["peak_alloc_kib"] > 0
+        assert events["top"]
+        assert (tmp_path / events["profile"]).exists()
+        assert len(list(tmp_path.glob("*.json"))) >= 3
@@ -0,0 +1,93 @@
+"""Test cases for the compact event record model (calendar_mcp.records)."""
+
+import gc
+import tracemalloc
+from datetime import datetime, timedelta
+
+from fakes import FakeEventStore
+
+from calendar_mcp.records import NO_TITLE, EventRecord, intern_name
+
+
+def _legacy_dict(event):
+    """The per-event dict the server built before EventRecord existed."""
+    return {
+        "title": str(event.title()) if event.title() else "No Title",
+        "start": str(event.startDate()),
+        "end": str(event.endDate()),
+        "calendar": str(event.calendar().title()),
+        "notes": str(event.notes()) if event.notes() else "",
+        "allDay": bool(event.isAllDay()),
+    }
+
+
+def _fill(count):
+    store = FakeEventStore()
+    start = datetime(2024, 1, 1, 9)
+    for i in range(count):
+        begin = start + timedelta(hours=i)
+        store.add_event(
+            f"Meeting {i}" if i % 5 else None,
+            begin,
+            begin + timedelta(minutes=30),
+            calendar="Work" if i % 2 else "Family",
+        )
+    return store
+
+
+def _traced_size(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert kept
+    return after - before
+
+
+class TestEventRecord:
+    """Test cases for EventRecord."""
+
+    def test_to_dict_matches_legacy_format(self):
+        """Records render the dict the tools returned before, plus identifiers."""
+        store = _fill(10)
+        store.events[3].update(notes="agenda", all_day=True)
+        for event in store.events:
+            assert EventRecord.from_event(event).to_dict() == {
+                **_legacy_dict(event),
+                "id": event.eventIdentifier(),
+                "externalId": event.calendarItemExternalIdentifier(),
+            }
+
+    def test_names_are_shared(self):
+        """Calendar and source names and the default title are shared objects."""
+        store = _fill(4)
+        records = [EventRecord.from_event(event) for event in store.events]
+        work = [r for r in records if r.calendar == "Work"]
+
+        assert work[0].calendar is work[1].calendar
+        assert records[0].source is records[1].source
+        assert records[0].title is NO_TITLE
+        assert intern_name("".join(["Wo", "rk"])) is work[0].calendar
+
+    def test_records_compare_by_value(self):
+        """Equal fields mean equal records; records are not hashable."""
+        a = EventRecord("id", "T", 1.0, 2.0, "Work")
+        b = EventRecord("id", "T", 1.0, 2.0, "Work")
+        assert a == b
+        assert a != EventRecord("id", "T", 1.0, 3.0, "Work")
+        assert EventRecord.__hash__ is None
+
+    def test_records_use_less_memory_than_dicts(self):
+        """Thousands of records take markedly less memory than legacy dicts."""
+        store = _fill(5000)
+
+        dict_bytes = _traced_size(lambda: [_legacy_dict(e) for e in store.events])
+        record_bytes = _traced_size(
+            lambda: [EventRecord.from_event(e) for e in store.events]
+        )
+
+        assert record_bytes < dict_bytes * 0.7
@@ -0,0 +1,120 @@
+"""Test cases for compact recurrence output (calendar_mcp.recurrence)."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fakes import FakeDayOfWeek, FakeRecurrenceEnd, FakeRecurrenceRule
+
+import calendar_mcp.server as server_module
+from calendar_mcp.recurrence import format_rrule
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def standups(fake_store):
+    """A year of daily standups, one moved occurrence and a one-off event."""
+    occurrences = fake_store.add_series(
+        "Standup", datetime(2024, 1, 1, 9), timedelta(minutes=15), 250
+    )
+    moved = occurrences[10]
+    moved._detached = True
+    moved.update(
+        title="Standup (late)",
+        start=moved.startDate().dateByAddingTimeInterval_(3600),
+        end=moved.endDate().dateByAddingTimeInterval_(3600),
+    )
+    fake_store.add_event(
+        "Launch", datetime(2024, 2, 1, 13), datetime(2024, 2, 1, 14), "Family"
+    )
+    return fake_store
+
+
+async def _events(server, **arguments):
+    arguments = {"start_date": "2024-01-01", "end_date": "2024-12-31", **arguments}
+    content, _ = await server.mcp.call_tool("get_macos_calendar_events", arguments)
+    return content[0].text
+
+
+class TestFormatRRule:
+    """Test cases for format_rrule."""
+
+    def test_daily(self):
+        """Interval 1 and no end give the shortest rule."""
+        assert format_rrule(FakeRecurrenceRule()) == "FREQ=DAILY"
+
+    def test_weekly_until(self):
+        """Weekdays, interval and an end date are included."""
+        rule = FakeRecurrenceRule(
+            frequency=1,
+            interval=2,
+            days=[FakeDayOfWeek(2), FakeDayOfWeek(4)],
+            end=FakeRecurrenceEnd(datetime(2024, 6, 30, 9)),
+        )
+        end = datetime(2024, 6, 30, 9).astimezone(timezone.utc)
+        assert format_rrule(rule) == (
+            "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=" + end.strftime("%Y%m%dT%H%M%SZ")
+        )
+
+    def test_monthly_and_yearly(self):
+        """Positional weekdays, month days, months and counts are supported."""
+        last_friday = FakeRecurrenceRule(
+            frequency=2, days=[FakeDayOfWeek(6, -1)], end=FakeRecurrenceEnd(count=12)
+        )
+        assert format_rrule(last_friday) == "FREQ=MONTHLY;BYDAY=-1FR;COUNT=12"
+        anniversary = FakeRecurrenceRule(frequency=3, days_of_month=[15], months=[3])
+        assert format_rrule(anniversary) == "FREQ=YEARLY;BYMONTHDAY=15;BYMONTH=3"
+
+
+class TestSeriesMode:
+    """Test cases for recurrence='series' in get_macos_calendar_events."""
+
+    async def test_default_expands(self, fake_server, standups):
+        """Without the option every occurrence is returned."""
+        rows = json.loads(await _events(fake_server))
+        assert len(rows) == 251
+        assert "recurrence" not in rows[0]
+
+    async def test_series_grouped(self, fake_server, standups, monkeypatch):
+        """Each series is returned once; detached occurrences stay separate."""
+        converted = []
+        original = server_module.EventRecord.from_event.__func__
+
+        def counting(cls, event):
+            converted.append(event.title())
+            return original(cls, event)
+
+        monkeypatch.setattr(
+            server_module.EventRecord, "from_event", classmethod(counting)
+        )
+        rows = json.loads(await _events(fake_server, recurrence="series"))
+
+        assert [r["title"] for r in rows] == ["Standup", "Standup (late)", "Launch"]
+        series, moved, launch = rows
+        assert series["recurrence"] == {
+            "rules": ["FREQ=DAILY"],
+            "occurrences": 249,
+            "lastStart": str(standups.events[249].startDate()),
+            "exceptions": [str(standups.events[10].occurrenceDate())],
+        }
+        assert series["id"] == moved["id"]
+        assert moved["detached"] is True
+        assert moved["occurrenceDate"] == str(standups.events[10].occurrenceDate())
+        assert "recurrence" not in launch
+        assert len(converted) == 3
+
+    async def test_payload_shrinks(self, fake_server, standups):
+        """Grouping cuts the payload by more than an order of magnitude."""
+        expanded = await _events(fake_server, max_bytes=0)
+        grouped = await _events(fake_server, max_bytes=0, recurrence="series")
+        assert len(grouped) * 10 < len(expanded)
+
+    async def test_invalid_options(self, fake_server, standups):
+        """Unknown modes and the columnar format are rejected."""
+        result = json.loads(await _events(fake_server, recurrence="weekly"))
+        assert "Invalid recurrence" in result[0]["error"]
+        result = json.loads(
+            await _events(fake_server, recurrence="series", format="columnar")
+        )
+        assert "requires format='rows'" in result[0]["error"]
@@ -0,0 +1,163 @@
+"""Test cases for completion-handler bridging and the reminders tool."""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from calendar_mcp.eventkit_async import call_with_completion
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _later(delay, completion, *values):
+    threading.Timer(delay, completion, values).start()
+
+
+class TestCallWithCompletion:
+    """Test cases for call_with_completion."""
+
+    async def test_values_from_other_thread(self):
+        """Values passed to the completion on another thread are returned."""
+
+        def request(entity_type, completion):
+            _later(0.01, completion, True, None)
+
+        assert await call_with_completion(request, 0) == (True, None)
+
+    async def test_single_value(self):
+        """A single completion value is returned as-is."""
+
+        def fetch(predicate, completion):
+            completion(["a", "b"])
+
+        assert await call_with_completion(fetch, "p") == ["a", "b"]
+
+    async def test_loop_not_blocked(self):
+        """Other tasks keep running while the completion is pending."""
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        def slow(completion):
+            _later(0.2, completion, "done")
+
+        task = asyncio.ensure_future(ticker())
+        try:
+            assert await call_with_completion(slow) == "done"
+        finally:
+            task.cancel()
+        assert len(ticks) >= 5
+
+    async def test_timeout_cancels_request(self):
+        """A completion that never comes times out and cancels the request."""
+        cancelled = []
+
+        def hang(completion):
+            return 42
+
+        with pytest.raises(TimeoutError):
+            await call_with_completion(hang, timeout=0.05, cancel=cancelled.append)
+        assert cancelled == [42]
+
+    async def test_late_completion_ignored(self):
+        """A completion after the timeout is dropped without errors."""
+        calls = []
+
+        def late(completion):
+            calls.append(completion)
+
+        with pytest.raises(TimeoutError):
+            await call_with_completion(late, timeout=0.01)
+        calls[0]("too late")
+        await asyncio.sleep(0)
+
+
+class TestRemindersTool:
+    """Test cases for get_macos_reminders."""
+
+    @pytest.fixture
+    def reminders(self, fake_store):
+        fake_store.add_reminder(
+            "Buy milk", "Groceries", due=datetime(2024, 1, 5), priority=1
+        )
+        fake_store.add_reminder(
+            "Call dentist",
+            "Personal",
+            due=datetime(2024, 1, 10, 9, 30),
+            due_has_time=True,
+            notes="Ask about Friday",
+        )
+        fake_store.add_reminder(
+            "Pay rent", "Personal", completed_at=datetime(2024, 1, 2, 12)
+        )
+        fake_store.add_reminder("Someday", "Personal")
+        return fake_store
+
+    async def _call(self, server, **arguments):
+        content, _ = await server.mcp.call_tool("get_macos_reminders", arguments)
+        return json.loads(content[0].text)
+
+    async def test_incomplete_default(self, fake_server, reminders):
+        """By default incomplete reminders from every list are returned."""
+        result = await self._call(fake_server)
+        assert [r["title"] for r in result] == ["Buy milk", "Call dentist", "Someday"]
+        dentist = result[1]
+        assert dentist["list"] == "Personal"
+        assert dentist["due"] == "2024-01-10 09:30"
+        assert dentist["notes"] == "Ask about Friday"
+        assert result[0]["due"] == "2024-01-05"
+        assert result[2]["due"] is None
+
+    async def test_filters(self, fake_server, reminders):
+        """List, status and date filters are passed to the predicate."""
+        result = await self._call(
+            fake_server,
+            list_name="Personal",
+            start_date="2024-01-08",
+            end_date="2024-01-31",
+        )
+        assert [r["title"] for r in result] == ["Call dentist"]
+
+        completed = await self._call(fake_server, status="completed")
+        assert [r["title"] for r in completed] == ["Pay rent"]
+        assert completed[0]["completed"] is True
+        assert completed[0]["completedAt"].startswith("2024-01-02")
+
+        everything = await self._call(fake_server, status="all")
+        assert len(everything) == 4
+
+    async def test_access_requested_once(self, fake_server, reminders):
+        """Granted access is remembered across calls."""
+        await self._call(fake_server)
+        await self._call(fake_server)
+        assert reminders.access_requests == 1
+
+    async def test_access_denied(self, fake_server, reminders):
+        """A denied request is reported and asked again next time."""
+        reminders.access_granted = False
+        result = await self._call(fake_server)
+        assert result == [{"error": "Reminders access denied"}]
+        await self._call(fake_server)
+        assert reminders.access_requests == 2
+
+    async def test_errors(self, fake_server, reminders):
+        """Unknown lists and statuses are reported as errors."""
+        result = await self._call(fake_server, list_name="Nope")
+        assert "not found" in result[0]["error"]
+        result = await self._call(fake_server, status="later")
+        assert "Invalid status" in result[0]["error"]
+
+    async def test_fetch_timeout(self, fake_server, reminders, monkeypatch):
+        """A fetch that never completes is cancelled and reported."""
+        monkeypatch.setattr("calendar_mcp.server.FETCH_TIMEOUT", 0.05)
+        reminders.hang_fetches = True
+        result = await self._call(fake_server)
+        assert "did not complete" in result[0]["error"]
+        assert reminders.cancelled_fetches == [1]
@@ -0,0 +1,182 @@
+"""Test cases for the persistent event snapshot (calendar_mcp.snapshot)."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import calendar_mcp.server as server_module
+from calendar_mcp.records import EventRecord
+from calendar_mcp.server import CalendarMCPServer
+from calendar_mcp.snapshot import EventSnapshot
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+KEY = ("2024-01-01", "2024-01-08", "")
+
+
+def _server(fake_store, path, max_age=0.0):
+    server = CalendarMCPServer(
+        lazy_init=True, snapshot_path=str(path), snapshot_max_age=max_age
+    )
+    server.event_store = fake_store
+    return server
+
+
+async def _drain(server):
+    while server._snapshot_tasks:
+        await asyncio.gather(*list(server._snapshot_tasks.values()))
+
+
+class TestEventSnapshot:
+    """Test cases for EventSnapshot storage."""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Rows survive closing and reopening the database."""
+        record = EventRecord(
+            "evt-1", "会議", 1.0, 3601.0, "Work", "iCloud", "", False, 2.0, "ext-1"
+        )
+        snapshot = EventSnapshot(str(tmp_path / "snap.db"))
+        snapshot.save(KEY, [record], fetched_at=5.0)
+        snapshot.close()
+
+        reopened = EventSnapshot(str(tmp_path / "snap.db"))
+        fetched_at, records = reopened.load(KEY)
+        assert fetched_at == 5.0
+        assert records == [record]
+        assert reopened.load(("2024-02-01", "2024-02-08", "")) is None
+
+    def test_find_by_identifier(self, tmp_path):
+        """find() matches either identifier and prefers the newest range."""
+        old = EventRecord("evt-1", "Old", 1.0, 2.0, "Work", external_id="ext-1")
+        new = EventRecord("evt-1", "New", 1.0, 2.0, "Work", external_id="ext-1")
+        snapshot = EventSnapshot(str(tmp_path / "snap.db"))
+        snapshot.save(KEY, [old], fetched_at=1.0)
+        snapshot.save(("2024-01-01", "2024-02-01", ""), [new], fetched_at=2.0)
+
+        found = snapshot.find(["ext-1", "evt-1", "missing"])
+        assert found == {"evt-1": (2.0, new), "ext-1": (2.0, new)}
+        assert snapshot.find([]) == {}
+
+    def test_touch_updates_fetched_at(self, tmp_path):
+        """touch() refreshes the timestamp without dropping rows."""
+        snapshot = EventSnapshot(str(tmp_path / "snap.db"))
+        snapshot.save(KEY, [], fetched_at=1.0)
+        snapshot.touch(KEY, fetched_at=9.0)
+        assert snapshot.load(KEY) == (9.0, [])
+
+    def test_invalidate_overlapping_ranges(self, tmp_path):
+        """A ranged invalidate only drops ranges that cover the changed days."""
+        snapshot = EventSnapshot(str(tmp_path / "snap.db"))
+        before, after = ("2023-12-25", "2024-01-01", ""), (
+            "2024-01-09",
+            "2024-01-10",
+            "",
+        )
+        for key in (KEY, before, after):
+            snapshot.save(key, [], fetched_at=1.0)
+        snapshot.invalidate("2024-01-07", "2024-01-08")
+        assert snapshot.load(KEY) is None
+        assert snapshot.load(before) == (1.0, [])
+        assert snapshot.load(after) == (1.0, [])
+
+    def test_max_ranges(self, tmp_path):
+        """Saving past the cap drops the least recently fetched ranges."""
+        snapshot = EventSnapshot(str(tmp_path / "snap.db"), max_ranges=2)
+        keys = [(f"2024-01-0{day}", f"2024-01-0{day + 1}", "") for day in (1, 2, 3)]
+        snapshot.save(keys[0], [], fetched_at=1.0)
+        snapshot.save(keys[1], [], fetched_at=2.0)
+        snapshot.touch(keys[0], fetched_at=3.0)
+        snapshot.save(keys[2], [], fetched_at=4.0)
+        assert snapshot.load(keys[1]) is None
+        assert snapshot.load(keys[0]) == (3.0, [])
+        assert snapshot.stats()["ranges"] == 2
+
+
+class TestSnapshotServer:
+    """Test cases for warm restarts backed by the snapshot."""
+
+    async def test_warm_restart_reuses_snapshot(self, fake_store, tmp_path):
+        """A fresh process answers from disk, then reconciles in the background."""
+        event = fake_store.add_event(
+            "Planning", datetime(2024, 1, 2, 10), datetime(2024, 1, 2, 11)
+        )
+        path = tmp_path / "snap.db"
+
+        first = _server(fake_store, path, max_age=3600)
+        events = await first._get_events("2024-01-01", "2024-01-08")
+        assert [e["title"] for e in events] == ["Planning"]
+        assert fake_store.fetch_count == 1
+        first.snapshot.close()
+
+        event.update(title="Planning (moved)")
+        fake_store.add_event(
+            "Retro", datetime(2024, 1, 3, 10), datetime(2024, 1, 3, 11)
+        )
+
+        second = _server(fake_store, path, max_age=0)
+        stale = await second._get_events("2024-01-01", "2024-01-08")
+        assert [e["title"] for e in stale] == ["Planning"]
+
+        await _drain(second)
+        assert fake_store.fetch_count == 2
+        fresh = await second._get_events("2024-01-01", "2024-01-08")
+        assert [e["title"] for e in fresh] == ["Planning (moved)", "Retro"]
+
+    async def test_reconcile_skips_unmodified_events(
+        self, fake_store, tmp_path, monkeypatch
+    ):
+        """Events whose last-modified date is unchanged are not re-converted."""
+        fake_store.add_event("A", datetime(2024, 1, 2, 10), datetime(2024, 1, 2, 11))
+        fake_store.add_event("B", datetime(2024, 1, 3, 10), datetime(2024, 1, 3, 11))
+        server = _server(fake_store, tmp_path / "snap.db", max_age=0)
+        await server._get_events("2024-01-01", "2024-01-08")
+
+        converted = []
+        original = EventRecord.from_event
+
+        def counting_convert(event):
+            converted.append(event.title())
+            return original(event)
+
+        monkeypatch.setattr(
+            server_module.EventRecord, "from_event", staticmethod(counting_convert)
+        )
+        fake_store.events[1].update(title="B2")
+
+        await server._get_events("2024-01-01", "2024-01-08")
+        await _drain(server)
+
+        assert converted == ["B2"]
+
+    async def test_fresh_snapshot_skips_reconcile(self, fake_store, tmp_path):
+        """Ranges younger than snapshot_max_age are served without a fetch."""
+        fake_store.add_event("A", datetime(2024, 1, 2, 10), datetime(2024, 1, 2, 11))
+        server = _server(fake_store, tmp_path / "snap.db", max_age=3600)
+        await server._get_events("2024-01-01", "2024-01-08")
+        await server._get_events("2024-01-01", "2024-01-08")
+        assert not server._snapshot_tasks
+        assert fake_store.fetch_count == 1
+
+    async def test_default_range_bypasses_snapshot(self, fake_store, tmp_path):
+        """Open-ended (relative) ranges are never persisted."""
+        server = _server(fake_store, tmp_path / "snap.db")
+        await server._get_events()
+        assert server.snapshot.load(KEY) is None
+
+    async def test_create_event_invalidates_range(self, fake_store, tmp_path):
+        """A created event is visible at once in ranges that cover it."""
+        fake_store.add_calendar("Work")
+        server = _server(fake_store, tmp_path / "snap.db", max_age=3600)
+        other = ("2024-02-01", "2024-02-08")
+        await server._get_events(*KEY[:2])
+        await server._get_events(*other)
+
+        result = await server._create_event(
+            "Kickoff", "2024-01-03 10:00", "2024-01-03 11:00"
+        )
+        assert result == "Event 'Kickoff' created successfully"
+        assert server.snapshot.load(KEY) is None
+        assert server.snapshot.load((*other, "")) is not None
+        events = await server._get_events(*KEY[:2])
+        assert [e["title"] for e in events] == ["Kickoff"]
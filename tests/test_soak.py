@@ -0,0 +1,117 @@
+"""Soak test: many queries against the fake backend must not grow memory."""
+
+import gc
+import json
+import logging
+import os
+import resource
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+QUERIES = 2000
+
+# ウォームアップ後の増加量の上限
+MAX_TRACED_GROWTH = 512 * 1024
+MAX_RSS_GROWTH = 32 * 1024 * 1024
+
+
+def _rss() -> int:
+    """Current resident set size in bytes (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+@pytest.fixture
+def quiet_logging():
+    # pytest のログ捕捉はレコードを保持し続けるので、計測中はログを止める
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def busy_store(fake_store):
+    start = datetime(2024, 1, 1, 8)
+    for i in range(400):
+        begin = start + timedelta(hours=9 * i)
+        fake_store.add_event(
+            f"Meeting {i}",
+            begin,
+            begin + timedelta(minutes=45),
+            calendar="Work" if i % 3 else "Family",
+            notes="agenda " * (i % 7),
+        )
+    return fake_store
+
+
+async def _query(server, i):
+    # 大半は 1 窓、時々 90 日窓の境界をまたぐ範囲にする
+    start = datetime(2024, 1, 1) + timedelta(days=i % 120)
+    end = start + timedelta(days=2 + i % 10)
+    arguments = {
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": end.strftime("%Y-%m-%d"),
+    }
+    if i % 3 == 0:
+        arguments["calendar_name"] = "Family"
+    if i % 4 == 0:
+        arguments["format"] = "columnar"
+    content, _ = await server.mcp.call_tool("get_macos_calendar_events", arguments)
+    result = json.loads(content[0].text)
+    assert "error" not in (result if isinstance(result, dict) else result[0])
+
+
+class TestSoak:
+    """Long-running query loops."""
+
+    async def test_pools_on_worker_threads(self, fake_server, busy_store, fake_objc):
+        """Each window query and conversion runs inside a drained pool."""
+        content, _ = await fake_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-12-31"},
+        )
+        assert len(json.loads(content[0].text)) == 400
+        assert fake_objc.open == 0
+        worker_pools = sum(
+            count
+            for name, count in fake_objc.pools.items()
+            if name.startswith("calendar-mcp-fetch")
+        )
+        assert worker_pools == len(
+            fake_server.planner.plan(
+                *fake_server._date_range("2024-01-01", "2024-12-31")
+            )
+        )
+
+    async def test_memory_stays_bounded(
+        self, fake_server, busy_store, fake_objc, quiet_logging
+    ):
+        """Thousands of queries leave traced memory and RSS flat."""
+        for i in range(200):
+            await _query(fake_server, i)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            rss_before = _rss()
+            for i in range(QUERIES):
+                await _query(fake_server, i)
+            gc.collect()
+            traced_growth = tracemalloc.get_traced_memory()[0] - traced_before
+            rss_growth = _rss() - rss_before
+        finally:
+            tracemalloc.stop()
+
+        assert traced_growth < MAX_TRACED_GROWTH
+        assert rss_growth < MAX_RSS_GROWTH
+        assert fake_objc.open == 0
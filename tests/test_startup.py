@@ -0,0 +1,95 @@
+"""Startup-time checks for calendar_mcp.server (stdio cold start)."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from calendar_mcp.server import CalendarMCPServer
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 既定の設定で構築したサーバーが読み込まない任意機能のモジュール
+OPTIONAL_MODULES = (
+    "calendar_mcp.admission",
+    "calendar_mcp.dedup",
+    "calendar_mcp.export",
+    "calendar_mcp.lifecycle",
+    "calendar_mcp.logpipe",
+    "calendar_mcp.preflight",
+    "calendar_mcp.profiling",
+    "calendar_mcp.reminders",
+    "calendar_mcp.snapshot",
+    "calendar_mcp.stats",
+    "calendar_mcp.trace",
+)
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+class TestStartup:
+    """Test cases for cold start behaviour."""
+
+    def test_import_does_not_load_heavy_modules(self):
+        """Importing the server module must not pull in EventKit or the MCP SDK."""
+        proc = _run_python(
+            "-c",
+            "import json, sys, calendar_mcp.server; "
+            "print(json.dumps([m for m in ('mcp', 'EventKit', 'Foundation') "
+            "if m in sys.modules]))",
+        )
+        assert proc.returncode == 0, proc.stderr
+        assert json.loads(proc.stdout) == []
+
+    def test_optional_modules_not_loaded(self):
+        """Constructing a default server leaves optional feature modules unloaded."""
+        proc = _run_python(
+            "-c",
+            "import json, sys\n"
+            "from calendar_mcp.server import CalendarMCPServer\n"
+            "CalendarMCPServer(lazy_init=True)\n"
+            f"print(json.dumps([m for m in {OPTIONAL_MODULES!r} if m in sys.modules]))",
+        )
+        assert proc.returncode == 0, proc.stderr
+        assert json.loads(proc.stdout.splitlines()[-1]) == []
+
+    async def test_lazy_init_defers_event_store(self):
+        """With lazy_init the EventKit store is created on first tool use."""
+        with patch("calendar_mcp.server.EVENTKIT_AVAILABLE", True):
+            with patch("calendar_mcp.server.EventKit") as mock_eventkit:
+                mock_store = MagicMock()
+                mock_store.calendarsForEntityType_.return_value = []
+                mock_eventkit.EKEventStore.alloc.return_value.init.return_value = (
+                    mock_store
+                )
+
+                server = CalendarMCPServer(lazy_init=True)
+                assert server.event_store is None
+                mock_eventkit.EKEventStore.alloc.assert_not_called()
+
+                result = await server._get_calendars()
+                await server._get_calendars()
+
+                assert result == []
+                assert server.event_store is mock_store
+                mock_eventkit.EKEventStore.alloc.assert_called_once()
+
+    async def test_lazy_init_without_eventkit(self):
+        """Lazy servers still report EventKit as unavailable."""
+        with patch("calendar_mcp.server.EVENTKIT_AVAILABLE", False):
+            server = CalendarMCPServer(lazy_init=True)
+            result = await server._get_events()
+            assert result == [{"error": "EventKit not available"}]
@@ -0,0 +1,135 @@
+"""Test cases for event aggregation (calendar_mcp.stats)."""
+
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from calendar_mcp.records import EventRecord
+from calendar_mcp.server import CalendarMCPServer
+from calendar_mcp.stats import summarize_events
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+def _span(title, start, end, calendar="Work", all_day=False):
+    return EventRecord(
+        "", title, start.timestamp(), end.timestamp(), calendar, all_day=all_day
+    )
+
+
+class TestSummarizeEvents:
+    """Test cases for summarize_events."""
+
+    def test_group_by_day(self):
+        """Counts, busy minutes, all-day counts and longest event per day."""
+        spans = [
+            _span("Standup", datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 9, 15)),
+            _span("Review", datetime(2024, 1, 1, 13), datetime(2024, 1, 1, 15)),
+            _span(
+                "Holiday",
+                datetime(2024, 1, 1),
+                datetime(2024, 1, 2),
+                calendar="Holidays",
+                all_day=True,
+            ),
+            _span("1on1", datetime(2024, 1, 2, 10), datetime(2024, 1, 2, 10, 30)),
+        ]
+
+        summary = summarize_events(spans, "day")
+
+        assert summary["group_by"] == "day"
+        assert [g["key"] for g in summary["groups"]] == ["2024-01-01", "2024-01-02"]
+        day1 = summary["groups"][0]
+        assert day1["count"] == 3
+        assert day1["busy_minutes"] == 135.0
+        assert day1["all_day"] == 1
+        assert day1["longest"]["title"] == "Review"
+        assert day1["longest"]["minutes"] == 120.0
+        assert summary["totals"]["count"] == 4
+        assert summary["totals"]["busy_minutes"] == 165.0
+
+    def test_group_by_week_and_calendar(self):
+        """Week keys are ISO weeks; calendar keys are calendar titles."""
+        spans = [
+            _span("A", datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10)),
+            _span("B", datetime(2024, 1, 8, 9), datetime(2024, 1, 8, 10), "Home"),
+        ]
+
+        weekly = summarize_events(spans, "week")
+        assert [g["key"] for g in weekly["groups"]] == ["2024-W01", "2024-W02"]
+
+        by_calendar = summarize_events(spans, "calendar")
+        assert [g["key"] for g in by_calendar["groups"]] == ["Home", "Work"]
+
+    def test_invalid_group_by(self):
+        """Unknown group_by values are rejected."""
+        with pytest.raises(ValueError):
+            summarize_events([], "month")
+
+    def test_all_day_only_group_has_no_longest(self):
+        """All-day events never count as busy time or longest event."""
+        spans = [
+            _span("Trip", datetime(2024, 1, 1), datetime(2024, 1, 3), all_day=True)
+        ]
+        summary = summarize_events(spans, "day")
+        assert summary["groups"][0]["busy_minutes"] == 0.0
+        assert summary["groups"][0]["longest"] is None
+
+
+class TestSummarizeTool:
+    """Test cases for the summarize_macos_calendar_events tool."""
+
+    async def test_tool_registration(self, fake_server):
+        """The summary tool is registered."""
+        tools = await fake_server.mcp.list_tools()
+        assert "summarize_macos_calendar_events" in [tool.name for tool in tools]
+
+    async def test_summarize_tool_call(self, fake_server, fake_store):
+        """The tool returns a per-group table instead of events."""
+        for day in range(1, 4):
+            fake_store.add_event(
+                "Meeting", datetime(2024, 1, day, 10), datetime(2024, 1, day, 11)
+            )
+        fake_store.add_event(
+            "Dinner", datetime(2024, 1, 1, 19), datetime(2024, 1, 1, 20), "Home"
+        )
+
+        content_list, _ = await fake_server.mcp.call_tool(
+            "summarize_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-10"},
+        )
+        summary = json.loads(content_list[0].text)
+
+        assert [g["count"] for g in summary["groups"]] == [2, 1, 1]
+        assert summary["totals"]["busy_minutes"] == 240.0
+
+        content_list, _ = await fake_server.mcp.call_tool(
+            "summarize_macos_calendar_events",
+            {
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-10",
+                "calendar_name": "Home",
+            },
+        )
+        summary = json.loads(content_list[0].text)
+        assert summary["totals"]["count"] == 1
+
+    async def test_summarize_invalid_group_by(self, fake_server, fake_store):
+        """Invalid group_by values are rejected before any events are fetched."""
+        result = await fake_server._summarize_events(
+            "2024-01-01", "2024-01-10", group_by="month"
+        )
+        assert result == {
+            "error": "Invalid group_by 'month', "
+            "expected one of ('day', 'week', 'calendar')"
+        }
+        assert fake_store.fetch_count == 0
+
+    async def test_summarize_no_eventkit(self):
+        """Without EventKit the summary reports an error."""
+        with patch("calendar_mcp.server.EVENTKIT_AVAILABLE", False):
+            server = CalendarMCPServer()
+            result = await server._summarize_events()
+        assert result == {"error": "EventKit not available"}
@@ -26,7 +26,9 @@ class TestCalendarMCPTools:
         mock_store.calendarsForEntityType_.return_value = []
         mock_store.eventsMatchingPredicate_.return_value = []
         mock_store.defaultCalendarForNewEvents.return_value = MagicMock()
-        mock_store.requestAccessToEntityType_completion_.return_value = True
+        mock_store.requestAccessToEntityType_completion_.side_effect = (
+            lambda entity_type, completion: completion(True, None)
+        )
         mock_store.saveEvent_span_error_.return_value = True
         return mock_store
 
@@ -61,8 +63,10 @@ class TestCalendarMCPTools:
 
                     mock_event = MagicMock()
                     mock_event.title.return_value = "Test Event"
-                    mock_event.startDate.return_value = "2024-01-01 10:00:00"
-                    mock_event.endDate.return_value = "2024-01-01 11:00:00"
+                    mock_start = mock_event.startDate.return_value
+                    mock_start.timeIntervalSince1970.return_value = 1704103200.0
+                    mock_end = mock_event.endDate.return_value
+                    mock_end.timeIntervalSince1970.return_value = 1704106800.0
                     mock_event.calendar.return_value.title.return_value = "Calendar"
                     mock_event.notes.return_value = "Test notes"
                     mock_event.isAllDay.return_value = False
@@ -213,8 +217,8 @@ class TestCalendarMCPTools:
         """Test create_event when calendar access is denied."""
         with patch("calendar_mcp.server.EVENTKIT_AVAILABLE", True):
             with patch("calendar_mcp.server.EventKit"):
-                mock_event_store.requestAccessToEntityType_completion_.return_value = (
-                    False
+                mock_event_store.requestAccessToEntityType_completion_.side_effect = (
+                    lambda entity_type, completion: completion(False, None)
                 )
 
                 server = CalendarMCPServer()
@@ -250,6 +254,32 @@ class TestCalendarMCPTools:
 
                     assert result == "Failed to save event"
 
+    async def test_create_event_save_error_tuple(self, mock_event_store):
+        """A (False, NSError) result from PyObjC is reported as a failure."""
+        with patch("calendar_mcp.server.EVENTKIT_AVAILABLE", True):
+            with patch("calendar_mcp.server.EventKit") as mock_eventkit:
+                with patch("calendar_mcp.server.Foundation") as mock_foundation:
+                    mock_event_store.saveEvent_span_error_.return_value = (
+                        False,
+                        "Calendar is read-only",
+                    )
+                    mock_eventkit.EKEvent.eventWithEventStore_.return_value = (
+                        MagicMock()
+                    )
+                    nsdate = mock_foundation.NSDate
+                    nsdate.dateWithTimeIntervalSince1970_.return_value = MagicMock()
+
+                    server = CalendarMCPServer()
+                    server.event_store = mock_event_store
+
+                    result = await server._create_event(
+                        title="Test Event",
+                        start_date="2024-01-01 10:00",
+                        end_date="2024-01-01 11:00",
+                    )
+
+                    assert result == "Failed to save event: Calendar is read-only"
+
     async def test_tool_registration(self, server):
         """Test that MCP tools are properly registered."""
         tools = await server.mcp.list_tools()
@@ -0,0 +1,172 @@
+"""Test cases for request trace capture and replay (calendar_mcp.trace)."""
+
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from calendar_mcp.server import CalendarMCPServer
+from calendar_mcp.trace import (
+    TraceRecorder,
+    latency_summary,
+    load_trace,
+    replay,
+    schedule,
+)
+
+pytestmark = pytest.mark.anyio(backends=["asyncio"])
+
+
+@pytest.fixture
+def traced_server(fake_store, tmp_path):
+    server = CalendarMCPServer(lazy_init=True, trace_path=str(tmp_path / "t.ndjson"))
+    server.event_store = fake_store
+    begin = datetime(2024, 1, 1, 8)
+    for i in range(50):
+        start = begin + timedelta(hours=i * 5)
+        fake_store.add_event(f"Event {i}", start, start + timedelta(minutes=30))
+    return server
+
+
+def _entry(ts, name="get_macos_calendar_events", **arguments):
+    arguments = arguments or {"start_date": "2024-01-01", "end_date": "2024-01-05"}
+    return {"ts": ts, "kind": "tool", "name": name, "arguments": arguments}
+
+
+class TestTraceRecorder:
+    """Test cases for TraceRecorder."""
+
+    async def test_records_calls_and_errors(self, tmp_path):
+        """Each call becomes one line; failures are recorded and re-raised."""
+        recorder = TraceRecorder(str(tmp_path / "t.ndjson"))
+
+        async def handler(n):
+            if n < 0:
+                raise ValueError("negative")
+            return "é" * n
+
+        wrapped = recorder.wrap("repeat", "tool", handler)
+        assert await wrapped(n=3) == "ééé"
+        with pytest.raises(ValueError):
+            await wrapped(n=-1)
+        recorder.close()
+
+        ok, failed = load_trace(str(tmp_path / "t.ndjson"))
+        assert (ok["name"], ok["kind"], ok["arguments"], ok["bytes"]) == (
+            "repeat",
+            "tool",
+            {"n": 3},
+            6,
+        )
+        assert ok["duration_ms"] >= 0
+        assert failed["error"] == "ValueError"
+        assert "bytes" not in failed
+
+    async def test_writes_off_event_loop(self, tmp_path, monkeypatch):
+        """Lines are written by the writer thread; a full queue drops entries."""
+        recorder = TraceRecorder(str(tmp_path / "t.ndjson"), queue_size=1)
+        release = threading.Event()
+        writers = []
+        write = recorder._file.write
+
+        def slow_write(text):
+            writers.append(threading.current_thread())
+            release.wait(1.0)
+            return write(text)
+
+        monkeypatch.setattr(recorder._file, "write", slow_write)
+
+        async def handler():
+            return "ok"
+
+        wrapped = recorder.wrap("noop", "tool", handler)
+        assert await wrapped() == "ok"
+        while not writers:
+            await asyncio.sleep(0.001)
+        for _ in range(3):
+            assert await wrapped() == "ok"
+        # 1件目は書き込み中、2件目は待ち行列、残りは捨てられる
+        assert recorder.dropped == 2
+        release.set()
+        recorder.close()
+
+        assert len(load_trace(str(tmp_path / "t.ndjson"))) == 2
+        assert recorder.recorded == 2
+        assert threading.main_thread() not in writers
+
+    def test_load_skips_truncated_line(self, tmp_path):
+        """A partial last line (crash mid-write) is ignored; entries sort by start."""
+        path = tmp_path / "t.ndjson"
+        path.write_text(
+            json.dumps(_entry(2.0)) + "\n" + json.dumps(_entry(1.0)) + "\n" + '{"ts": 3'
+        )
+        assert [e["ts"] for e in load_trace(str(path))] == [1.0, 2.0]
+
+
+class TestScheduling:
+    """Test cases for schedule and latency_summary."""
+
+    def test_schedule_caps_idle_gaps(self):
+        entries = [_entry(100.0), _entry(100.5), _entry(5000.0), _entry(5001.0)]
+        assert schedule(entries, max_idle=60) == [0.0, 0.5, 60.5, 61.5]
+        assert schedule(entries, max_idle=0)[-1] == 4901.0
+
+    def test_latency_summary(self):
+        """Percentiles use the nearest rank."""
+        summary = latency_summary([float(v) for v in range(1, 101)])
+        assert (summary["p50_ms"], summary["p90_ms"], summary["p99_ms"]) == (
+            50.0,
+            90.0,
+            99.0,
+        )
+        assert summary["max_ms"] == 100.0
+        assert latency_summary([]) == {"count": 0}
+
+
+class TestServerTracing:
+    """Test cases for tracing wired into CalendarMCPServer."""
+
+    async def test_capture(self, traced_server, tmp_path):
+        """Tool and resource requests are written with their arguments and size."""
+        content, _ = await traced_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-03"},
+        )
+        await traced_server.mcp.read_resource("calendar://calendars")
+        traced_server.tracer.flush()
+        tool, resource = load_trace(str(tmp_path / "t.ndjson"))
+        assert tool["arguments"]["start_date"] == "2024-01-01"
+        assert tool["bytes"] == len(content[0].text.encode("utf-8"))
+        assert (resource["kind"], resource["name"]) == (
+            "resource",
+            "calendar://calendars",
+        )
+        assert traced_server.tracer.recorded == 2
+
+    async def test_replay(self, traced_server, tmp_path):
+        """A captured trace replays with its overlap and a latency report."""
+        await traced_server.mcp.call_tool(
+            "get_macos_calendar_events",
+            {"start_date": "2024-01-01", "end_date": "2024-01-05"},
+        )
+        await traced_server.mcp.read_resource("calendar://agenda/today")
+        traced_server.tracer.flush()
+        captured = load_trace(str(tmp_path / "t.ndjson"))
+        # 同時刻の2リクエストを追加し、再生時に重なることを確かめる
+        entries = captured + [_entry(captured[-1]["ts"] + 0.01)] * 2
+
+        store = traced_server.event_store
+        store.latency = 0.05
+        store.max_in_flight = 0
+        report = await replay(traced_server, entries, speed=10.0)
+        await traced_server.agenda.close()
+
+        assert report["requests"] == 4
+        assert report["errors"] == 0, report["error_samples"]
+        assert report["latency"]["count"] == 4
+        assert report["by_name"]["get_macos_calendar_events"]["count"] == 3
+        assert report["by_name"]["calendar://agenda/{view}"]["count"] == 1
+        assert report["recorded_latency"]["count"] == 2
+        assert store.max_in_flight >= 2